@@ -0,0 +1,3 @@
+"""
+Benchmarks del juego (se ejecutan sin ventana: python -m benchmarks.run)
+"""
@@ -0,0 +1,144 @@
+"""
+Utilidades comunes de los benchmarks: registro, medición, resultados en JSON
+y comparación con una línea base
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+# Raíz del repositorio (los recursos se cargan con rutas relativas a ella)
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Benchmarks registrados, en orden de definición
+BENCHMARKS = []
+
+class Benchmark:
+    """
+    Escenario de medición. La función del escenario prepara todo lo necesario
+    y devuelve la operación que se va a medir (una función sin argumentos).
+    """
+    def __init__(self, name, setup, repeat, number):
+        self.name = name
+        self.setup = setup
+        self.repeat = repeat
+        self.number = number
+
+def benchmark(name, repeat=7, number=1):
+    """
+    Decorador que registra un escenario.
+    
+    Args:
+        name (str): Nombre del benchmark en los resultados
+        repeat (int): Número de muestras
+        number (int): Llamadas a la operación por muestra
+    """
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(name, setup, repeat, number))
+        return setup
+    return decorator
+
+def init_headless():
+    """Inicializa pygame sin pantalla ni audio y crea la ventana virtual"""
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    
+    import pygame
+    from src.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT
+    
+    pygame.display.init()
+    pygame.font.init()
+    return pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+def measure(operation, repeat, number):
+    """
+    Mide una operación y devuelve sus estadísticas en milisegundos por llamada.
+    Se hace una llamada previa de calentamiento que no se cuenta.
+    """
+    operation()
+    
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            operation()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    
+    return {
+        "min_ms": min(samples),
+        "median_ms": statistics.median(samples),
+        "mean_ms": statistics.fmean(samples),
+        "max_ms": max(samples),
+        "repeat": repeat,
+        "number": number,
+    }
+
+def run_benchmarks(name_filter=None, repeat=None, log=print):
+    """
+    Ejecuta los benchmarks registrados (opcionalmente solo los que contienen
+    name_filter en su nombre) y devuelve un diccionario nombre -> estadísticas
+    """
+    results = {}
+    for bench in BENCHMARKS:
+        if name_filter and name_filter not in bench.name:
+            continue
+        
+        operation = bench.setup()
+        stats = measure(operation, repeat or bench.repeat, bench.number)
+        results[bench.name] = stats
+        log(f"{bench.name:<40} {stats['median_ms']:>10.3f} ms (min {stats['min_ms']:.3f})")
+    
+    return results
+
+def environment_info():
+    """Describe el entorno en el que se han tomado las mediciones"""
+    import pygame
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    
+    return {
+        "python": sys.version.split()[0],
+        "pygame": pygame.version.ver,
+        "numpy": numpy_version,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def save_results(file_path, results):
+    """Guarda los resultados en un archivo JSON"""
+    data = {"environment": environment_info(), "results": results}
+    with open(file_path, "w", encoding="utf-8") as results_file:
+        json.dump(data, results_file, indent=2, sort_keys=True)
+
+def load_results(file_path):
+    """Carga los resultados guardados por save_results"""
+    with open(file_path, encoding="utf-8") as results_file:
+        return json.load(results_file)["results"]
+
+def compare_results(results, baseline, max_regression):
+    """
+    Compara la mediana de cada benchmark con la de la línea base.
+    
+    Args:
+        results (dict): Resultados actuales
+        baseline (dict): Resultados de referencia
+        max_regression (float): Aumento relativo permitido (0.2 = 20 % más lento)
+    
+    Returns:
+        list: Tuplas (nombre, mediana base, mediana actual, proporción, es_regresión)
+    """
+    comparison = []
+    for name, stats in results.items():
+        if name not in baseline:
+            continue
+        base = baseline[name]["median_ms"]
+        current = stats["median_ms"]
+        ratio = current / base if base > 0 else float("inf")
+        comparison.append((name, base, current, ratio, ratio > 1 + max_regression))
+    return comparison
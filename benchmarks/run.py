@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Ejecuta los benchmarks, guarda los resultados en JSON y, si se indica una
+línea base, falla cuando algún benchmark empeora más de lo permitido.
+
+Uso:
+    python -m benchmarks.run --output resultados.json
+    python -m benchmarks.run --baseline base.json --max-regression 0.2
+"""
+import argparse
+import os
+import sys
+
+def parse_args(argv=None):
+    """Procesa los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmarks del juego")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--baseline", default=None,
+                        help="Resultados de referencia con los que comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Aumento relativo de la mediana permitido (0.2 = 20 %%)")
+    parser.add_argument("--filter", default=None,
+                        help="Ejecuta solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--repeat", type=int, default=None,
+                        help="Número de muestras por benchmark (sustituye al de cada escenario)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    from benchmarks.harness import (ROOT_DIR, init_headless, run_benchmarks,
+                                    save_results, load_results, compare_results)
+    
+    # Los recursos se cargan con rutas relativas a la raíz del repositorio
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    os.chdir(ROOT_DIR)
+    
+    init_headless()
+    import benchmarks.scenarios  # Registra los escenarios
+    
+    results = run_benchmarks(args.filter, args.repeat)
+    save_results(output, results)
+    print(f"Resultados guardados en {output}")
+    
+    if baseline_path is None:
+        return 0
+    
+    regressions = 0
+    print(f"\nComparación con {baseline_path} (máximo +{args.max_regression:.0%}):")
+    for name, base, current, ratio, regressed in compare_results(results, load_results(baseline_path),
+                                                                 args.max_regression):
+        mark = "REGRESIÓN" if regressed else "ok"
+        print(f"{name:<40} {base:>10.3f} -> {current:>10.3f} ms ({ratio:.2f}x) {mark}")
+        if regressed:
+            regressions += 1
+    
+    if regressions:
+        print(f"{regressions} benchmark(s) empeoran más de lo permitido")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    sys.exit(main())
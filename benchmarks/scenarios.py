@@ -0,0 +1,392 @@
+"""
+Escenarios medidos: pathfinding, actualización del juego, renderizado y arranque
+"""
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import weakref
+import pygame
+from benchmarks.harness import benchmark, ROOT_DIR
+from src.utils.constants import TILE_SIZE
+
+def generate_tile_map(width, height, wall_chance, seed):
+    """Genera un mapa aleatorio con bordes de pared (siempre el mismo para una semilla)"""
+    rng = random.Random(seed)
+    tile_map = []
+    for y in range(height):
+        row = []
+        for x in range(width):
+            if x == 0 or y == 0 or x == width - 1 or y == height - 1:
+                row.append(1)
+            else:
+                row.append(1 if rng.random() < wall_chance else 0)
+        tile_map.append(row)
+    return tile_map
+
+def create_level(tile_map):
+    """Crea un nivel a partir de un mapa de tiles"""
+    from src.levels.level_loader import Level
+    height = len(tile_map)
+    width = len(tile_map[0])
+    return Level(width, height, tile_map, (TILE_SIZE, TILE_SIZE), [], [])
+
+def path_benchmark(level, start, end):
+    """Devuelve la operación que busca un camino entre dos casillas (sin caché: siempre busca)"""
+    from src.ai.pathfinding import AStar
+    pathfinder = AStar(level, cache_size=0)
+    start_x, start_y = start[0] * TILE_SIZE, start[1] * TILE_SIZE
+    end_x, end_y = end[0] * TILE_SIZE, end[1] * TILE_SIZE
+    return lambda: pathfinder.find_path(start_x, start_y, end_x, end_y)
+
+# --- Pathfinding ---
+
+@benchmark("astar.open_64x64", number=5)
+def astar_open():
+    """A* de esquina a esquina en un mapa sin obstáculos"""
+    level = create_level(generate_tile_map(64, 64, 0.0, 0))
+    return path_benchmark(level, (1, 1), (62, 62))
+
+@benchmark("astar.maze_level_3", number=20)
+def astar_maze():
+    """A* en el laberinto del tercer nivel"""
+    from src.levels.level_loader import LevelLoader
+    level = LevelLoader().load_level(3)
+    return path_benchmark(level, (1, 1), (23, 17))
+
+@benchmark("astar.generated_256x256", repeat=5)
+def astar_large():
+    """A* en un mapa generado grande con un 25 % de paredes"""
+    tile_map = generate_tile_map(256, 256, 0.25, 11)
+    tile_map[1][1] = 0
+    tile_map[254][254] = 0
+    level = create_level(tile_map)
+    return path_benchmark(level, (1, 1), (254, 254))
+
+@benchmark("astar.cached_horde_level_3", number=20)
+def astar_cached_horde():
+    """50 enemigos en casillas cercanas piden camino hacia el mismo destino del tercer nivel"""
+    from src.ai.pathfinding import AStar
+    from src.levels.level_loader import LevelLoader
+    level = LevelLoader().load_level(3)
+    starts = [(x, y) for y in range(1, 8) for x in range(1, 12) if not level.is_tile_blocked(x, y)][:50]
+    pathfinder = AStar(level)
+    end_x, end_y = 23 * TILE_SIZE, 17 * TILE_SIZE
+    
+    def find_paths():
+        for x, y in starts:
+            pathfinder.find_path(x * TILE_SIZE, y * TILE_SIZE, end_x, end_y)
+    return find_paths
+
+# --- Actualización del juego ---
+
+def game_update_benchmark(num_enemies):
+    """Devuelve la operación que avanza un tick del juego con num_enemies zombies"""
+    from src.game import Game
+    from src.enemies.zombie import Zombie
+    from src.enemies.enemy_store import EnemyStore
+    from src.utils.controls import NullInput
+    
+    game = Game(pygame.display.get_surface(), 1, NullInput())
+    
+    # El jugador no puede morir durante la medición
+    game.player.health = 10 ** 9
+    
+    # Repartir los zombies por las casillas libres (pueden compartir casilla)
+    level = game.current_level
+    free_tiles = [(x, y) for y in range(level.height) for x in range(level.width)
+                  if not level.is_tile_blocked(x, y)]
+    game.enemies = []
+    game.enemy_store = EnemyStore()
+    for i in range(num_enemies):
+        tx, ty = free_tiles[game.rng.randrange(len(free_tiles))]
+        game.enemies.append(Zombie(tx * TILE_SIZE, ty * TILE_SIZE, level, game.flow_field, game.rng,
+                                   game.enemy_store))
+    
+    return game.update
+
+@benchmark("game.update_10_enemies", number=50)
+def game_update_10():
+    return game_update_benchmark(10)
+
+@benchmark("game.update_100_enemies", number=20)
+def game_update_100():
+    return game_update_benchmark(100)
+
+@benchmark("game.update_1000_enemies", number=5)
+def game_update_1000():
+    return game_update_benchmark(1000)
+
+def large_map_update_benchmark(num_enemies):
+    """
+    Devuelve la operación que avanza un tick con num_enemies zombies repartidos por
+    un mapa de 160x160 (la mayoría lejos del jugador, con menos nivel de detalle)
+    """
+    from src.game import Game
+    from src.enemies.zombie import Zombie
+    from src.enemies.enemy_store import EnemyStore
+    from src.ai.flow_field import FlowField
+    from src.utils.controls import NullInput
+    
+    game = Game(pygame.display.get_surface(), 1, NullInput())
+    game.player.health = 10 ** 9
+    
+    # Sustituir el nivel por uno grande con el jugador en el centro
+    tile_map = generate_tile_map(160, 160, 0.15, 160)
+    tile_map[80][80] = 0
+    level = create_level(tile_map)
+    game.current_level = level
+    game.player.x = game.player.y = 80 * TILE_SIZE
+    game.flow_field = FlowField(level)
+    game.update_flow_field()
+    
+    free_tiles = [(x, y) for y in range(level.height) for x in range(level.width)
+                  if not level.is_tile_blocked(x, y)]
+    game.enemies = []
+    game.enemy_store = EnemyStore()
+    for i in range(num_enemies):
+        tx, ty = free_tiles[game.rng.randrange(len(free_tiles))]
+        game.enemies.append(Zombie(tx * TILE_SIZE, ty * TILE_SIZE, level, game.flow_field, game.rng,
+                                   game.enemy_store))
+    
+    return game.update
+
+@benchmark("game.update_200_enemies_160x160", number=20)
+def game_update_large_200():
+    return large_map_update_benchmark(200)
+
+@benchmark("game.update_2000_enemies_160x160", number=5)
+def game_update_large_2000():
+    return large_map_update_benchmark(2000)
+
+@benchmark("game.update_300_near_20_far_starvation", number=5)
+def game_update_starvation():
+    """
+    300 zombies junto al jugador (más de los que caben en el presupuesto del
+    planificador) y 20 lejos, en un mapa abierto de 160x160. Antes de medir se
+    avanzan 800 ticks y se comprueba que los lejanos no se quedan sin actualizar.
+    """
+    from src.game import Game
+    from src.enemies.zombie import Zombie
+    from src.enemies.enemy_store import EnemyStore
+    from src.ai.flow_field import FlowField
+    from src.utils.controls import NullInput
+    
+    game = Game(pygame.display.get_surface(), 1, NullInput())
+    game.player.health = 10 ** 9
+    
+    level = create_level(generate_tile_map(160, 160, 0.0, 0))
+    game.current_level = level
+    game.player.x = game.player.y = 80 * TILE_SIZE
+    game.flow_field = FlowField(level)
+    game.update_flow_field()
+    
+    # Cercanos a menos de 8 casillas del jugador y lejanos en las esquinas del mapa
+    game.enemies = []
+    game.enemy_store = EnemyStore()
+    near_tiles = [(x, y) for y in range(72, 89) for x in range(72, 89)]
+    far_tiles = [(x, y) for x in (4, 155) for y in (4, 155)]
+    for i in range(300):
+        tx, ty = near_tiles[game.rng.randrange(len(near_tiles))]
+        game.enemies.append(Zombie(tx * TILE_SIZE, ty * TILE_SIZE, level, game.flow_field, game.rng,
+                                   game.enemy_store))
+    far_enemies = []
+    for i in range(20):
+        tx, ty = far_tiles[i % len(far_tiles)]
+        far_enemies.append(Zombie(tx * TILE_SIZE, ty * TILE_SIZE, level, game.flow_field, game.rng,
+                                  game.enemy_store))
+    game.enemies.extend(far_enemies)
+    
+    # Mayor espera (en ticks) de un enemigo lejano entre dos actualizaciones
+    ticks = 800
+    longest_wait = 0
+    ai_ticks = game.enemy_store.ai_ticks
+    for _ in range(ticks):
+        game.update()
+        longest_wait = max(longest_wait, max(ai_ticks[enemy.slot] for enemy in far_enemies))
+    
+    limit = 4 * game.ai_scheduler.tiers[-1][1]
+    if longest_wait > limit:
+        raise RuntimeError(f"Enemigos lejanos sin actualizar durante {longest_wait} ticks "
+                           f"(máximo {limit})")
+    return game.update
+
+def corridor_corner_benchmark(corridor_width):
+    """
+    Devuelve la operación que avanza un tick con 3 zombies que doblan la esquina de
+    un pasillo en L de corridor_width tiles hacia el jugador. Antes de medir se
+    comprueba que llegan hasta él (la dirección de grupo no los deja atascados).
+    """
+    from src.game import Game
+    from src.enemies.zombie import Zombie
+    from src.enemies.enemy_store import EnemyStore
+    from src.ai.flow_field import FlowField
+    from src.utils.controls import NullInput
+    
+    game = Game(pygame.display.get_surface(), 1, NullInput())
+    game.player.health = 10 ** 9
+    
+    # Pasillo horizontal en las filas 2.. y vertical en las columnas 11.., hasta el jugador
+    tile_map = [[1] * 16 for _ in range(16)]
+    for y in range(2, 2 + corridor_width):
+        for x in range(1, 11 + corridor_width):
+            tile_map[y][x] = 0
+    for y in range(2, 15):
+        for x in range(11, 11 + corridor_width):
+            tile_map[y][x] = 0
+    level = create_level(tile_map)
+    game.current_level = level
+    game.player.x = 11 * TILE_SIZE
+    game.player.y = 14 * TILE_SIZE
+    game.flow_field = FlowField(level)
+    game.update_flow_field()
+    
+    # Los zombies saben dónde está el jugador, pero no lo ven desde el otro tramo
+    game.enemies = []
+    game.enemy_store = EnemyStore()
+    for i in range(3):
+        zombie = Zombie((1 + i) * TILE_SIZE, 2 * TILE_SIZE, level, game.flow_field, game.rng, game.enemy_store)
+        zombie.state["last_known_player_pos"] = (game.player.x, game.player.y)
+        game.enemies.append(zombie)
+    
+    ticks = 600
+    for _ in range(ticks):
+        game.update()
+        if all(abs(enemy.x - game.player.x) + abs(enemy.y - game.player.y) < 3 * TILE_SIZE
+               for enemy in game.enemies):
+            break
+    else:
+        positions = [(round(enemy.x), round(enemy.y)) for enemy in game.enemies]
+        raise RuntimeError(f"Zombies atascados en la esquina tras {ticks} ticks: {positions}")
+    return game.update
+
+@benchmark("game.update_corridor_corner_1_tile", number=50)
+def game_update_corner_narrow():
+    return corridor_corner_benchmark(1)
+
+@benchmark("game.update_corridor_corner_2_tiles", number=50)
+def game_update_corner_wide():
+    return corridor_corner_benchmark(2)
+
+def remove_world(level, directory):
+    """Cierra un mundo por chunks generado para un benchmark y borra su directorio"""
+    level.close()
+    shutil.rmtree(directory, ignore_errors=True)
+
+@benchmark("game.update_20_outside_flow_window", number=20)
+def game_update_outside_flow_window():
+    """
+    20 zombies que persiguen al jugador desde fuera de la ventana del campo de
+    flujo en un mundo por chunks de 256x256, así que sus caminos los busca el
+    grupo de procesos. Antes de medir se comprueba que las peticiones llegan a
+    los procesos y que los caminos se entregan.
+    """
+    from src.game import Game
+    from src.enemies.zombie import Zombie
+    from src.enemies.enemy_store import EnemyStore
+    from src.ai.path_service import get_path_service
+    from src.levels.chunked_world import generate_world
+    from src.utils.controls import NullInput
+    
+    directory = tempfile.mkdtemp(prefix="zombieate_bench_")
+    world_path = os.path.join(directory, "world.zwld")
+    generate_world(world_path, 256, 256, seed=256, player_start=(128, 128))
+    
+    game = Game(pygame.display.get_surface(), 1, NullInput(), world_path)
+    game.player.health = 10 ** 9
+    level = game.current_level
+    weakref.finalize(game, remove_world, level, directory)
+    
+    # Zombies a unas 80 casillas del jugador (el campo de flujo cubre una ventana de 64)
+    player_x = int(game.player.x // TILE_SIZE)
+    player_y = int(game.player.y // TILE_SIZE)
+    far_tiles = [(player_x + dx, player_y + dy) for dx in (-80, 80) for dy in range(-10, 10)
+                 if not level.is_tile_blocked(player_x + dx, player_y + dy)]
+    game.enemies = []
+    game.enemy_store = EnemyStore()
+    for i in range(20):
+        tx, ty = far_tiles[game.rng.randrange(len(far_tiles))]
+        zombie = Zombie(tx * TILE_SIZE, ty * TILE_SIZE, level, game.flow_field, game.rng, game.enemy_store)
+        zombie.state["last_known_player_pos"] = (game.player.x, game.player.y)
+        game.enemies.append(zombie)
+    
+    # Esperar (con límite) a que los procesos arranquen y entreguen caminos
+    service = get_path_service(level)
+    timeout = 60.0
+    started = time.perf_counter()
+    while not any(service.log.ages):
+        if time.perf_counter() - started > timeout:
+            break
+        game.update()
+        time.sleep(0.001)
+    
+    if service.submitted == 0:
+        raise RuntimeError("Ninguna petición de camino ha llegado al grupo de procesos")
+    if not any(service.log.ages):
+        raise RuntimeError(f"Ningún camino entregado en {timeout:.0f} s "
+                           f"({service.submitted} peticiones enviadas)")
+    return game.update
+
+# --- Aparición de enemigos ---
+
+@benchmark("spawn.poisson_wave_200", number=5)
+def spawn_wave():
+    """Muestreo de 200 posiciones separadas en un mapa de 100x100 con un 30 % de paredes"""
+    from src.levels.free_cells import FreeCellIndex
+    tile_map = generate_tile_map(100, 100, 0.3, 3)
+    tile_map[1][1] = 0
+    level = create_level(tile_map)
+    free_cells = FreeCellIndex(level, (1, 1))
+    rng = random.Random(0)
+    return lambda: free_cells.sample(rng, 200, min_spacing=3, exclusions=[((1, 1), 5)])
+
+# --- Renderizado ---
+
+def level_render_benchmark(width, height):
+    """Devuelve la operación que dibuja un nivel completo de width x height tiles"""
+    level = create_level(generate_tile_map(width, height, 0.2, width))
+    surface = pygame.Surface((width * TILE_SIZE, height * TILE_SIZE))
+    return lambda: level.render(surface)
+
+@benchmark("level.render_25x20", number=50)
+def level_render_small():
+    return level_render_benchmark(25, 20)
+
+@benchmark("level.render_50x40", number=20)
+def level_render_medium():
+    return level_render_benchmark(50, 40)
+
+@benchmark("level.render_100x80", number=10)
+def level_render_large():
+    return level_render_benchmark(100, 80)
+
+@benchmark("level.build_background_50x40", number=5)
+def level_build_background():
+    """Composición completa del fondo pre-renderizado (primer frame de un nivel)"""
+    level = create_level(generate_tile_map(50, 40, 0.2, 50))
+    return level.build_background
+
+@benchmark("hud.render", number=100)
+def hud_render():
+    from src.game import Game
+    from src.utils.controls import NullInput
+    screen = pygame.display.get_surface()
+    game = Game(screen, 1, NullInput())
+    return lambda: game.hud.render(screen)
+
+# --- Arranque ---
+
+@benchmark("startup.main_to_first_frame", repeat=5)
+def startup():
+    """Arranque en frío: nuevo intérprete, main() y el primer frame del menú"""
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+    command = [sys.executable, os.path.join(ROOT_DIR, "main.py"), "--frames", "1"]
+    
+    def run():
+        subprocess.run(command, cwd=ROOT_DIR, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+    return run
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Script para empaquetar todos los assets en un único archivo (assets.pak)
+"""
+import os
+import glob
+from src.utils.asset_bundle import write_bundle, ASSET_BUNDLE_PATH, ASSET_TYPES
+
+def collect_assets():
+    """Lista los archivos de assets que se incluyen en el paquete"""
+    file_paths = []
+    for directory in ("assets/images", "assets/sounds", "assets/music", "assets/levels"):
+        for path in glob.glob(os.path.join(directory, "*")):
+            # Solo archivos con tipo conocido (se excluyen el manifiesto y otros ocultos)
+            name = os.path.basename(path)
+            if os.path.isfile(path) and not name.startswith(".") and os.path.splitext(name)[1].lower() in ASSET_TYPES:
+                file_paths.append(path)
+    return file_paths
+
+def build_bundle(bundle_path=ASSET_BUNDLE_PATH):
+    """Genera el paquete de assets"""
+    file_paths = collect_assets()
+    if not file_paths:
+        print("No se encontraron assets para empaquetar")
+        return
+    
+    size = write_bundle(bundle_path, file_paths)
+    print(f"Paquete generado: {bundle_path} ({len(file_paths)} archivos, {size / 1024:.0f} KB)")
+
+if __name__ == "__main__":
+    build_bundle()
+    
+    print("Proceso finalizado")
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Script para empaquetar los sprites del juego en un atlas de texturas
+"""
+import os
+import pygame
+from src.utils.atlas import build_atlas, ATLAS_INDEX_PATH
+from src.utils.constants import TILE_SIZE
+from src.utils.image_loader import DIRECTIONS, find_image_path, load_image
+
+def atlas_sprites():
+    """Lista de (nombre, tamaño) de los sprites que van al atlas, al tamaño en que se usan"""
+    tile_size = (TILE_SIZE, TILE_SIZE)
+    sprites = []
+    
+    # Jugador y enemigos (dos frames por dirección)
+    for prefix in ("player", "zombie", "mummy"):
+        for direction in DIRECTIONS:
+            for i in range(1, 3):
+                sprites.append((f"{prefix}_{direction}_{i}", tile_size))
+    
+    # Tiles del nivel
+    for name in ("floor", "wall", "bush", "water"):
+        sprites.append((name, tile_size))
+    
+    # Proyectil e ícono del HUD (el fondo del menú es demasiado grande y se carga aparte)
+    sprites.append(("water_projectile", (16, 16)))
+    sprites.append(("health_icon", (24, 24)))
+    
+    return sprites
+
+def build_sprite_atlas(index_path=ATLAS_INDEX_PATH):
+    """Carga cada sprite disponible y genera las hojas del atlas y su índice"""
+    frames = {}
+    for name, size in atlas_sprites():
+        path = find_image_path(name)
+        if path is None:
+            print(f"No se encontró ninguna imagen para: {name}")
+            continue
+        frames[(name, size)] = load_image(path, size)
+    
+    if not frames:
+        print("No hay sprites para empaquetar")
+        return
+    
+    sheet_paths = build_atlas(frames, index_path)
+    print(f"Atlas generado: {len(frames)} frames en {len(sheet_paths)} hoja(s) ({', '.join(sheet_paths)})")
+
+if __name__ == "__main__":
+    # Inicializar pygame (necesario para algunas operaciones)
+    pygame.init()
+    
+    if not os.path.exists("assets/images"):
+        os.makedirs("assets/images", exist_ok=True)
+    
+    build_sprite_atlas()
+    
+    print("Proceso finalizado")
@@ -4,42 +4,158 @@ Script para convertir archivos SVG a PNG
 """
 import os
 import glob
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 import pygame
 from src.utils.image_loader import convert_svg_to_png
 
-def convert_all_svg_to_png():
-    """Convierte todos los archivos SVG en la carpeta assets/images a PNG"""
+# Manifiesto con el hash de cada SVG ya convertido (junto a las imágenes)
+MANIFEST_PATH = "assets/images/.build_manifest.json"
+
+def file_hash(file_path):
+    """Calcula el hash SHA-1 del contenido de un archivo"""
+    digest = hashlib.sha1()
+    with open(file_path, "rb") as source:
+        for chunk in iter(lambda: source.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path=MANIFEST_PATH):
+    """Carga el manifiesto de la última conversión (vacío si no existe o está dañado)"""
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest, manifest_path=MANIFEST_PATH):
+    """Guarda el manifiesto"""
+    with open(manifest_path, "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+
+def is_up_to_date(svg_path, png_path, size, entry):
+    """
+    Comprueba si el PNG de un SVG está al día según su entrada del manifiesto.
+    Si la fecha y el tamaño del SVG no han cambiado no hace falta leerlo;
+    si han cambiado, se compara el hash del contenido (y, si coincide, se
+    actualiza la fecha guardada en la entrada).
+    """
+    if entry is None or not os.path.exists(png_path):
+        return False
+    if entry.get("size") != (list(size) if size else None):
+        return False
+    
+    stat = os.stat(svg_path)
+    if entry.get("mtime_ns") == stat.st_mtime_ns and entry.get("bytes") == stat.st_size:
+        return True
+    
+    if entry.get("hash") != file_hash(svg_path):
+        return False
+    entry["mtime_ns"] = stat.st_mtime_ns
+    entry["bytes"] = stat.st_size
+    return True
+
+def make_entry(svg_path, size):
+    """Crea la entrada del manifiesto para un SVG recién convertido"""
+    stat = os.stat(svg_path)
+    return {
+        "hash": file_hash(svg_path),
+        "size": list(size) if size else None,
+        "mtime_ns": stat.st_mtime_ns,
+        "bytes": stat.st_size
+    }
+
+def convert_job(job):
+    """Convierte un SVG en un proceso del pool. Retorna (ruta SVG, éxito)"""
+    svg_path, png_path, size = job
+    return svg_path, convert_svg_to_png(svg_path, png_path, size)
+
+def convert_all_svg_to_png(force=False, jobs=None, size=None):
+    """
+    Convierte a PNG los archivos SVG de la carpeta assets/images que hayan
+    cambiado desde la última conversión, repartiéndolos entre varios procesos.
+    
+    Args:
+        force (bool): Si es True, convierte todos los archivos aunque estén al día
+        jobs (int, optional): Número de procesos (por defecto, uno por núcleo)
+        size (tuple, optional): Tamaño al que escalar las imágenes (ancho, alto)
+    """
     # Asegurarse de que el directorio existe
     if not os.path.exists("assets/images"):
         os.makedirs("assets/images", exist_ok=True)
     
     # Buscar todos los archivos SVG
-    svg_files = glob.glob("assets/images/*.svg")
+    svg_files = sorted(glob.glob("assets/images/*.svg"))
     
     if not svg_files:
         print("No se encontraron archivos SVG en assets/images")
         return
     
-    print(f"Encontrados {len(svg_files)} archivos SVG para convertir")
+    print(f"Encontrados {len(svg_files)} archivos SVG")
     
-    # Convertir cada archivo SVG a PNG
-    success_count = 0
+    # Descartar los que ya están convertidos y no han cambiado
+    manifest = {} if force else load_manifest()
+    pending = []
     for svg_path in svg_files:
         png_path = svg_path.replace(".svg", ".png")
-        
-        if convert_svg_to_png(svg_path, png_path):
+        key = os.path.basename(svg_path)
+        if not is_up_to_date(svg_path, png_path, size, manifest.get(key)):
+            pending.append((svg_path, png_path, size))
+    
+    if not pending:
+        # Guardar las fechas actualizadas de los archivos que no habían cambiado de contenido
+        if manifest != load_manifest():
+            save_manifest(manifest)
+        print("Todos los archivos PNG están al día")
+        return
+    
+    print(f"Convirtiendo {len(pending)} archivos SVG")
+    
+    # Convertir en paralelo (con un solo archivo o un solo proceso no compensa crear el pool)
+    if len(pending) == 1 or jobs == 1:
+        results = [convert_job(job) for job in pending]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(convert_job, pending))
+    
+    # Actualizar el manifiesto solo con las conversiones correctas
+    success_count = 0
+    for svg_path, success in results:
+        if success:
             success_count += 1
-            print(f"Convertido: {svg_path} -> {png_path}")
+            manifest[os.path.basename(svg_path)] = make_entry(svg_path, size)
+            print(f"Convertido: {svg_path} -> {svg_path.replace('.svg', '.png')}")
         else:
             print(f"Error al convertir {svg_path}")
     
-    print(f"Conversión completada. {success_count}/{len(svg_files)} archivos convertidos exitosamente.")
+    # Olvidar los SVG que ya no existen
+    existing = {os.path.basename(svg_path) for svg_path in svg_files}
+    for key in list(manifest):
+        if key not in existing:
+            del manifest[key]
+    
+    save_manifest(manifest)
+    
+    print(f"Conversión completada. {success_count}/{len(pending)} archivos convertidos exitosamente.")
+
+def parse_args(argv=None):
+    """Procesa los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Convierte los SVG de assets/images a PNG")
+    parser.add_argument("--force", action="store_true",
+                        help="Convierte todos los archivos aunque estén al día")
+    parser.add_argument("--jobs", type=int, default=None,
+                        help="Número de procesos (por defecto, uno por núcleo)")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
+    args = parse_args()
+    
     # Inicializar pygame (necesario para algunas operaciones)
     pygame.init()
     
     # Convertir archivos
-    convert_all_svg_to_png()
+    convert_all_svg_to_png(args.force, args.jobs)
     
     print("Proceso finalizado") 
\ No newline at end of file
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Script para generar un mundo aleatorio dividido en chunks (para main.py --world)
+"""
+import argparse
+import os
+import time
+from src.levels.chunked_world import generate_world, CHUNK_SIZE
+
+def main():
+    """Función principal para generar un mundo"""
+    parser = argparse.ArgumentParser(description="Genera un mundo aleatorio por chunks")
+    parser.add_argument("output", help="Ruta del archivo de mundo a crear")
+    parser.add_argument("--width", type=int, default=2000, help="Ancho del mapa en tiles")
+    parser.add_argument("--height", type=int, default=2000, help="Alto del mapa en tiles")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--wall-chance", type=float, default=0.15,
+                        help="Probabilidad de que un tile interior sea pared")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Tamaño de cada chunk en tiles")
+    args = parser.parse_args()
+    
+    start_time = time.time()
+    generate_world(args.output, args.width, args.height, args.seed, args.wall_chance,
+                   chunk_size=args.chunk_size)
+    elapsed = time.time() - start_time
+    
+    size_kb = os.path.getsize(args.output) / 1024
+    print(f"Mundo de {args.width}x{args.height} tiles guardado en {args.output} "
+          f"({size_kb:.0f} KB, {elapsed:.2f} s)")
+
+if __name__ == "__main__":
+    main()
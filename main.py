@@ -1,10 +1,109 @@
-import pygame
+import argparse
+import os
 import sys
+import time
+import pygame
 from src.game import Game
 from src.ui.menu import Menu
 from src.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, TITLE, FPS
+from src.utils.profiler import profiler
+from src.utils.controls import KeyboardInput, NullInput
+from src.utils.replay import InputRecorder, InputReplay
 
-def main():
+def parse_args(argv=None):
+    """Procesa los argumentos de línea de comandos"""
+    parser = argparse.ArgumentParser(description=TITLE)
+    parser.add_argument("--headless", action="store_true",
+                        help="Simula el juego sin ventana, sin audio y sin límite de FPS")
+    parser.add_argument("--ticks", type=int, default=FPS * 60,
+                        help="Número de actualizaciones a simular en modo headless")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Semilla para el generador de números aleatorios")
+    parser.add_argument("--profile-csv", metavar="RUTA", default=None,
+                        help="Activa el profiler y exporta sus estadísticas a un CSV al salir")
+    parser.add_argument("--frames", type=int, default=None,
+                        help="Sale tras dibujar este número de frames (para medir el arranque)")
+    parser.add_argument("--world", metavar="RUTA", default=None,
+                        help="Juega en un mundo por chunks (creado con generate_world.py) en lugar del nivel aleatorio")
+    replay_group = parser.add_mutually_exclusive_group()
+    replay_group.add_argument("--record", metavar="RUTA", default=None,
+                              help="Graba la semilla y la entrada de cada tick de la partida")
+    replay_group.add_argument("--replay", metavar="RUTA", default=None,
+                              help="Reproduce una partida grabada (en modo headless, tantos ticks como tenga)")
+    args = parser.parse_args(argv)
+    
+    if args.headless and args.record:
+        parser.error("--record necesita el teclado y no se puede usar con --headless")
+    
+    return args
+
+def run_headless(ticks, seed=None, profile_csv=None, replay_path=None, world_path=None):
+    """
+    Ejecuta la simulación sin ventana ni audio, tan rápido como permita la CPU.
+    Cada llamada a Game.update() equivale a un paso fijo de 1/FPS segundos.
+    Con una repetición se simulan exactamente sus ticks con su semilla y su entrada.
+    """
+    # Usar los drivers vacíos de SDL (sin pantalla ni audio)
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ["SDL_AUDIODRIVER"] = "dummy"
+    
+    # Inicializar Pygame sin mezclador
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    
+    if replay_path:
+        replay = InputReplay(replay_path)
+        ticks = len(replay)
+        game = Game(screen, replay.seed, replay, world_path)
+    else:
+        replay = None
+        game = Game(screen, seed, NullInput(), world_path)
+    
+    if profile_csv:
+        profiler.enabled = True
+    
+    # Estadísticas de la simulación
+    games_over = 0
+    victories = 0
+    
+    start_time = time.perf_counter()
+    for _ in range(ticks):
+        with profiler.scope("loop.update"):
+            game.update()
+        
+        # Reiniciar la partida al terminar para seguir simulando
+        # (en una repetición los reinicios vienen en la propia entrada grabada)
+        if (game.game_over or game.victory) and replay is None:
+            if game.game_over:
+                games_over += 1
+            else:
+                victories += 1
+            game.reset_game()
+        profiler.end_frame()
+    elapsed = time.perf_counter() - start_time
+    
+    ticks_per_second = ticks / elapsed if elapsed > 0 else float("inf")
+    print(f"Semilla: {game.seed}")
+    print(f"Ticks simulados: {ticks}")
+    print(f"Tiempo total: {elapsed:.3f} s ({ticks_per_second:.0f} ticks/s)")
+    print(f"Derrotas: {games_over} - Victorias: {victories}")
+    print(f"Enemigos restantes: {len(game.enemies)} - Puntuación: {game.score}")
+    
+    if profile_csv:
+        profiler.export_csv(profile_csv)
+        print(f"Estadísticas del profiler guardadas en {profile_csv}")
+    
+    game.close_level()
+    pygame.quit()
+    return 0
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.headless:
+        sys.exit(run_headless(args.ticks, args.seed, args.profile_csv, args.replay, args.world))
+    
     # Inicializar Pygame
     pygame.init()
     pygame.mixer.init()
@@ -14,44 +113,93 @@ def main():
     pygame.display.set_caption(TITLE)
     clock = pygame.time.Clock()
     
+    # Fuente de entrada: teclado, teclado grabado o una repetición
+    recorder = None
+    replay = None
+    seed = args.seed
+    if args.replay:
+        replay = InputReplay(args.replay)
+        input_source = replay
+        seed = replay.seed
+    elif args.record:
+        recorder = InputRecorder(KeyboardInput())
+        input_source = recorder
+    else:
+        input_source = KeyboardInput()
+    
     # Crear instancias del juego y el menú
-    game = Game(screen)
+    game = Game(screen, seed, input_source, args.world)
     menu = Menu(screen, game)
     
-    # Estado actual (menú o juego)
+    if args.profile_csv:
+        profiler.enabled = True
+    
+    # Estado actual (menú o juego). Al grabar o reproducir se empieza directamente
+    # en la partida ya creada con la semilla, y volver al menú termina la sesión
     current_state = "menu"
+    session_active = recorder is not None or replay is not None
+    if session_active:
+        current_state = "game"
+        game.play_level_music()
     
     # Bucle principal
     running = True
+    frames = 0
     while running:
         # Manejo de eventos
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            # Pasar eventos al estado actual
-            if current_state == "menu":
-                new_state = menu.handle_event(event)
-                if new_state:
-                    current_state = new_state
-            elif current_state == "game":
-                new_state = game.handle_event(event)
-                if new_state:
-                    current_state = new_state
+        with profiler.scope("loop.events"):
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    running = False
+                
+                # Pasar eventos al estado actual
+                if current_state == "menu":
+                    new_state = menu.handle_event(event)
+                    if new_state:
+                        current_state = new_state
+                elif current_state == "game":
+                    new_state = game.handle_event(event)
+                    if new_state:
+                        current_state = new_state
+        
+        if session_active and current_state != "game":
+            break
+        if replay is not None and replay.finished:
+            break
         
         # Actualizar y renderizar el estado actual
+        dirty_rects = None
         if current_state == "menu":
             menu.update()
             menu.render()
         elif current_state == "game":
-            game.update()
-            game.render()
+            with profiler.scope("loop.update"):
+                game.update()
+            with profiler.scope("loop.render"):
+                dirty_rects = game.render()
         
-        # Actualizar la pantalla
-        pygame.display.flip()
+        # Actualizar la pantalla (solo las zonas modificadas si es posible)
+        with profiler.scope("loop.display"):
+            if dirty_rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(dirty_rects)
         clock.tick(FPS)
+        profiler.end_frame()
+        
+        frames += 1
+        if args.frames is not None and frames >= args.frames:
+            break
+    
+    if args.profile_csv:
+        profiler.export_csv(args.profile_csv)
+    
+    if recorder is not None:
+        recorder.save(args.record, game.seed, game.path_log.to_bytes())
+        print(f"Partida grabada en {args.record} ({len(recorder.inputs)} ticks, semilla {game.seed})")
     
     # Limpiar y salir
+    game.close_level()
     pygame.quit()
     sys.exit()
 
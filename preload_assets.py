@@ -3,12 +3,20 @@
 Script para precargar y convertir todos los assets antes de iniciar el juego
 """
 import os
+import argparse
 import pygame
 import time
 from convert_svg_to_png import convert_all_svg_to_png
+from build_atlas import build_sprite_atlas
+from build_asset_bundle import build_bundle
 
 def main():
     """Función principal para precargar assets"""
+    parser = argparse.ArgumentParser(description="Precarga y convierte los assets del juego")
+    parser.add_argument("--bundle", action="store_true",
+                        help="Empaqueta además todos los assets en un único archivo (assets.pak)")
+    args = parser.parse_args()
+    
     print("Iniciando precarga de assets...")
     start_time = time.time()
     
@@ -19,10 +27,19 @@ def main():
     print("\n=== Convirtiendo SVG a PNG ===")
     convert_all_svg_to_png()
     
+    # Empaquetar los sprites en el atlas de texturas
+    print("\n=== Generando atlas de texturas ===")
+    build_sprite_atlas()
+    
     # Verificar que todos los archivos necesarios existen
     print("\n=== Verificando archivos de imagen ===")
     check_image_files()
     
+    # Empaquetar los assets (opcional: el juego usa el paquete si existe)
+    if args.bundle:
+        print("\n=== Empaquetando assets ===")
+        build_bundle()
+    
     # Mostrar tiempo total
     elapsed_time = time.time() - start_time
     print(f"\nPrecarga completada en {elapsed_time:.2f} segundos")
@@ -41,17 +58,16 @@ def check_image_files():
     
     missing_files = []
     
+    # Listar el directorio una sola vez y buscar los prefijos en memoria
+    try:
+        image_files = [name for name in os.listdir("assets/images")
+                       if name.endswith((".png", ".svg"))]
+    except OSError:
+        image_files = []
+    
     for prefix in prefixes:
         # Verificar si existe al menos un archivo con este prefijo (PNG o SVG)
-        found = False
-        for ext in [".png", ".svg"]:
-            pattern = f"assets/images/{prefix}*{ext}"
-            import glob
-            if glob.glob(pattern):
-                found = True
-                break
-        
-        if not found:
+        if not any(name.startswith(prefix) for name in image_files):
             missing_files.append(prefix)
     
     if missing_files:
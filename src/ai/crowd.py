@@ -0,0 +1,213 @@
+import math
+from itertools import chain
+from src.utils.constants import TILE_SIZE
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy es opcional: sin él, la cuadrícula de vecinos se llena enemigo a enemigo
+    np = None
+
+# Ángulo áureo: reparte direcciones distintas a los enemigos que ocupan exactamente el mismo punto
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+# Separación entre las coordenadas X e Y de una celda al combinarlas en una sola clave entera
+CELL_KEY_STRIDE = 1 << 32
+
+class CrowdSteering:
+    """
+    Dirección de grupo para las hordas de enemigos. Corrige los movimientos
+    pendientes del almacén (antes de resolve_moves) sumando a la dirección
+    hacia su destino tres fuerzas:
+    
+    - separación: aleja a cada enemigo de los que tiene demasiado cerca
+    - cohesión: lo acerca un poco al centro de sus vecinos
+    - evitación de obstáculos: lo aparta de la pared que tiene justo delante
+    
+    Los vecinos se buscan en una cuadrícula uniforme con celdas del tamaño del
+    radio de vecindad, de modo que cada enemigo solo revisa las 9 celdas que
+    le rodean y el coste total crece de forma lineal con el número de enemigos.
+    """
+    def __init__(self, radius=TILE_SIZE * 2, personal_space=TILE_SIZE, separation=1.5,
+                 cohesion=0.2, avoidance=1.0, look_ahead=TILE_SIZE, max_neighbors=12, min_progress=0.5):
+        # Radio de vecindad (cohesión) y distancia mínima deseada entre enemigos (separación)
+        self.radius = radius
+        self.personal_space = personal_space
+        
+        # Vecinos que se tienen en cuenta como mucho (acota el coste en las zonas muy pobladas)
+        self.max_neighbors = max_neighbors
+        
+        # Peso de cada fuerza respecto a la dirección hacia el destino (que pesa 1)
+        self.separation = separation
+        self.cohesion = cohesion
+        self.avoidance = avoidance
+        
+        # Distancia por delante del enemigo a la que se buscan paredes
+        self.look_ahead = look_ahead
+        
+        # Avance mínimo hacia el destino que se conserva tras sumar las fuerzas (sobre 1)
+        self.min_progress = min_progress
+        
+        # Cuadrícula de vecinos: celda -> posiciones en el almacén (se rehace en cada tick)
+        self.cells = {}
+        
+        # Estadísticas del último tick
+        self.steered = 0
+    
+    def build_grid(self, store, active):
+        """
+        Reparte en la cuadrícula de vecinos los centros de los enemigos que pueden
+        ser vecinos de los que se mueven (con NumPy, solo los de las celdas que
+        rodean a estos; sin él, todos)
+        """
+        if store.vectorized:
+            self.build_grid_numpy(store, active)
+            return
+        
+        cells = {}
+        size = self.radius
+        xs, ys = store.x, store.y
+        widths, heights = store.width, store.height
+        for slot in range(store.count):
+            key = (int((xs[slot] + widths[slot] / 2) // size), int((ys[slot] + heights[slot] / 2) // size))
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [slot]
+            else:
+                cell.append(slot)
+        self.cells = cells
+    
+    def build_grid_numpy(self, store, active):
+        """Versión vectorizada de build_grid"""
+        size = self.radius
+        cell_x = np.floor_divide(store.view("x") + store.view("width") / 2, size).astype(np.int64)
+        cell_y = np.floor_divide(store.view("y") + store.view("height") / 2, size).astype(np.int64)
+        
+        # Una clave entera por celda; se buscan los enemigos de las celdas vecinas de los activos
+        keys = cell_x * CELL_KEY_STRIDE + cell_y
+        offsets = np.array([dx * CELL_KEY_STRIDE + dy for dx in (-1, 0, 1) for dy in (-1, 0, 1)], dtype=np.int64)
+        near = np.unique(keys[active][:, None] + offsets)
+        candidates = np.flatnonzero(np.isin(keys, near))
+        
+        cells = {}
+        for slot, cx, cy in zip(candidates.tolist(), cell_x[candidates].tolist(), cell_y[candidates].tolist()):
+            cell = cells.get((cx, cy))
+            if cell is None:
+                cells[(cx, cy)] = [slot]
+            else:
+                cell.append(slot)
+        self.cells = cells
+    
+    def steer(self, store, level):
+        """Corrige la dirección de los movimientos pendientes de los enemigos del almacén"""
+        self.steered = 0
+        moving = store.moving
+        active = [slot for slot in range(store.count) if moving[slot]]
+        if not active:
+            return
+        
+        self.build_grid(store, active)
+        for slot in active:
+            self.steer_enemy(store, level, slot)
+        self.steered = len(active)
+    
+    def steer_enemy(self, store, level, slot):
+        """Corrige el movimiento pendiente de un enemigo"""
+        xs, ys = store.x, store.y
+        widths, heights = store.width, store.height
+        x = xs[slot]
+        y = ys[slot]
+        center_x = x + widths[slot] / 2
+        center_y = y + heights[slot] / 2
+        
+        # Dirección hacia el destino
+        dx = store.target_x[slot] - x
+        dy = store.target_y[slot] - y
+        distance = math.sqrt(dx * dx + dy * dy)
+        if distance > 0:
+            goal_x = dx / distance
+            goal_y = dy / distance
+        else:
+            goal_x = goal_y = 0.0
+        steer_x = goal_x
+        steer_y = goal_y
+        
+        # Separación y cohesión con los vecinos de las 9 celdas que rodean al enemigo
+        radius = self.radius
+        radius_sq = radius * radius
+        space = self.personal_space
+        space_sq = space * space
+        separation_x = separation_y = 0.0
+        offset_x = offset_y = 0.0
+        neighbors = 0
+        max_neighbors = self.max_neighbors
+        cell_x = int(center_x // radius)
+        cell_y = int(center_y // radius)
+        cells = self.cells
+        nearby = chain.from_iterable(cells.get((cx, cy), ()) for cy in range(cell_y - 1, cell_y + 2)
+                                     for cx in range(cell_x - 1, cell_x + 2))
+        for other in nearby:
+            if other == slot:
+                continue
+            ox = xs[other] + widths[other] / 2 - center_x
+            oy = ys[other] + heights[other] / 2 - center_y
+            distance_sq = ox * ox + oy * oy
+            if distance_sq >= radius_sq:
+                continue
+            
+            neighbors += 1
+            offset_x += ox
+            offset_y += oy
+            if distance_sq < space_sq:
+                # Empuje proporcional a lo que invade el espacio personal
+                if distance_sq > 0:
+                    other_distance = math.sqrt(distance_sq)
+                    push = (space - other_distance) / space / other_distance
+                    separation_x -= ox * push
+                    separation_y -= oy * push
+                else:
+                    # Enemigos apilados: cada uno sale en una dirección distinta
+                    angle = slot * GOLDEN_ANGLE
+                    separation_x += math.cos(angle)
+                    separation_y += math.sin(angle)
+            
+            if neighbors >= max_neighbors:
+                break
+        
+        if neighbors:
+            steer_x += separation_x * self.separation + offset_x / neighbors / radius * self.cohesion
+            steer_y += separation_y * self.separation + offset_y / neighbors / radius * self.cohesion
+        
+        # Evitar la pared que haya justo delante: alejarse del centro de esa casilla.
+        # Si el destino está más cerca que la sonda (p. ej. el centro de la casilla de
+        # una esquina), la pared queda detrás de él y no estorba. Solo se suma la parte
+        # del empuje perpendicular a la dirección del destino: nunca frena ni hace retroceder
+        if distance > self.look_ahead:
+            tile_x = int((center_x + goal_x * self.look_ahead) // TILE_SIZE)
+            tile_y = int((center_y + goal_y * self.look_ahead) // TILE_SIZE)
+            if level.is_tile_blocked(tile_x, tile_y):
+                away_x = center_x - (tile_x + 0.5) * TILE_SIZE
+                away_y = center_y - (tile_y + 0.5) * TILE_SIZE
+                along = away_x * goal_x + away_y * goal_y
+                away_x -= along * goal_x
+                away_y -= along * goal_y
+                away = math.sqrt(away_x * away_x + away_y * away_y)
+                if away > 0:
+                    steer_x += away_x / away * self.avoidance
+                    steer_y += away_y / away * self.avoidance
+        
+        # Las fuerzas de grupo pueden desviar el paso pero no anular el avance hacia el
+        # destino: si no, dos enemigos que van al mismo punto de paso (p. ej. en una
+        # esquina) se frenan el uno al otro y ninguno llega a alcanzarlo
+        along = steer_x * goal_x + steer_y * goal_y
+        if distance > 0 and along < self.min_progress:
+            steer_x += (self.min_progress - along) * goal_x
+            steer_y += (self.min_progress - along) * goal_y
+        
+        # Nuevo destino en la dirección corregida (el paso lo sigue limitando la velocidad)
+        length = math.sqrt(steer_x * steer_x + steer_y * steer_y)
+        if length < 1e-6:
+            return
+        reach = max(distance, 1.0) / length
+        store.target_x[slot] = x + steer_x * reach
+        store.target_y[slot] = y + steer_y * reach
@@ -0,0 +1,164 @@
+from array import array
+from collections import deque
+from src.utils.constants import TILE_SIZE
+
+class FlowField:
+    """
+    Campo de flujo compartido por todos los enemigos.
+    Guarda la distancia BFS de cada casilla a la casilla del jugador y, para cada
+    casilla, la siguiente casilla en el camino más corto hacia él. Solo se
+    recalcula cuando el jugador cambia de casilla.
+    
+    En mapas divididos en chunks el campo solo cubre una ventana de casillas
+    centrada en el jugador; fuera de ella no hay camino (los enemigos recurren
+    a A* con el servicio de caminos).
+    """
+    # Lado de la ventana (en casillas) en mapas divididos en chunks: cubre de sobra
+    # la zona de aparición de los enemigos y mantiene cada BFS por debajo de un frame
+    WINDOW_SIZE = 64
+    
+    def __init__(self, level, window_size=None):
+        self.level = level
+        self.width = level.width
+        self.height = level.height
+        self.window_size = window_size or self.WINDOW_SIZE
+        
+        # Casilla objetivo actual (la del jugador) y número de recálculos
+        self.target = None
+        self.version = 0
+        
+        # Cuadrícula plana de casillas bloqueadas
+        self.rebuild_grid()
+    
+    def rebuild_grid(self):
+        """Prepara la máscara plana de casillas bloqueadas del nivel"""
+        # Compartir la máscara de sólidos de la cuadrícula del nivel (sin copiarla);
+        # si el nivel no tiene cuadrícula, construir una copia tile a tile
+        grid = getattr(self.level, "grid", None)
+        self.windowed = grid is not None and getattr(grid, "solid", None) is None
+        self.origin_x = 0
+        self.origin_y = 0
+        if self.windowed:
+            # Mapa por chunks: la máscara de la ventana se copia en move_window
+            self.width = min(self.window_size, self.level.width)
+            self.height = min(self.window_size, self.level.height)
+            self.blocked = bytearray(b"\x01") * (self.width * self.height)
+            self.grid_version = None
+        elif grid is not None:
+            self.blocked = grid.solid
+        else:
+            self.blocked = bytearray(self.width * self.height)
+            for ty in range(self.height):
+                for tx in range(self.width):
+                    if self.level.is_tile_blocked(tx, ty):
+                        self.blocked[ty * self.width + tx] = 1
+        
+        self.distances = array('i', [-1]) * (self.width * self.height)
+        self.next_tile = array('i', [-1]) * (self.width * self.height)
+        self.target = None
+    
+    def update(self, target_x, target_y):
+        """
+        Actualiza el campo hacia la posición (en píxeles) del jugador.
+        Retorna True si el campo se ha recalculado.
+        """
+        target = (int(target_x // TILE_SIZE), int(target_y // TILE_SIZE))
+        if self.windowed:
+            # La ventana se copia de nuevo si el jugador cambia de casilla o el mapa cambia
+            if target == self.target and self.level.grid.version == self.grid_version:
+                return False
+            self.move_window(target)
+        elif target == self.target:
+            return False
+        
+        self.target = target
+        self.compute(target)
+        return True
+    
+    def move_window(self, target):
+        """Centra la ventana en la casilla objetivo y copia su máscara de sólidos (mapas por chunks)"""
+        grid = self.level.grid
+        self.origin_x = max(0, min(target[0] - self.width // 2, self.level.width - self.width))
+        self.origin_y = max(0, min(target[1] - self.height // 2, self.level.height - self.height))
+        self.blocked = grid.copy_solid(self.origin_x, self.origin_y, self.width, self.height)
+        self.grid_version = grid.version
+    
+    def compute(self, target):
+        """Calcula distancias y siguientes pasos con una BFS desde el objetivo"""
+        width = self.width
+        height = self.height
+        size = width * height
+        blocked = self.blocked
+        distances = array('i', [-1]) * size
+        next_tile = array('i', [-1]) * size
+        self.version += 1
+        
+        tx = target[0] - self.origin_x
+        ty = target[1] - self.origin_y
+        if not (0 <= tx < width and 0 <= ty < height) or blocked[ty * width + tx]:
+            self.distances = distances
+            self.next_tile = next_tile
+            return
+        
+        start = ty * width + tx
+        distances[start] = 0
+        next_tile[start] = start
+        queue = deque([start])
+        
+        while queue:
+            current = queue.popleft()
+            next_distance = distances[current] + 1
+            x = current % width
+            
+            # Vecinos: arriba, derecha, abajo, izquierda
+            for neighbor, valid in (
+                (current - width, current >= width),
+                (current + 1, x < width - 1),
+                (current + width, current < size - width),
+                (current - 1, x > 0),
+            ):
+                if valid and distances[neighbor] < 0 and not blocked[neighbor]:
+                    distances[neighbor] = next_distance
+                    # Desde el vecino, el siguiente paso hacia el jugador es la casilla actual
+                    next_tile[neighbor] = current
+                    queue.append(neighbor)
+        
+        self.distances = distances
+        self.next_tile = next_tile
+    
+    def get_distance(self, tile_x, tile_y):
+        """Devuelve la distancia en casillas hasta el jugador, o -1 si no es alcanzable"""
+        tile_x -= self.origin_x
+        tile_y -= self.origin_y
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.distances[tile_y * self.width + tile_x]
+        return -1
+    
+    def covers(self, x, y):
+        """Comprueba si una posición (en píxeles) está dentro de la zona que cubre el campo"""
+        tile_x = int(x // TILE_SIZE) - self.origin_x
+        tile_y = int(y // TILE_SIZE) - self.origin_y
+        return 0 <= tile_x < self.width and 0 <= tile_y < self.height
+    
+    def get_path_step(self, x, y):
+        """
+        Devuelve el siguiente tramo del camino desde (x, y) en píxeles: el centro
+        de la casilla actual y el centro de la siguiente casilla hacia el jugador.
+        Retorna una lista vacía si el jugador no es alcanzable desde (x, y).
+        """
+        tile_x = int(x // TILE_SIZE) - self.origin_x
+        tile_y = int(y // TILE_SIZE) - self.origin_y
+        if not (0 <= tile_x < self.width and 0 <= tile_y < self.height):
+            return []
+        
+        index = tile_y * self.width + tile_x
+        next_index = self.next_tile[index]
+        if next_index < 0:
+            return []
+        
+        path = [((tile_x + self.origin_x) * TILE_SIZE + TILE_SIZE // 2,
+                 (tile_y + self.origin_y) * TILE_SIZE + TILE_SIZE // 2)]
+        if next_index != index:
+            path.append(((next_index % self.width + self.origin_x) * TILE_SIZE + TILE_SIZE // 2,
+                         (next_index // self.width + self.origin_y) * TILE_SIZE + TILE_SIZE // 2))
+        return path
@@ -0,0 +1,96 @@
+from src.utils.constants import TILE_SIZE
+
+def trace_line(grid, from_tile, to_tile):
+    """
+    Recorre exactamente los tiles que atraviesa el segmento entre los centros
+    de dos casillas (DDA sobre la cuadrícula). Retorna False en cuanto encuentra
+    un tile sólido. Si el segmento pasa justo por una esquina, basta con que
+    uno de los dos tiles que la forman sea sólido para bloquear la visión.
+    """
+    x, y = from_tile
+    end_x, end_y = to_tile
+    dx = abs(end_x - x)
+    dy = abs(end_y - y)
+    step_x = 1 if end_x > x else -1
+    step_y = 1 if end_y > y else -1
+    
+    remaining = dx + dy
+    error = dx - dy
+    dx *= 2
+    dy *= 2
+    
+    if grid.is_tile_blocked(x, y):
+        return False
+    
+    while remaining > 0:
+        if error > 0:
+            x += step_x
+            error -= dy
+            remaining -= 1
+        elif error < 0:
+            y += step_y
+            error += dx
+            remaining -= 1
+        else:
+            # Cruce exacto por una esquina: comprobar los dos tiles laterales
+            if grid.is_tile_blocked(x + step_x, y) or grid.is_tile_blocked(x, y + step_y):
+                return False
+            x += step_x
+            y += step_y
+            error += dx - dy
+            remaining -= 2
+        
+        if grid.is_tile_blocked(x, y):
+            return False
+    
+    return True
+
+class VisibilityCache:
+    """
+    Caché de línea de visión entre casillas, asociada a la cuadrícula de un nivel.
+    Se vacía automáticamente cuando cambia la versión del mapa.
+    """
+    def __init__(self, grid, max_entries=65536):
+        self.grid = grid
+        self.max_entries = max_entries
+        self.version = grid.version
+        self.cache = {}
+    
+    def clear(self):
+        """Vacía la caché"""
+        self.cache.clear()
+        self.version = self.grid.version
+    
+    def is_visible(self, from_tile, to_tile):
+        """Comprueba si hay línea de visión entre dos casillas"""
+        if self.grid.version != self.version:
+            self.clear()
+        
+        # La visión es simétrica: se guarda y se traza siempre en el mismo sentido
+        key = (from_tile, to_tile) if from_tile <= to_tile else (to_tile, from_tile)
+        visible = self.cache.get(key)
+        if visible is None:
+            if len(self.cache) >= self.max_entries:
+                self.cache.clear()
+            visible = trace_line(self.grid, key[0], key[1])
+            self.cache[key] = visible
+        return visible
+    
+    def check_many(self, from_tiles, to_tile):
+        """
+        Consulta por lotes: comprueba la línea de visión desde cada casilla de
+        la lista hasta una misma casilla destino. Retorna una lista de booleanos.
+        """
+        if self.grid.version != self.version:
+            self.clear()
+        
+        # Las casillas repetidas (enemigos en el mismo tile) se resuelven una sola vez
+        results = {}
+        for from_tile in from_tiles:
+            if from_tile not in results:
+                results[from_tile] = self.is_visible(from_tile, to_tile)
+        return [results[from_tile] for from_tile in from_tiles]
+
+def pixel_to_tile(x, y):
+    """Convierte coordenadas en píxeles a la casilla que las contiene"""
+    return (int(x // TILE_SIZE), int(y // TILE_SIZE))
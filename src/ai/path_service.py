@@ -0,0 +1,348 @@
+import itertools
+import multiprocessing
+import os
+import weakref
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from src.ai.pathfinding import AStar, PathCache, window_origin
+from src.utils.constants import TILE_SIZE
+
+# Procesos del grupo compartido que buscan los caminos
+PATH_WORKERS = 2
+
+# Prioridad de los procesos de búsqueda (nice): con pocos núcleos, el sistema da la CPU
+# antes al bucle del juego y las búsquedas aprovechan el tiempo libre entre frames
+PATH_WORKER_NICE = 10
+
+# Identificadores de las copias del mapa (los procesos reutilizan su A* mientras no cambia)
+_snapshot_ids = itertools.count()
+
+class GridSnapshot:
+    """
+    Copia de solo lectura de la máscara de sólidos de una región del mapa (del
+    mapa entero en los niveles normales). Los procesos buscan sobre ella y
+    nunca sobre el nivel, que puede cambiar mientras tanto.
+    
+    La máscara no viaja con cada petición: se deja en memoria compartida
+    (share) y cada proceso la lee una sola vez por copia (attach).
+    """
+    def __init__(self, origin_x, origin_y, width, height, solid, version, snapshot_id=None):
+        self.id = next(_snapshot_ids) if snapshot_id is None else snapshot_id
+        self.origin_x = origin_x
+        self.origin_y = origin_y
+        self.width = width
+        self.height = height
+        self.solid = bytes(solid)
+        self.version = version
+        
+        # A* lee la máscara en level.grid.solid: la copia hace de nivel y de cuadrícula
+        self.grid = self
+        
+        # Memoria compartida con la máscara (se crea con la primera petición enviada)
+        # y búsquedas enviadas que aún no han terminado
+        self.memory = None
+        self.pending = set()
+    
+    def contains(self, tile_x, tile_y):
+        """Comprueba si una casilla (en coordenadas del mapa) está dentro de la copia"""
+        return (self.origin_x <= tile_x < self.origin_x + self.width
+                and self.origin_y <= tile_y < self.origin_y + self.height)
+    
+    def share(self):
+        """Deja la máscara en memoria compartida (una vez) y devuelve el nombre del bloque"""
+        if self.memory is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=max(1, len(self.solid)))
+            self.memory.buf[:len(self.solid)] = self.solid
+            
+            # Liberar el bloque aunque la partida termine con búsquedas pendientes
+            self.finalizer = weakref.finalize(self, release_memory, self.memory)
+        return self.memory.name
+    
+    def track(self, future):
+        """Apunta una búsqueda sobre la copia; se olvida sola al terminar"""
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+    
+    def release(self):
+        """
+        Libera la memoria compartida si ya no queda ninguna búsqueda pendiente
+        sobre la copia. Devuelve si se ha liberado
+        """
+        if self.pending:
+            return False
+        if self.memory is not None:
+            self.finalizer()
+            self.memory = None
+        return True
+    
+    @classmethod
+    def attach(cls, snapshot_id, memory_name, origin_x, origin_y, width, height):
+        """Lee en un proceso de búsqueda la copia que dejó el proceso principal"""
+        memory = shared_memory.SharedMemory(name=memory_name)
+        try:
+            solid = bytes(memory.buf[:width * height])
+        finally:
+            memory.close()
+        return cls(origin_x, origin_y, width, height, solid, None, snapshot_id)
+
+def release_memory(memory):
+    """Cierra y borra un bloque de memoria compartida"""
+    memory.close()
+    memory.unlink()
+
+class PathRequest:
+    """Petición de camino pendiente; el resultado se recoge con PathService.result()"""
+    def __init__(self, start_tile, goal_tile, version, future=None, path=None, request_id=None):
+        self.start_tile = start_tile
+        self.goal_tile = goal_tile
+        self.version = version
+        self.future = future
+        
+        # Número de la petición en el registro de entregas (solo las que llegan a los procesos)
+        self.id = request_id
+        
+        # Camino ya resuelto (peticiones que no llegan a los procesos: sin camino posible o en la caché)
+        self.path = path
+        
+        # Actualizaciones del enemigo desde que se hizo la petición
+        self.age = 0
+    
+    def cancel(self):
+        """Descarta la petición (si ningún proceso la ha empezado, no llega a buscarse)"""
+        if self.future is not None:
+            self.future.cancel()
+    
+    @property
+    def ready(self):
+        """Indica si el camino se conoce ya (no hace falta esperar a los procesos)"""
+        return self.future is None
+
+class PathDeliveryLog:
+    """
+    Registro de entregas de caminos de una partida: para cada petición enviada
+    a los procesos, cuántas actualizaciones del enemigo tenía al recogerse su
+    camino (0 si no llegó a entregarse).
+    
+    Al jugar, cada camino se entrega en cuanto está listo (sin esperar) y se
+    anota cuándo; al reproducir una partida se entrega exactamente cuando se
+    anotó, para que la simulación se repita igual.
+    """
+    # Edad máxima que se puede guardar (dos bytes por petición)
+    MAX_AGE = 0xFFFF
+    
+    def __init__(self, ages=None):
+        # Con edades grabadas se reproducen; sin ellas se graban
+        self.replaying = ages is not None
+        self.ages = array('H')
+        if ages:
+            self.ages.frombytes(ages)
+        self.submitted = 0
+    
+    def next_id(self):
+        """Numera una petición enviada a los procesos"""
+        request_id = self.submitted
+        self.submitted += 1
+        if not self.replaying:
+            self.ages.append(0)
+        return request_id
+    
+    def delivery_age(self, request_id, latency):
+        """
+        Edad a la que se entregó una petición al grabar: None si no llegó a
+        entregarse y la latencia si la grabación no la incluye (versión 1)
+        """
+        if request_id < len(self.ages):
+            return self.ages[request_id] or None
+        return latency
+    
+    def record(self, request_id, age):
+        """Anota la edad a la que se ha entregado una petición"""
+        if not self.replaying:
+            self.ages[request_id] = max(1, min(age, self.MAX_AGE))
+    
+    def to_bytes(self):
+        """Edades grabadas, para guardarlas con la repetición"""
+        return self.ages.tobytes()
+
+# Cada proceso guarda la última copia del mapa que ha usado y su A*
+_worker_snapshot = None
+_worker_pathfinder = None
+
+def solve_path(snapshot_id, memory_name, window, start_x, start_y, end_x, end_y, max_nodes):
+    """
+    Busca un camino sobre una copia del mapa (se ejecuta en los procesos del
+    grupo). La copia llega solo por su número, el nombre de su memoria
+    compartida y su ventana (origen y tamaño); se lee la primera vez que se usa
+    """
+    global _worker_snapshot, _worker_pathfinder
+    if _worker_snapshot is None or _worker_snapshot.id != snapshot_id:
+        _worker_snapshot = GridSnapshot.attach(snapshot_id, memory_name, *window)
+        _worker_pathfinder = AStar(_worker_snapshot, max_nodes, cache_size=0)
+    snapshot = _worker_snapshot
+    
+    # Pasar a coordenadas de la copia y devolver el camino en coordenadas del mapa
+    offset_x = snapshot.origin_x * TILE_SIZE
+    offset_y = snapshot.origin_y * TILE_SIZE
+    path = _worker_pathfinder.find_path(start_x - offset_x, start_y - offset_y,
+                                        end_x - offset_x, end_y - offset_y)
+    return [(x + offset_x, y + offset_y) for x, y in path]
+
+def init_worker():
+    """Baja la prioridad de un proceso de búsqueda al arrancar (donde el sistema lo permite)"""
+    if hasattr(os, "nice"):
+        os.nice(PATH_WORKER_NICE)
+
+_executor = None
+
+def get_executor():
+    """
+    Devuelve el grupo de procesos de búsqueda (se crea con la primera petición).
+    Son procesos y no hilos para que A* no compita por el GIL con el bucle del
+    juego; se arrancan con "spawn" (no heredan pygame ni sus hilos)
+    """
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PATH_WORKERS,
+                                        mp_context=multiprocessing.get_context("spawn"),
+                                        initializer=init_worker)
+    return _executor
+
+class PathService:
+    """
+    Servicio de caminos de un nivel. Los enemigos envían peticiones (inicio,
+    destino) y un grupo de procesos las resuelve con A* sobre una copia de
+    solo lectura del mapa, fuera del bucle del juego.
+    
+    En el juego es el recurso de los enemigos que quedan fuera del campo de
+    flujo (en los mundos por chunks, el campo solo cubre una ventana alrededor
+    del jugador); el grupo de procesos no se crea hasta la primera petición.
+    
+    Cada camino se entrega como pronto tras latency actualizaciones del
+    enemigo y, al jugar, solo si la búsqueda ya ha terminado: el bucle nunca
+    espera a los procesos. Para que las repeticiones sigan siendo
+    deterministas, el registro de entregas (log) guarda cuándo se recogió
+    cada camino y, al reproducir, se recoge en ese mismo momento.
+    
+    Los caminos recogidos se guardan en una caché que se consulta en el
+    proceso principal: las peticiones que responde la caché están listas en
+    el acto y no llegan a los procesos.
+    """
+    # Actualizaciones del enemigo, como mínimo, entre la petición y la entrega del camino
+    LATENCY = 2
+    
+    def __init__(self, grid, latency=LATENCY, max_nodes=None, window_size=AStar.WINDOW_SIZE, log=None):
+        self.grid = grid
+        self.latency = latency
+        self.max_nodes = max_nodes
+        
+        # Registro de entregas (el juego pone el de la partida para grabarlo con la repetición)
+        self.log = log if log is not None else PathDeliveryLog()
+        
+        # En mapas por chunks no hay una máscara completa en memoria: se copia una
+        # ventana que contenga el inicio y el destino (como hace A* en esos mapas)
+        self.windowed = getattr(grid, "solid", None) is None
+        self.window_size = window_size
+        self.snapshot = None
+        
+        # Copias sustituidas cuya memoria compartida sigue en uso por búsquedas pendientes
+        self.retired = []
+        
+        # Caché de caminos (los procesos buscan sin caché propia: su contenido dependería
+        # del orden en que terminan las búsquedas)
+        self.cache = PathCache()
+        
+        # Estadísticas: peticiones enviadas y entregas aplazadas porque la búsqueda no había terminado
+        self.submitted = 0
+        self.delayed = 0
+    
+    def get_snapshot(self, start_tile, end_tile):
+        """Devuelve la copia del mapa para una búsqueda (se rehace si cambia el mapa o la ventana)"""
+        grid = self.grid
+        if self.windowed:
+            width = min(self.window_size, grid.width)
+            height = min(self.window_size, grid.height)
+            origin_x, origin_y = window_origin(start_tile, end_tile, width, height, grid.width, grid.height)
+        else:
+            width = grid.width
+            height = grid.height
+            origin_x = origin_y = 0
+        
+        snapshot = self.snapshot
+        if (snapshot is None or snapshot.version != grid.version
+                or snapshot.origin_x != origin_x or snapshot.origin_y != origin_y):
+            if self.snapshot is not None:
+                self.retired.append(self.snapshot)
+            snapshot = GridSnapshot(origin_x, origin_y, width, height,
+                                    grid.copy_solid(origin_x, origin_y, width, height), grid.version)
+            self.snapshot = snapshot
+        return snapshot
+    
+    def release_snapshots(self):
+        """Libera la memoria de las copias sustituidas cuyas búsquedas ya han terminado"""
+        self.retired = [snapshot for snapshot in self.retired if not snapshot.release()]
+    
+    def request(self, start_x, start_y, end_x, end_y):
+        """Envía una petición de camino entre dos puntos en píxeles y la devuelve"""
+        start_tile = (int(start_x // TILE_SIZE), int(start_y // TILE_SIZE))
+        end_tile = (int(end_x // TILE_SIZE), int(end_y // TILE_SIZE))
+        grid = self.grid
+        
+        # Caminos ya encontrados (en mapas por chunks, la caché se vacía al cambiar el mapa)
+        self.cache.update_map(grid.version, None if self.windowed else grid.solid, grid.width)
+        path = self.cache.get(start_tile, end_tile)
+        if path is not None:
+            return PathRequest(start_tile, end_tile, grid.version, path=path)
+        
+        # Si los dos puntos no caben en una misma copia, no hay camino
+        snapshot = self.get_snapshot(start_tile, end_tile)
+        if self.retired:
+            self.release_snapshots()
+        if not (snapshot.contains(*start_tile) and snapshot.contains(*end_tile)):
+            return PathRequest(start_tile, end_tile, grid.version, path=[])
+        
+        self.submitted += 1
+        window = (snapshot.origin_x, snapshot.origin_y, snapshot.width, snapshot.height)
+        future = get_executor().submit(solve_path, snapshot.id, snapshot.share(), window,
+                                       start_x, start_y, end_x, end_y, self.max_nodes)
+        snapshot.track(future)
+        return PathRequest(start_tile, end_tile, grid.version, future, request_id=self.log.next_id())
+    
+    def result(self, request):
+        """
+        Devuelve el camino de una petición si ya toca entregarlo o None si hay
+        que seguir esperando (se vuelve a llamar en la siguiente actualización)
+        """
+        if request.future is None:
+            return request.path
+        
+        log = self.log
+        if log.replaying:
+            # Entregar en la misma actualización que al grabar (esperando si hace falta)
+            age = log.delivery_age(request.id, self.latency)
+            if age is None or request.age < age:
+                return None
+        else:
+            if request.age < self.latency:
+                return None
+            if not request.future.done():
+                self.delayed += 1
+                return None
+            log.record(request.id, request.age)
+        path = request.future.result()
+        
+        # Guardar el camino si el mapa no ha cambiado desde la petición
+        if path and request.version == self.grid.version:
+            self.cache.update_map(self.grid.version, None if self.windowed else self.grid.solid, self.grid.width)
+            self.cache.put(request.start_tile, request.goal_tile, path)
+        return list(path)
+
+_level_services = weakref.WeakKeyDictionary()
+
+def get_path_service(level):
+    """Devuelve el servicio de caminos de un nivel (se crea la primera vez)"""
+    service = _level_services.get(level)
+    if service is None:
+        service = PathService(level.grid)
+        _level_services[level] = service
+    return service
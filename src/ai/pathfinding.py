@@ -1,112 +1,436 @@
 
-
 import heapq
+from array import array
+from collections import OrderedDict
 from src.utils.constants import TILE_SIZE
 
+class PathCache:
+    """
+    Caché LRU de caminos por (casilla inicial, casilla destino) para una versión
+    del mapa. Un camino guardado también responde a las consultas que empiezan
+    en cualquiera de sus casillas hacia el mismo destino (todo tramo final de
+    un camino mínimo es también mínimo).
+    
+    Cuando cambia el mapa se comparan la máscara anterior y la nueva y solo se
+    descartan los caminos afectados: los que cruzan una casilla que se ha
+    vuelto sólida y los que podrían acortarse pasando por una que se ha abierto.
+    
+    Los caminos se guardan en casillas del mapa (no de la ventana), así que al
+    mover la ventana de búsqueda (mapas por chunks) solo se descartan los que
+    se salen de la nueva.
+    """
+    # Número máximo de caminos guardados
+    MAX_ENTRIES = 1024
+    
+    # Con más casillas cambiadas de una versión a otra, se vacía la caché entera
+    MAX_CHANGES = 64
+    
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        
+        # (inicio, destino) -> (casillas, puntos en píxeles) del camino, del menos al más usado
+        self.entries = OrderedDict()
+        
+        # Casilla -> {destino: {(inicio, destino): posición de la casilla en el camino}}
+        self.on_tile = {}
+        
+        # Mapa al que corresponden los caminos: versión, copia de la máscara, ancho y origen
+        self.version = None
+        self.mask = None
+        self.width = 0
+        self.origin = (0, 0)
+        
+        # Estadísticas
+        self.hits = 0
+        self.misses = 0
+    
+    def clear(self):
+        """Descarta todos los caminos"""
+        self.entries.clear()
+        self.on_tile.clear()
+    
+    def update_map(self, version, mask=None, width=0, origin=(0, 0)):
+        """
+        Sincroniza la caché con la versión actual del mapa. mask es la máscara de
+        sólidos plana (índice y * width + x, desde origin); sin ella, cualquier
+        cambio de versión vacía la caché
+        """
+        if version == self.version and origin == self.origin and width == self.width:
+            return
+        
+        if mask is None or self.mask is None:
+            if version != self.version:
+                self.clear()
+        elif origin == self.origin and width == self.width and len(mask) == len(self.mask):
+            self.apply_changes(self.find_changes(self.mask, mask, width, origin))
+        else:
+            # La ventana se ha movido: descartar los caminos que quedan fuera y, si
+            # además ha cambiado el mapa, comparar la parte común de las dos ventanas
+            height = len(mask) // width
+            self.remove_outside(origin, width, height)
+            if version != self.version:
+                self.apply_changes(self.find_overlap_changes(mask, width, height, origin))
+        
+        self.version = version
+        self.mask = bytes(mask) if mask is not None else None
+        self.width = width
+        self.origin = origin
+    
+    def find_changes(self, old_mask, new_mask, width, origin):
+        """Devuelve las casillas que han cambiado entre dos máscaras como (casilla, ahora sólida)"""
+        changes = []
+        for row in range(0, len(new_mask), width):
+            # Comparar filas enteras y solo recorrer casilla a casilla las distintas
+            if old_mask[row:row + width] == new_mask[row:row + width]:
+                continue
+            for index in range(row, row + width):
+                if old_mask[index] != new_mask[index]:
+                    tile = (index % width + origin[0], index // width + origin[1])
+                    changes.append((tile, bool(new_mask[index])))
+                    if len(changes) > self.MAX_CHANGES:
+                        return None
+        return changes
+    
+    def find_overlap_changes(self, mask, width, height, origin):
+        """
+        Como find_changes, pero entre la máscara guardada y una de otra ventana:
+        solo se comparan las casillas que están en las dos
+        """
+        old_width = self.width
+        old_height = len(self.mask) // old_width
+        left = max(origin[0], self.origin[0])
+        top = max(origin[1], self.origin[1])
+        right = min(origin[0] + width, self.origin[0] + old_width)
+        bottom = min(origin[1] + height, self.origin[1] + old_height)
+        if right <= left or bottom <= top:
+            return []
+        
+        # Recortar la parte común de cada máscara, fila a fila
+        old_rows = []
+        new_rows = []
+        for y in range(top, bottom):
+            old_start = (y - self.origin[1]) * old_width + left - self.origin[0]
+            new_start = (y - origin[1]) * width + left - origin[0]
+            old_rows.append(self.mask[old_start:old_start + right - left])
+            new_rows.append(mask[new_start:new_start + right - left])
+        return self.find_changes(b"".join(old_rows), b"".join(new_rows), right - left, (left, top))
+    
+    def remove_outside(self, origin, width, height):
+        """Descarta los caminos que pasan por alguna casilla fuera de una ventana"""
+        affected = set()
+        for tile_x, tile_y in self.on_tile:
+            if not (origin[0] <= tile_x < origin[0] + width and origin[1] <= tile_y < origin[1] + height):
+                for goals in self.on_tile[(tile_x, tile_y)].values():
+                    affected.update(goals)
+        for key in affected:
+            self.remove(key)
+    
+    def apply_changes(self, changes):
+        """Descarta los caminos afectados por una lista de casillas cambiadas"""
+        if changes is None:
+            self.clear()
+            return
+        
+        for tile, solid in changes:
+            if solid:
+                # Los caminos que cruzan la casilla ya no se pueden recorrer
+                affected = [key for goals in self.on_tile.get(tile, {}).values() for key in goals]
+            else:
+                # Un camino pasando por la casilla abierta mide al menos la distancia Manhattan
+                # del inicio a ella y de ella al destino; si eso no es más corto, el guardado sigue siendo mínimo
+                affected = [key for key, (tiles, _) in self.entries.items()
+                            if abs(key[0][0] - tile[0]) + abs(key[0][1] - tile[1])
+                            + abs(tile[0] - key[1][0]) + abs(tile[1] - key[1][1]) < len(tiles) - 1]
+            for key in affected:
+                self.remove(key)
+    
+    def get(self, start_tile, goal_tile):
+        """Devuelve una copia del camino entre dos casillas, o None si no está guardado"""
+        entry = self.entries.get((start_tile, goal_tile))
+        position = 0
+        if entry is None:
+            # Buscar un camino guardado hacia el mismo destino que pase por la casilla inicial
+            keys = self.on_tile.get(start_tile, {}).get(goal_tile)
+            if not keys:
+                self.misses += 1
+                return None
+            key, position = next(iter(keys.items()))
+            entry = self.entries[key]
+            self.entries.move_to_end(key)
+        else:
+            self.entries.move_to_end((start_tile, goal_tile))
+        
+        self.hits += 1
+        return list(entry[1][position:])
+    
+    def put(self, start_tile, goal_tile, path):
+        """Guarda el camino (lista de puntos en píxeles) entre dos casillas"""
+        key = (start_tile, goal_tile)
+        if key in self.entries:
+            self.remove(key)
+        elif len(self.entries) >= self.max_entries:
+            self.remove(next(iter(self.entries)))
+        
+        tiles = tuple((int(x // TILE_SIZE), int(y // TILE_SIZE)) for x, y in path)
+        self.entries[key] = (tiles, tuple(path))
+        for position, tile in enumerate(tiles):
+            goals = self.on_tile.setdefault(tile, {}).setdefault(goal_tile, {})
+            goals.setdefault(key, position)
+    
+    def remove(self, key):
+        """Descarta un camino y sus referencias por casilla"""
+        tiles, _ = self.entries.pop(key)
+        goal_tile = key[1]
+        for tile in tiles:
+            goals = self.on_tile.get(tile)
+            if goals is None:
+                continue
+            keys = goals.get(goal_tile)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del goals[goal_tile]
+            if not goals:
+                del self.on_tile[tile]
+
+def window_origin(start_tile, end_tile, width, height, map_width, map_height):
+    """
+    Origen de una ventana de width x height casillas centrada entre el inicio y
+    el destino, dentro del mapa. Se alinea a un cuarto de ventana para reutilizar
+    la misma ventana entre búsquedas cercanas
+    """
+    step = max(1, width // 4)
+    origin_x = ((start_tile[0] + end_tile[0]) // 2 - width // 2) // step * step
+    origin_y = ((start_tile[1] + end_tile[1]) // 2 - height // 2) // step * step
+    origin_x = max(0, min(origin_x, map_width - width))
+    origin_y = max(0, min(origin_y, map_height - height))
+    return origin_x, origin_y
+
 class AStar:
-    """Implementación del algoritmo A* para encontrar caminos"""
-    def __init__(self, level):
+    """
+    Implementación del algoritmo A* para encontrar caminos.
+    Trabaja sobre arrays planos indexados por casilla (y * ancho + x) y usa
+    borrado perezoso en la cola de prioridad en lugar de buscar en ella.
+    """
+    # Marca máxima antes de reiniciar los arrays de búsqueda
+    MAX_SEARCH_ID = 0xFFFFFFFF
+    
+    # Lado de la ventana de búsqueda (en casillas) en mapas divididos en chunks
+    WINDOW_SIZE = 128
+    
+    def __init__(self, level, max_nodes=None, window_size=None, cache_size=PathCache.MAX_ENTRIES):
         self.level = level
+        
+        # Número máximo de nodos a expandir por búsqueda (None = sin límite)
+        self.max_nodes = max_nodes
+        self.window_size = window_size or self.WINDOW_SIZE
+        
+        # Caché de caminos ya encontrados (0 = sin caché)
+        self.cache = PathCache(cache_size) if cache_size else None
+        
+        # Preparar la cuadrícula y los arrays de búsqueda
+        self.rebuild_grid()
     
-    def find_path(self, start_x, start_y, end_x, end_y):
+    def rebuild_grid(self):
+        """Prepara la máscara plana de casillas bloqueadas y reinicia los arrays de búsqueda"""
+        grid = getattr(self.level, "grid", None)
+        
+        # En mapas por chunks no hay una máscara completa en memoria: la búsqueda se hace
+        # dentro de una ventana de casillas que contiene el inicio y el destino
+        self.windowed = grid is not None and getattr(grid, "solid", None) is None
+        self.origin_x = 0
+        self.origin_y = 0
+        if self.windowed:
+            self.width = min(self.window_size, self.level.width)
+            self.height = min(self.window_size, self.level.height)
+        else:
+            self.width = self.level.width
+            self.height = self.level.height
+        size = self.width * self.height
+        
+        # Compartir la máscara de sólidos de la cuadrícula del nivel (sin copiarla);
+        # si el nivel no tiene cuadrícula, construir una copia tile a tile
+        if self.windowed:
+            # La máscara de la ventana se copia en move_window
+            self.blocked = None
+            self.window_version = None
+        elif grid is not None:
+            self.blocked = grid.solid
+        else:
+            self.blocked = bytearray(size)
+            for ty in range(self.height):
+                for tx in range(self.width):
+                    if self.level.is_tile_blocked(tx, ty):
+                        self.blocked[ty * self.width + tx] = 1
+        
+        # Los arrays de búsqueda se crean en la primera búsqueda (con campo de flujo,
+        # la mayoría de los enemigos no llegan a usar A*)
+        self.g_score = None
+        self.search_id = 0
+    
+    def reset_search_arrays(self):
+        """Crea (o reinicia) los arrays de búsqueda"""
+        size = self.width * self.height
+        
+        # Costo desde el inicio y nodo previo de cada casilla
+        self.g_score = array('i', [0]) * size
+        self.came_from = array('i', [-1]) * size
+        
+        # Marcas de búsqueda: evitan reiniciar los arrays en cada llamada.
+        # Una casilla está abierta/cerrada solo si su marca coincide con la búsqueda actual
+        self.opened = array('I', [0]) * size
+        self.closed = array('I', [0]) * size
+        self.search_id = 0
+    
+    def find_path(self, start_x, start_y, end_x, end_y, max_nodes=None):
         """
         Encuentra un camino desde (start_x, start_y) hasta (end_x, end_y)
         Retorna una lista de puntos (x, y) que forman el camino
         """
         # Convertir coordenadas de píxeles a coordenadas de cuadrícula
-        start = (int(start_x / TILE_SIZE), int(start_y / TILE_SIZE))
-        end = (int(end_x / TILE_SIZE), int(end_y / TILE_SIZE))
+        start_tile = (int(start_x / TILE_SIZE), int(start_y / TILE_SIZE))
+        end_tile = (int(end_x / TILE_SIZE), int(end_y / TILE_SIZE))
+        
+        # En mapas por chunks, el inicio y el destino deben caber en la ventana de búsqueda
+        if self.windowed and not self.move_window(start_tile, end_tile):
+            return []
         
-        # Si el inicio o el fin están en un obstáculo, no hay camino
-        if self.level.is_tile_blocked(start[0], start[1]) or self.level.is_tile_blocked(end[0], end[1]):
+        start = self.to_index(*start_tile)
+        end = self.to_index(*end_tile)
+        
+        # Si el inicio o el fin están fuera del mapa o en un obstáculo, no hay camino
+        if start < 0 or end < 0 or self.blocked[start] or self.blocked[end]:
             return []
         
-        # Conjunto de nodos visitados
-        closed_set = set()
+        if start == end:
+            return [self.to_pixels(start)]
+        
+        # Las búsquedas repetidas (o desde un camino ya encontrado) se responden desde la caché
+        if self.cache is not None:
+            grid = getattr(self.level, "grid", None)
+            self.cache.update_map(grid.version if grid is not None else 0, self.blocked, self.width,
+                                  (self.origin_x, self.origin_y))
+            path = self.cache.get(start_tile, end_tile)
+            if path is not None:
+                return path
         
-        # Conjunto de nodos por visitar (cola de prioridad)
-        open_set = []
-        heapq.heappush(open_set, (0, start))
+        # Nueva búsqueda: invalidar las marcas de la anterior
+        if self.g_score is None or self.search_id >= self.MAX_SEARCH_ID:
+            self.reset_search_arrays()
+        self.search_id += 1
+        search_id = self.search_id
         
-        # Diccionario para reconstruir el camino
-        came_from = {}
+        # Copias locales para acelerar el bucle principal
+        width = self.width
+        size = width * self.height
+        blocked = self.blocked
+        g_score = self.g_score
+        came_from = self.came_from
+        opened = self.opened
+        closed = self.closed
+        end_x_tile = end % width
+        end_y_tile = end // width
         
-        # Costo desde el inicio hasta cada nodo
-        g_score = {start: 0}
+        budget = max_nodes or self.max_nodes or size
+        expanded = 0
         
-        # Costo estimado desde el inicio hasta el final pasando por cada nodo
-        f_score = {start: self.heuristic(start, end)}
+        # Cola de prioridad con entradas (f, h, índice): a igual f se prefiere
+        # el nodo más cercano al destino y, después, el de menor índice
+        start_h = abs(start % width - end_x_tile) + abs(start // width - end_y_tile)
+        g_score[start] = 0
+        came_from[start] = -1
+        opened[start] = search_id
+        open_set = [(start_h, start_h, start)]
         
         while open_set:
             # Obtener el nodo con menor f_score
-            current_f, current = heapq.heappop(open_set)
+            _, _, current = heapq.heappop(open_set)
+            
+            # Borrado perezoso: ignorar entradas de nodos ya cerrados
+            if closed[current] == search_id:
+                continue
             
             # Si hemos llegado al destino, reconstruir y devolver el camino
             if current == end:
-                return self.reconstruct_path(came_from, current)
+                path = self.reconstruct_path(came_from, current)
+                if self.cache is not None:
+                    self.cache.put(start_tile, end_tile, path)
+                return path
+            
+            # Marcar como visitado y respetar el presupuesto de nodos
+            closed[current] = search_id
+            expanded += 1
+            if expanded > budget:
+                return []
             
-            # Marcar como visitado
-            closed_set.add(current)
+            tentative_g_score = g_score[current] + 1
+            x = current % width
             
-            # Explorar vecinos
-            for neighbor in self.get_neighbors(current):
-                # Ignorar vecinos ya visitados
-                if neighbor in closed_set:
+            # Vecinos: arriba, derecha, abajo, izquierda
+            for neighbor, valid in (
+                (current - width, current >= width),
+                (current + 1, x < width - 1),
+                (current + width, current < size - width),
+                (current - 1, x > 0),
+            ):
+                if not valid or blocked[neighbor] or closed[neighbor] == search_id:
                     continue
                 
-                # Calcular g_score tentativo
-                tentative_g_score = g_score[current] + 1
-                
-                # Si el vecino no está en open_set o tiene un mejor g_score
-                if neighbor not in [i[1] for i in open_set] or tentative_g_score < g_score.get(neighbor, float('inf')):
-                    # Actualizar información del vecino
-                    came_from[neighbor] = current
+                # Si el vecino no está abierto o tiene un mejor g_score, actualizarlo
+                if opened[neighbor] != search_id or tentative_g_score < g_score[neighbor]:
+                    opened[neighbor] = search_id
                     g_score[neighbor] = tentative_g_score
-                    f_score[neighbor] = g_score[neighbor] + self.heuristic(neighbor, end)
+                    came_from[neighbor] = current
                     
-                    # Añadir a open_set si no está ya
-                    if neighbor not in [i[1] for i in open_set]:
-                        heapq.heappush(open_set, (f_score[neighbor], neighbor))
+                    h = abs(neighbor % width - end_x_tile) + abs(neighbor // width - end_y_tile)
+                    heapq.heappush(open_set, (tentative_g_score + h, h, neighbor))
         
         # Si no se encuentra camino, devolver lista vacía
         return []
     
-    def heuristic(self, a, b):
-        """Heurística de distancia Manhattan"""
-        return abs(a[0] - b[0]) + abs(a[1] - b[1])
-    
-    def get_neighbors(self, node):
-        """Obtiene los vecinos válidos de un nodo"""
-        x, y = node
-        neighbors = []
-        
-        # Direcciones: arriba, derecha, abajo, izquierda
-        directions = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+    def move_window(self, start_tile, end_tile):
+        """
+        Coloca la ventana de búsqueda (mapas por chunks) para que contenga el inicio
+        y el destino, y copia su máscara de sólidos si ha cambiado.
+        Retorna False si los dos puntos no caben en una misma ventana.
+        """
+        origin_x, origin_y = window_origin(start_tile, end_tile, self.width, self.height,
+                                           self.level.width, self.level.height)
         
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            
-            # Comprobar si está dentro de los límites del nivel
-            if 0 <= nx < self.level.width and 0 <= ny < self.level.height:
-                # Comprobar si no hay obstáculo
-                if not self.level.is_tile_blocked(nx, ny):
-                    neighbors.append((nx, ny))
+        for tile_x, tile_y in (start_tile, end_tile):
+            if not (origin_x <= tile_x < origin_x + self.width and origin_y <= tile_y < origin_y + self.height):
+                return False
         
-        return neighbors
+        grid = self.level.grid
+        if (self.blocked is None or grid.version != self.window_version
+                or origin_x != self.origin_x or origin_y != self.origin_y):
+            self.origin_x = origin_x
+            self.origin_y = origin_y
+            self.blocked = grid.copy_solid(origin_x, origin_y, self.width, self.height)
+            self.window_version = grid.version
+        return True
+    
+    def to_index(self, tile_x, tile_y):
+        """Convierte coordenadas de cuadrícula a índice plano (-1 si está fuera del mapa o de la ventana)"""
+        tile_x -= self.origin_x
+        tile_y -= self.origin_y
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return tile_y * self.width + tile_x
+        return -1
+    
+    def to_pixels(self, index):
+        """Convierte un índice plano al centro de la casilla en píxeles"""
+        return ((index % self.width + self.origin_x) * TILE_SIZE + TILE_SIZE // 2,
+                (index // self.width + self.origin_y) * TILE_SIZE + TILE_SIZE // 2)
     
     def reconstruct_path(self, came_from, current):
         """Reconstruye el camino desde el nodo final hasta el inicial"""
         path = []
-        while current in came_from:
-            # Convertir coordenadas de cuadrícula a píxeles (centro de la casilla)
-            path.append((current[0] * TILE_SIZE + TILE_SIZE // 2, 
-                         current[1] * TILE_SIZE + TILE_SIZE // 2))
+        while current >= 0:
+            # Convertir índices a píxeles (centro de la casilla)
+            path.append(self.to_pixels(current))
             current = came_from[current]
         
-        # Añadir el nodo inicial
-        path.append((current[0] * TILE_SIZE + TILE_SIZE // 2, 
-                     current[1] * TILE_SIZE + TILE_SIZE // 2))
-        
         # Invertir el camino para que vaya desde el inicio hasta el final
         path.reverse()
         
@@ -0,0 +1,133 @@
+from src.utils.constants import TILE_SIZE
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy es opcional: sin él (o con pocos enemigos), los niveles de detalle se calculan enemigo a enemigo
+    np = None
+
+class AIScheduler:
+    """
+    Planificador de la IA de los enemigos con niveles de detalle por distancia.
+    Los enemigos cercanos al jugador se actualizan en cada tick y los lejanos
+    cada varios ticks (avanzando en un solo paso lo que habrían avanzado en
+    todos ellos). Cada tick se actualizan como mucho max_updates enemigos; los
+    que no caben se quedan pendientes y pasan primero en los ticks siguientes.
+    
+    La prioridad es lo que cada enemigo lleva de retraso (ticks desde que le
+    tocaba), sin importar su nivel: así los lejanos también acaban pasando
+    aunque haya más cercanos pendientes de los que caben en el presupuesto.
+    
+    El presupuesto se cuenta en actualizaciones y no en tiempo real para que la
+    simulación siga siendo determinista (necesario para las repeticiones).
+    """
+    # Niveles de detalle: (distancia máxima al jugador en píxeles, ticks entre actualizaciones).
+    # El primero cubre de sobra la pantalla; None es "cualquier distancia"
+    DEFAULT_TIERS = (
+        (24 * TILE_SIZE, 1),
+        (48 * TILE_SIZE, 4),
+        (None, 8)
+    )
+    
+    def __init__(self, max_updates=256, tiers=DEFAULT_TIERS, max_ticks=8):
+        self.max_updates = max_updates
+        
+        # Distancias al cuadrado para comparar sin raíces
+        self.tiers = [(None if distance is None else distance * distance, interval)
+                      for distance, interval in tiers]
+        
+        # Máximo de ticks que cubre una actualización (pasos mayores podrían atravesar paredes)
+        self.max_ticks = max_ticks
+        
+        # Estadísticas del último tick
+        self.updated = 0
+        self.deferred = 0
+    
+    def get_interval(self, distance_sq):
+        """Ticks entre actualizaciones para un enemigo a la distancia (al cuadrado) dada"""
+        for max_distance_sq, interval in self.tiers:
+            if max_distance_sq is None or distance_sq <= max_distance_sq:
+                return interval
+        return self.tiers[-1][1]
+    
+    def update(self, store, player, level):
+        """Actualiza los enemigos del almacén a los que les toca en este tick"""
+        if store.vectorized:
+            scheduled, due_count = self.schedule_numpy(store, player)
+        else:
+            scheduled, due_count = self.schedule_python(store, player)
+        
+        enemies = store.enemies
+        ai_ticks = store.ai_ticks
+        visible = self.check_visibility([enemies[slot] for slot in scheduled], player, level)
+        for slot, player_visible in zip(scheduled, visible):
+            enemies[slot].update(player, level, min(ai_ticks[slot], self.max_ticks), player_visible)
+        for slot in scheduled:
+            ai_ticks[slot] = 0
+        
+        self.updated = len(scheduled)
+        self.deferred = due_count - len(scheduled)
+    
+    def check_visibility(self, enemies, player, level):
+        """
+        Línea de visión hacia el jugador de los enemigos que se van a actualizar,
+        en una sola consulta por lotes (las posiciones no cambian hasta resolve_moves)
+        """
+        visible = [False] * len(enemies)
+        origins = []
+        indices = []
+        for i, enemy in enumerate(enemies):
+            origin = enemy.sight_origin(player)
+            if origin is not None:
+                origins.append(origin)
+                indices.append(i)
+        
+        if origins:
+            results = level.has_line_of_sight_many(origins, player.x + player.width//2,
+                                                   player.y + player.height//2)
+            for i, result in zip(indices, results):
+                visible[i] = result
+        return visible
+    
+    def schedule_numpy(self, store, player):
+        """
+        Elige los enemigos a actualizar (versión vectorizada). Retorna sus
+        posiciones en el almacén, en orden, y el total de enemigos pendientes
+        """
+        ai_ticks = store.view("ai_ticks")
+        ai_ticks += 1
+        dx = store.view("x") - player.x
+        dy = store.view("y") - player.y
+        distance_sq = dx * dx + dy * dy
+        
+        # Intervalo de cada enemigo: se aplican los niveles del más lejano al más cercano
+        intervals = np.full(store.count, self.tiers[-1][1], dtype=np.int32)
+        for max_distance_sq, interval in reversed(self.tiers):
+            if max_distance_sq is not None:
+                intervals[distance_sq <= max_distance_sq] = interval
+        
+        due = np.flatnonzero(ai_ticks >= intervals)
+        
+        # Primero los que más retraso llevan; a igualdad, los de menor intervalo (los
+        # cercanos) y luego el orden del almacén. Los elegidos se actualizan en el orden del almacén
+        overdue = ai_ticks[due] - intervals[due]
+        order = np.lexsort((due, intervals[due], -overdue))
+        return np.sort(due[order][:self.max_updates]).tolist(), len(due)
+    
+    def schedule_python(self, store, player):
+        """Elige los enemigos a actualizar (versión sin NumPy, mismo criterio)"""
+        player_x = player.x
+        player_y = player.y
+        ai_ticks = store.ai_ticks
+        
+        due = []
+        for slot in range(store.count):
+            ai_ticks[slot] += 1
+            dx = store.x[slot] - player_x
+            dy = store.y[slot] - player_y
+            interval = self.get_interval(dx * dx + dy * dy)
+            if ai_ticks[slot] >= interval:
+                due.append((interval - ai_ticks[slot], interval, slot))
+        
+        due.sort()
+        return sorted(slot for _, _, slot in due[:self.max_updates]), len(due)
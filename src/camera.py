@@ -0,0 +1,64 @@
+import pygame
+from src.utils.constants import TILE_SIZE
+
+class Camera:
+    """
+    Cámara que sigue al jugador. Convierte coordenadas del mundo (píxeles del
+    nivel) a coordenadas de pantalla y decide qué queda dentro de la vista.
+    Si el nivel cabe en la pantalla, la cámara se queda en (0, 0).
+    """
+    def __init__(self, width, height, world_width, world_height):
+        # Tamaño de la vista (en píxeles de pantalla)
+        self.width = width
+        self.height = height
+        
+        # Tamaño del nivel en píxeles
+        self.world_width = world_width
+        self.world_height = world_height
+        
+        # Esquina superior izquierda de la vista en el mundo
+        self.x = 0
+        self.y = 0
+    
+    @property
+    def rect(self):
+        """Rectángulo visible en coordenadas del mundo"""
+        return pygame.Rect(self.x, self.y, self.width, self.height)
+    
+    def follow(self, target_rect):
+        """
+        Centra la cámara en un rectángulo sin salirse del nivel.
+        Retorna True si la cámara se ha movido.
+        """
+        x = max(0, min(target_rect.centerx - self.width // 2, self.world_width - self.width))
+        y = max(0, min(target_rect.centery - self.height // 2, self.world_height - self.height))
+        
+        moved = (x, y) != (self.x, self.y)
+        self.x = x
+        self.y = y
+        return moved
+    
+    def to_screen(self, x, y):
+        """Convierte un punto del mundo a coordenadas de pantalla"""
+        return (x - self.x, y - self.y)
+    
+    def to_screen_rect(self, rect):
+        """Convierte un rectángulo del mundo a coordenadas de pantalla"""
+        return rect.move(-self.x, -self.y)
+    
+    def to_world_rect(self, rect):
+        """Convierte un rectángulo de pantalla a coordenadas del mundo"""
+        return rect.move(self.x, self.y)
+    
+    def is_visible(self, rect):
+        """Comprueba si un rectángulo del mundo queda (al menos en parte) dentro de la vista"""
+        return (rect.right > self.x and rect.left < self.x + self.width and
+                rect.bottom > self.y and rect.top < self.y + self.height)
+    
+    def visible_tiles(self, map_width, map_height):
+        """Rango de tiles (x1, y1, x2, y2) visibles, recortado al mapa"""
+        x1 = max(0, self.x // TILE_SIZE)
+        y1 = max(0, self.y // TILE_SIZE)
+        x2 = min(map_width - 1, (self.x + self.width - 1) // TILE_SIZE)
+        y2 = min(map_height - 1, (self.y + self.height - 1) // TILE_SIZE)
+        return x1, y1, x2, y2
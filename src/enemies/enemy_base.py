@@ -1,15 +1,25 @@
 
 import pygame
+import random
 from src.utils.constants import TILE_SIZE
+from src.enemies.enemy_store import EnemyStore
 
 class EnemyBase:
-    def __init__(self, x, y, level, speed, health, score_value):
-        self.x = x
-        self.y = y
+    # Distancia máxima (en píxeles) a la que el enemigo puede ver al jugador
+    sight_range = 200
+    
+    def __init__(self, x, y, level, speed, health, score_value, flow_field=None, rng=None, store=None):
         self.width = TILE_SIZE
         self.height = TILE_SIZE
+        
+        # Posición y salud viven en el almacén compartido por los enemigos de la partida
+        # (sin almacén, el enemigo usa uno propio, pero sus movimientos no se resuelven solos)
+        if store is None:
+            store = EnemyStore(capacity=1)
+        store.add(self, x, y, self.width, self.height, health)
+        
         self.speed = speed
-        self.health = health
+        self.base_speed = speed
         self.score_value = score_value
         self.direction = "down"  # Dirección inicial
         self.moving = False
@@ -17,8 +27,114 @@ class EnemyBase:
         # Animación
         self.animation_frame = 0
         self.animation_timer = 0
+        
+        # Campo de flujo compartido hacia el jugador (opcional, sustituye a A*)
+        self.flow_field = flow_field
+        
+        # Generador aleatorio de la partida (el módulo random si no se indica otro)
+        self.rng = rng if rng is not None else random
+        
+        # Petición de camino en curso al servicio de caminos y casilla destino del último camino pedido
+        self.path_request = None
+        self.path_goal = None
+        
+        # Ticks que cubre la actualización actual (el planificador de IA espacia
+        # las de los enemigos lejanos)
+        self.ticks = 1
+    
+    @property
+    def x(self):
+        return self.store.x[self.slot]
+    
+    @x.setter
+    def x(self, value):
+        self.store.x[self.slot] = value
+    
+    @property
+    def y(self):
+        return self.store.y[self.slot]
+    
+    @y.setter
+    def y(self, value):
+        self.store.y[self.slot] = value
+    
+    @property
+    def health(self):
+        return self.store.health[self.slot]
+    
+    @health.setter
+    def health(self, value):
+        self.store.health[self.slot] = value
+    
+    def move_towards(self, target_x, target_y):
+        """
+        Registra un paso de self.speed píxeles hacia un punto (esquina superior izquierda).
+        El almacén lo aplica, con sus colisiones, en resolve_moves()
+        """
+        dx = target_x - self.x
+        dy = target_y - self.y
+        
+        # Actualizar dirección visual
+        if abs(dx) > abs(dy):
+            self.direction = "right" if dx > 0 else "left"
+        else:
+            self.direction = "down" if dy > 0 else "up"
+        
+        self.store.move_towards(self.slot, target_x, target_y, self.speed)
+        self.moving = True
+    
+    def plan_path(self, target_x, target_y):
+        """
+        Pide al servicio de caminos (self.path_service) un camino desde el centro
+        del enemigo hasta un punto. Mientras se busca, el enemigo sigue con
+        self.current_path; el nuevo camino lo sustituye al llegar
+        """
+        goal = (int(target_x // TILE_SIZE), int(target_y // TILE_SIZE))
+        
+        # Una petición hacia otra casilla ya no sirve
+        if self.path_request is not None and self.path_request.goal_tile != goal:
+            self.cancel_path_request()
+        
+        if self.path_request is not None:
+            self.path_request.age += 1
+        elif goal != self.path_goal or not self.current_path:
+            # Solo se pide un camino nuevo si cambia el destino o se ha terminado el actual
+            self.path_request = self.path_service.request(
+                self.x + self.width//2,
+                self.y + self.height//2,
+                target_x,
+                target_y
+            )
+            self.path_goal = goal
+        else:
+            return
+        
+        # Los caminos de la caché están listos en el acto; los demás, cuando el servicio los entrega
+        path = self.path_service.result(self.path_request)
+        if path is not None:
+            self.current_path = path
+            self.path_request = None
+    
+    def cancel_path_request(self):
+        """Cancela la petición de camino en curso (el siguiente plan_path pedirá otra)"""
+        if self.path_request is not None:
+            self.path_request.cancel()
+            self.path_request = None
+        self.path_goal = None
+    
+    def sight_origin(self, player):
+        """
+        Devuelve el centro del enemigo, desde donde mira, si el jugador está a su
+        alcance de vista; None si está demasiado lejos para verlo
+        """
+        start_x, start_y = self.x + self.width//2, self.y + self.height//2
+        dx = player.x + player.width//2 - start_x
+        dy = player.y + player.height//2 - start_y
+        if (dx**2 + dy**2)**0.5 > self.sight_range:
+            return None
+        return (start_x, start_y)
     
-    def update(self, player, level):
+    def update(self, player, level, ticks=1, player_visible=None):
         """Actualiza el estado del enemigo (a implementar en subclases)"""
         pass
     
@@ -30,7 +146,10 @@ class EnemyBase:
         """Devuelve el rectángulo de colisión del enemigo"""
         return pygame.Rect(self.x, self.y, self.width, self.height)
     
-    def render(self, screen):
-        """Renderiza al enemigo en pantalla"""
+    def render(self, screen, camera=None):
+        """Renderiza al enemigo en pantalla (si lo ve la cámara)"""
         current_sprite = self.sprites[self.direction][self.animation_frame]
-        screen.blit(current_sprite, (self.x, self.y)) 
\ No newline at end of file
+        if camera is None:
+            screen.blit(current_sprite, (self.x, self.y))
+        elif camera.is_visible(self.get_collision_rect()):
+            screen.blit(current_sprite, camera.to_screen(self.x, self.y))
@@ -0,0 +1,224 @@
+import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy es opcional: sin él, los cálculos por lotes se hacen en bucles de Python
+    np = None
+
+class EnemyStore:
+    """
+    Almacén de datos de los enemigos en arrays paralelos (uno por campo, una
+    posición por enemigo, en el mismo orden en que se añadieron). Los enemigos
+    guardan solo su índice y leen y escriben posición y salud a través de él.
+    
+    Las acciones de movimiento no mueven al enemigo en el momento: registran
+    un destino y una velocidad, y resolve_moves() calcula después los pasos y
+    las colisiones con el nivel de todos los enemigos a la vez.
+    
+    Los datos se guardan en arrays de la biblioteca estándar (leer un elemento
+    devuelve un float de Python) y, con NumPy, se operan como vistas sin copia.
+    """
+    # Campos del almacén y su tipo ('d': float, 'i': entero, 'B': byte)
+    FIELDS = {
+        "x": "d",
+        "y": "d",
+        "width": "d",
+        "height": "d",
+        "health": "i",
+        "target_x": "d",   # Destino del movimiento pendiente
+        "target_y": "d",
+        "step": "d",       # Píxeles que avanza en el movimiento pendiente
+        "moving": "B",     # 1 si tiene un movimiento pendiente en este tick
+        "blocked": "B",    # Ejes bloqueados por una pared en su último movimiento (1: X, 2: Y)
+        "ai_ticks": "i"    # Ticks acumulados sin actualizar su IA (planificador)
+    }
+    
+    # Tipos de NumPy equivalentes para las vistas
+    NUMPY_TYPES = {"d": "float64", "i": "int32", "B": "uint8"}
+    
+    # Con menos enemigos, el coste fijo de NumPy no compensa y se usan los bucles de Python
+    # (las dos versiones dan exactamente el mismo resultado)
+    MIN_VECTOR_COUNT = 64
+    
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.capacity = 0
+        self.enemies = []
+        self.grow(capacity)
+    
+    def grow(self, capacity):
+        """Amplía los arrays conservando su contenido"""
+        for field, typecode in self.FIELDS.items():
+            new = array(typecode, [0]) * capacity
+            if self.capacity:
+                new[:self.count] = getattr(self, field)[:self.count]
+            setattr(self, field, new)
+        self.capacity = capacity
+    
+    @property
+    def vectorized(self):
+        """Indica si los cálculos por lotes se hacen con NumPy"""
+        return np is not None and self.count >= self.MIN_VECTOR_COUNT
+    
+    def view(self, field):
+        """Vista de NumPy (sin copia) de los valores de un campo de los enemigos actuales"""
+        values = getattr(self, field)
+        return np.frombuffer(values, dtype=self.NUMPY_TYPES[values.typecode])[:self.count]
+    
+    def add(self, enemy, x, y, width, height, health):
+        """Reserva una posición para un enemigo y guarda sus datos iniciales"""
+        if self.count == self.capacity:
+            self.grow(max(1, self.capacity * 2))
+        
+        slot = self.count
+        self.count += 1
+        self.enemies.append(enemy)
+        enemy.store = self
+        enemy.slot = slot
+        
+        for field in self.FIELDS:
+            getattr(self, field)[slot] = 0
+        self.x[slot] = x
+        self.y[slot] = y
+        self.width[slot] = width
+        self.height[slot] = height
+        self.health[slot] = health
+        return slot
+    
+    def remove(self, enemy):
+        """Libera la posición de un enemigo (los siguientes avanzan un puesto para conservar el orden)"""
+        slot = enemy.slot
+        last = self.count - 1
+        if slot != last:
+            for field in self.FIELDS:
+                values = getattr(self, field)
+                values[slot:last] = values[slot + 1:self.count]
+        
+        del self.enemies[slot]
+        for moved in self.enemies[slot:]:
+            moved.slot -= 1
+        self.count = last
+        enemy.slot = -1
+    
+    def move_towards(self, slot, target_x, target_y, step):
+        """Registra que un enemigo debe avanzar step píxeles hacia un punto en este tick"""
+        self.target_x[slot] = target_x
+        self.target_y[slot] = target_y
+        self.step[slot] = step
+        self.moving[slot] = 1
+    
+    def resolve_moves(self, level):
+        """
+        Aplica los movimientos pendientes de todos los enemigos: normaliza la
+        dirección, avanza y resuelve las colisiones con las paredes eje por eje
+        (primero X y después Y), con una consulta por lotes por eje.
+        
+        Un enemigo bloqueado en un eje se desliza por la pared en el otro con el
+        paso entero (sin pasarse de su destino en ese eje). Si no, al doblar una
+        esquina en un pasillo justo, el paso proporcional del eje libre se va
+        haciendo cada vez más pequeño y el enemigo nunca llega a alinearse.
+        """
+        if self.count == 0:
+            return
+        if self.vectorized:
+            self.resolve_moves_numpy(level)
+        else:
+            self.resolve_moves_python(level)
+    
+    def resolve_moves_numpy(self, level):
+        """Versión vectorizada de resolve_moves"""
+        moving = self.view("moving")
+        active = np.flatnonzero(moving)
+        if len(active) == 0:
+            return
+        
+        all_x = self.view("x")
+        all_y = self.view("y")
+        x = all_x[active]
+        y = all_y[active]
+        width = self.view("width")[active]
+        height = self.view("height")[active]
+        target_x = self.view("target_x")[active]
+        target_y = self.view("target_y")[active]
+        dx = target_x - x
+        dy = target_y - y
+        
+        # Normalizar la dirección (sin dividir por menos de 1 píxel) y escalar por la velocidad
+        length = np.maximum(1.0, np.sqrt(dx * dx + dy * dy))
+        step = self.view("step")[active]
+        new_x = x + dx / length * step
+        new_y = y + dy / length * step
+        
+        # Paso entero en cada eje, para deslizarse cuando el otro está bloqueado
+        slide_x = np.where(np.abs(dx) <= step, target_x, x + np.sign(dx) * step)
+        slide_y = np.where(np.abs(dy) <= step, target_y, y + np.sign(dy) * step)
+        
+        # Primero el eje X y después el Y, desde la X ya resuelta
+        blocked_x = np.array(level.is_collision_many(np.column_stack((new_x, y, width, height))), dtype=bool)
+        x = np.where(blocked_x, x, new_x)
+        new_y = np.where(blocked_x, slide_y, new_y)
+        blocked_y = np.array(level.is_collision_many(np.column_stack((x, new_y, width, height))), dtype=bool)
+        y = np.where(blocked_y, y, new_y)
+        
+        # Bloqueados solo en Y: probar a deslizarse en X
+        sliding = np.flatnonzero(blocked_y & ~blocked_x & (slide_x != x))
+        if len(sliding):
+            free = ~np.array(level.is_collision_many(np.column_stack(
+                (slide_x[sliding], y[sliding], width[sliding], height[sliding]))), dtype=bool)
+            x[sliding[free]] = slide_x[sliding[free]]
+        
+        all_x[active] = x
+        all_y[active] = y
+        self.view("blocked")[active] = blocked_x.astype(np.uint8) | (blocked_y.astype(np.uint8) << 1)
+        moving[active] = 0
+    
+    def resolve_moves_python(self, level):
+        """Versión sin NumPy de resolve_moves (mismas operaciones, enemigo a enemigo)"""
+        active = [slot for slot in range(self.count) if self.moving[slot]]
+        if not active:
+            return
+        
+        moves = []
+        for slot in active:
+            x = self.x[slot]
+            y = self.y[slot]
+            target_x = self.target_x[slot]
+            target_y = self.target_y[slot]
+            dx = target_x - x
+            dy = target_y - y
+            length = max(1.0, math.sqrt(dx * dx + dy * dy))
+            step = self.step[slot]
+            slide_x = target_x if abs(dx) <= step else x + math.copysign(step, dx)
+            slide_y = target_y if abs(dy) <= step else y + math.copysign(step, dy)
+            moves.append((x + dx / length * step, y + dy / length * step, slide_x, slide_y))
+        
+        blocked = level.is_collision_many([(new_x, self.y[slot], self.width[slot], self.height[slot])
+                                           for slot, (new_x, _, _, _) in zip(active, moves)])
+        for slot, (new_x, _, _, _), is_blocked in zip(active, moves, blocked):
+            if not is_blocked:
+                self.x[slot] = new_x
+            self.blocked[slot] = 1 if is_blocked else 0
+        
+        # Bloqueados en X: deslizarse en Y con el paso entero
+        moves_y = [slide_y if self.blocked[slot] else new_y for slot, (_, new_y, _, slide_y) in zip(active, moves)]
+        blocked = level.is_collision_many([(self.x[slot], new_y, self.width[slot], self.height[slot])
+                                           for slot, new_y in zip(active, moves_y)])
+        sliding = []
+        for slot, new_y, (_, _, slide_x, _), is_blocked in zip(active, moves_y, moves, blocked):
+            if not is_blocked:
+                self.y[slot] = new_y
+            else:
+                if not self.blocked[slot] and slide_x != self.x[slot]:
+                    sliding.append((slot, slide_x))
+                self.blocked[slot] |= 2
+            self.moving[slot] = 0
+        
+        # Bloqueados solo en Y: probar a deslizarse en X
+        if sliding:
+            blocked = level.is_collision_many([(slide_x, self.y[slot], self.width[slot], self.height[slot])
+                                               for slot, slide_x in sliding])
+            for (slot, slide_x), is_blocked in zip(sliding, blocked):
+                if not is_blocked:
+                    self.x[slot] = slide_x
@@ -1,21 +1,23 @@
 import pygame
-import random
 from src.enemies.enemy_base import EnemyBase
 from src.utils.constants import MUMMY_SPEED, TILE_SIZE
 from src.ai.behavior_tree import BehaviorTree, Sequence, Selector, Condition, Action
-from src.ai.pathfinding import AStar
-from src.utils.image_loader import load_image, create_fallback_surface
-import os
+from src.ai.path_service import get_path_service
+from src.utils.image_loader import get_sprite_set
+from src.levels.free_cells import get_free_cells
 
 class Mummy(EnemyBase):
-    def __init__(self, x, y, level):
-        super().__init__(x, y, level, MUMMY_SPEED, 2, 200)  # Más resistente y vale más puntos
+    # Las momias ven más lejos
+    sight_range = 250
+    
+    def __init__(self, x, y, level, flow_field=None, rng=None, store=None):
+        super().__init__(x, y, level, MUMMY_SPEED, 2, 200, flow_field, rng, store)  # Más resistente y vale más puntos
         
         # Cargar sprites
         self.load_sprites()
         
-        # Inicializar A* para pathfinding
-        self.pathfinder = AStar(level)
+        # Servicio de caminos del nivel (las búsquedas con A* se hacen en otros procesos)
+        self.path_service = get_path_service(level)
         
         # Inicializar árbol de comportamiento
         self.init_behavior_tree(level)
@@ -34,33 +36,9 @@ class Mummy(EnemyBase):
         }
     
     def load_sprites(self):
-        """Carga los sprites de la momia"""
+        """Carga los sprites de la momia (compartidos por todas las instancias)"""
         try:
-            self.sprites = {
-                "up": [],
-                "down": [],
-                "left": [],
-                "right": []
-            }
-            
-            # Cargar sprites usando la utilidad de carga de imágenes
-            for direction in ["up", "down", "left", "right"]:
-                for i in range(1, 3):
-                    # Definir rutas de archivos
-                    png_path = f"assets/images/mummy_{direction}_{i}.png"
-                    svg_path = f"assets/images/mummy_{direction}_{i}.svg"
-                    
-                    # Intentar cargar PNG primero, luego SVG
-                    if os.path.exists(png_path):
-                        sprite = load_image(png_path, (TILE_SIZE, TILE_SIZE))
-                    elif os.path.exists(svg_path):
-                        sprite = load_image(svg_path, (TILE_SIZE, TILE_SIZE))
-                    else:
-                        # Si no existe ninguno, crear un sprite de respaldo
-                        print(f"No se encontró ninguna imagen para: mummy_{direction}_{i}")
-                        sprite = create_fallback_surface((TILE_SIZE, TILE_SIZE), (245, 222, 179, 255))
-                    
-                    self.sprites[direction].append(sprite)
+            self.sprites = get_sprite_set("mummy", (TILE_SIZE, TILE_SIZE), (245, 222, 179, 255))
         except Exception as e:
             print(f"Error al cargar los sprites de la momia: {e}")
             # Crear sprites de emergencia
@@ -96,20 +74,14 @@ class Mummy(EnemyBase):
                 self.sprites[direction].append(sprite)
     
     def generate_patrol_points(self, level):
-        """Genera puntos de patrulla aleatorios"""
-        patrol_points = []
-        
-        # Generar 4 puntos aleatorios en el nivel
-        for _ in range(4):
-            valid_point = False
-            while not valid_point:
-                x = random.randint(1, level.width - 2) * TILE_SIZE
-                y = random.randint(1, level.height - 2) * TILE_SIZE
-                
-                # Comprobar si el punto es válido (no hay colisión)
-                if not level.is_collision(x, y, self.width, self.height):
-                    patrol_points.append((x, y))
-                    valid_point = True
+        """Genera puntos de patrulla aleatorios entre las casillas libres del nivel"""
+        # Generar 4 puntos aleatorios (cada casilla libre se prueba como mucho una vez)
+        cells = get_free_cells(level).sample(self.rng, 4)
+        patrol_points = [(x * TILE_SIZE, y * TILE_SIZE) for x, y in cells]
+        
+        # Sin casillas libres alcanzables, la momia patrulla en su sitio
+        if not patrol_points:
+            patrol_points.append((self.x, self.y))
         
         return patrol_points
     
@@ -138,20 +110,26 @@ class Mummy(EnemyBase):
         
         self.behavior_tree = BehaviorTree(main_selector)
     
-    def update(self, player, level):
-        """Actualiza el estado de la momia"""
+    def update(self, player, level, ticks=1, player_visible=None):
+        """
+        Actualiza el estado de la momia. Si la actualización cubre varios ticks
+        (enemigos lejanos), avanza en un solo paso lo que habría avanzado en todos.
+        player_visible es la línea de visión ya calculada por lotes (None: calcularla aquí)
+        """
         # Guardar referencia al nivel para usar en otros métodos
         self.level = level
+        self.ticks = ticks
+        self.speed = self.base_speed * ticks
         
         # Actualizar estado
-        self.update_state(player, level)
+        self.update_state(player, level, player_visible)
         
         # Ejecutar árbol de comportamiento
         self.behavior_tree.execute(self.state)
         
         # Actualizar animación
         if self.moving:
-            self.animation_timer += 1
+            self.animation_timer += ticks
             if self.animation_timer >= 10:
                 self.animation_frame = (self.animation_frame + 1) % 2
                 self.animation_timer = 0
@@ -159,10 +137,12 @@ class Mummy(EnemyBase):
             self.animation_frame = 0
             self.animation_timer = 0
     
-    def update_state(self, player, level):
+    def update_state(self, player, level, player_visible=None):
         """Actualiza el estado de la momia para el árbol de comportamiento"""
         # Comprobar si el jugador es visible (línea de visión)
-        self.state["player_visible"] = self.is_player_visible(player, level)
+        if player_visible is None:
+            player_visible = self.is_player_visible(player, level)
+        self.state["player_visible"] = player_visible
         
         # Comprobar si el jugador está cerca
         dx = player.x - self.x
@@ -176,38 +156,17 @@ class Mummy(EnemyBase):
         
         # Actualizar cooldown de movimiento aleatorio
         if self.state["random_move_cooldown"] > 0:
-            self.state["random_move_cooldown"] -= 1
+            self.state["random_move_cooldown"] = max(0, self.state["random_move_cooldown"] - self.ticks)
     
     def is_player_visible(self, player, level):
         """Comprueba si hay línea de visión directa al jugador"""
-        # Implementación simple de línea de visión
-        start_x, start_y = self.x + self.width//2, self.y + self.height//2
-        end_x, end_y = player.x + player.width//2, player.y + player.height//2
-        
-        # Calcular vector dirección
-        dx = end_x - start_x
-        dy = end_y - start_y
-        distance = (dx**2 + dy**2)**0.5
-        
-        # Si está demasiado lejos, no es visible
-        if distance > 250:  # Las momias ven más lejos
+        origin = self.sight_origin(player)
+        if origin is None:
             return False
         
-        # Comprobar línea de visión
-        steps = int(distance / 10)  # Comprobar cada 10 píxeles
-        if steps == 0:
-            steps = 1
-        
-        for i in range(1, steps + 1):
-            t = i / steps
-            check_x = int(start_x + dx * t)
-            check_y = int(start_y + dy * t)
-            
-            # Comprobar si hay colisión con el nivel
-            if level.is_collision(check_x, check_y, 1, 1):
-                return False
-        
-        return True
+        # Comprobar línea de visión recorriendo los tiles intermedios (con caché por nivel)
+        return level.has_line_of_sight(origin[0], origin[1],
+                                       player.x + player.width//2, player.y + player.height//2)
     
     # Métodos para el árbol de comportamiento
     def check_player_visible(self, state):
@@ -229,33 +188,12 @@ class Mummy(EnemyBase):
         
         target_x, target_y = state["last_known_player_pos"]
         
-        # Calcular dirección hacia el jugador
-        dx = target_x - self.x
-        dy = target_y - self.y
-        
-        # Normalizar vector de dirección
-        length = max(1, (dx**2 + dy**2)**0.5)
-        dx = dx / length * self.speed
-        dy = dy / length * self.speed
-        
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Actualizar dirección visual
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-        
-        # Comprobar colisiones
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
-        
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
+        # Descartar el tramo de camino pendiente (se recalculará al perder de vista al jugador)
+        self.current_path = []
+        self.cancel_path_request()
         
-        self.moving = True
+        # Avanzar hacia el jugador (el paso se resuelve junto al del resto de enemigos)
+        self.move_towards(target_x, target_y)
         return True
     
     def calculate_path_to_player(self, state):
@@ -263,15 +201,21 @@ class Mummy(EnemyBase):
         if state["last_known_player_pos"] is None:
             return False
         
+        # Con campo de flujo compartido, solo se consulta el siguiente tramo
+        # cuando se ha terminado de recorrer el actual
+        center_x = self.x + self.width//2
+        center_y = self.y + self.height//2
+        if self.flow_field is not None and self.flow_field.covers(center_x, center_y):
+            self.cancel_path_request()
+            if not self.current_path:
+                self.current_path = self.flow_field.get_path_step(center_x, center_y)
+            return True
+        
         target_x, target_y = state["last_known_player_pos"]
         
-        # Calcular camino con A*
-        self.current_path = self.pathfinder.find_path(
-            self.x + self.width//2, 
-            self.y + self.height//2,
-            target_x + self.width//2, 
-            target_y + self.height//2
-        )
+        # Fuera del campo de flujo (mundos por chunks, lejos del jugador) o sin él:
+        # pedir el camino con A* (mientras llega, se sigue el que ya había)
+        self.plan_path(target_x + self.width//2, target_y + self.height//2)
         
         return True
     
@@ -293,32 +237,9 @@ class Mummy(EnemyBase):
             if not self.current_path:
                 return True
             target_x, target_y = self.current_path[0]
-            dx = target_x - (self.x + self.width//2)
-            dy = target_y - (self.y + self.height//2)
-        
-        # Normalizar vector de dirección
-        length = max(1, (dx**2 + dy**2)**0.5)
-        dx = dx / length * self.speed
-        dy = dy / length * self.speed
-        
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Actualizar dirección visual
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-        
-        # Comprobar colisiones
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
-        
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
         
-        self.moving = True
+        # Avanzar hacia el punto con el centro del enemigo
+        self.move_towards(target_x - self.width//2, target_y - self.height//2)
         return True
     
     def patrol(self, state):
@@ -326,33 +247,8 @@ class Mummy(EnemyBase):
         # Obtener siguiente punto de patrulla
         patrol_point = self.state["patrol_points"][self.state["current_patrol_index"]]
         
-        # Calcular dirección hacia el punto
-        dx = patrol_point[0] - self.x
-        dy = patrol_point[1] - self.y
-        
-        # Normalizar vector de dirección
-        length = max(1, (dx**2 + dy**2)**0.5)
-        dx = dx / length * self.speed
-        dy = dy / length * self.speed
-        
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Actualizar dirección visual
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-        
-        # Comprobar colisiones
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
-        
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
-        
-        self.moving = True
+        # Avanzar hacia el punto
+        self.move_towards(patrol_point[0], patrol_point[1])
         
         # Actualizar índice del punto actual
         self.state["current_patrol_index"] = (self.state["current_patrol_index"] + 1) % len(self.state["patrol_points"])
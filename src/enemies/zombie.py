@@ -1,22 +1,20 @@
 import pygame
-import random
 from src.enemies.enemy_base import EnemyBase
 from src.utils.constants import ZOMBIE_SPEED, TILE_SIZE
 from src.ai.behavior_tree import BehaviorTree, Sequence, Selector, Condition, Action
-from src.ai.pathfinding import AStar
-from src.utils.image_loader import load_image, create_fallback_surface
-import os
+from src.ai.path_service import get_path_service
+from src.utils.image_loader import get_sprite_set
 
 class Zombie(EnemyBase):
-    def __init__(self, x, y, level):
-        super().__init__(x, y, level, ZOMBIE_SPEED, 1, 100)
+    def __init__(self, x, y, level, flow_field=None, rng=None, store=None):
+        super().__init__(x, y, level, ZOMBIE_SPEED, 1, 100, flow_field, rng, store)
         self.level = level  # Guardar referencia al nivel
         
         # Cargar sprites
         self.load_sprites()
         
-        # Inicializar A* para pathfinding
-        self.pathfinder = AStar(level)
+        # Servicio de caminos del nivel (las búsquedas con A* se hacen en otros procesos)
+        self.path_service = get_path_service(level)
         
         # Inicializar árbol de comportamiento
         self.init_behavior_tree(level)
@@ -24,6 +22,9 @@ class Zombie(EnemyBase):
         # Camino actual (para A*)
         self.current_path = []
         
+        # Eje del paso aleatorio pendiente de resolver (1: X, 2: Y, 0: ninguno)
+        self.random_step_axis = 0
+        
         # Estado para el árbol de comportamiento
         self.state = {
             "player_visible": False,
@@ -33,33 +34,9 @@ class Zombie(EnemyBase):
         }
     
     def load_sprites(self):
-        """Carga los sprites del zombie"""
+        """Carga los sprites del zombie (compartidos por todas las instancias)"""
         try:
-            self.sprites = {
-                "up": [],
-                "down": [],
-                "left": [],
-                "right": []
-            }
-            
-            # Cargar sprites usando la utilidad de carga de imágenes
-            for direction in ["up", "down", "left", "right"]:
-                for i in range(1, 3):
-                    # Definir rutas de archivos
-                    png_path = f"assets/images/zombie_{direction}_{i}.png"
-                    svg_path = f"assets/images/zombie_{direction}_{i}.svg"
-                    
-                    # Intentar cargar PNG primero, luego SVG
-                    if os.path.exists(png_path):
-                        sprite = load_image(png_path, (TILE_SIZE, TILE_SIZE))
-                    elif os.path.exists(svg_path):
-                        sprite = load_image(svg_path, (TILE_SIZE, TILE_SIZE))
-                    else:
-                        # Si no existe ninguno, crear un sprite de respaldo
-                        print(f"No se encontró ninguna imagen para: zombie_{direction}_{i}")
-                        sprite = create_fallback_surface((TILE_SIZE, TILE_SIZE), (144, 238, 144, 255))
-                    
-                    self.sprites[direction].append(sprite)
+            self.sprites = get_sprite_set("zombie", (TILE_SIZE, TILE_SIZE), (144, 238, 144, 255))
         except Exception as e:
             print(f"Error al cargar los sprites del zombie: {e}")
             # Crear sprites de emergencia
@@ -115,20 +92,26 @@ class Zombie(EnemyBase):
         
         self.behavior_tree = BehaviorTree(main_selector)
     
-    def update(self, player, level):
-        """Actualiza el estado del zombie"""
+    def update(self, player, level, ticks=1, player_visible=None):
+        """
+        Actualiza el estado del zombie. Si la actualización cubre varios ticks
+        (enemigos lejanos), avanza en un solo paso lo que habría avanzado en todos.
+        player_visible es la línea de visión ya calculada por lotes (None: calcularla aquí)
+        """
         # Guardar referencia al nivel para usar en otros métodos
         self.level = level
+        self.ticks = ticks
+        self.speed = self.base_speed * ticks
         
         # Actualizar estado
-        self.update_state(player, level)
+        self.update_state(player, level, player_visible)
         
         # Ejecutar árbol de comportamiento
         self.behavior_tree.execute(self.state)
         
         # Actualizar animación
         if self.moving:
-            self.animation_timer += 1
+            self.animation_timer += ticks
             if self.animation_timer >= 10:
                 self.animation_frame = (self.animation_frame + 1) % 2
                 self.animation_timer = 0
@@ -136,10 +119,12 @@ class Zombie(EnemyBase):
             self.animation_frame = 0
             self.animation_timer = 0
     
-    def update_state(self, player, level):
+    def update_state(self, player, level, player_visible=None):
         """Actualiza el estado del zombie para el árbol de comportamiento"""
         # Comprobar si el jugador es visible (línea de visión)
-        self.state["player_visible"] = self.is_player_visible(player, level)
+        if player_visible is None:
+            player_visible = self.is_player_visible(player, level)
+        self.state["player_visible"] = player_visible
         
         # Comprobar si el jugador está cerca
         dx = player.x - self.x
@@ -151,40 +136,26 @@ class Zombie(EnemyBase):
         if self.state["player_visible"]:
             self.state["last_known_player_pos"] = (player.x, player.y)
         
+        # Resultado del último paso aleatorio (el almacén lo resuelve después de decidirlo):
+        # si se pudo dar, esperar antes del siguiente; si chocó con una pared, probar otra dirección
+        if self.random_step_axis:
+            if not self.store.blocked[self.slot] & self.random_step_axis:
+                self.state["random_move_cooldown"] = 30  # Esperar 30 frames
+            self.random_step_axis = 0
+        
         # Actualizar cooldown de movimiento aleatorio
         if self.state["random_move_cooldown"] > 0:
-            self.state["random_move_cooldown"] -= 1
+            self.state["random_move_cooldown"] = max(0, self.state["random_move_cooldown"] - self.ticks)
     
     def is_player_visible(self, player, level):
         """Comprueba si hay línea de visión directa al jugador"""
-        # Implementación simple de línea de visión
-        start_x, start_y = self.x + self.width//2, self.y + self.height//2
-        end_x, end_y = player.x + player.width//2, player.y + player.height//2
-        
-        # Calcular vector dirección
-        dx = end_x - start_x
-        dy = end_y - start_y
-        distance = (dx**2 + dy**2)**0.5
-        
-        # Si está demasiado lejos, no es visible
-        if distance > 200:
+        origin = self.sight_origin(player)
+        if origin is None:
             return False
         
-        # Comprobar línea de visión
-        steps = int(distance / 10)  # Comprobar cada 10 píxeles
-        if steps == 0:
-            steps = 1
-        
-        for i in range(1, steps + 1):
-            t = i / steps
-            check_x = int(start_x + dx * t)
-            check_y = int(start_y + dy * t)
-            
-            # Comprobar si hay colisión con el nivel
-            if level.is_collision(check_x, check_y, 1, 1):
-                return False
-        
-        return True
+        # Comprobar línea de visión recorriendo los tiles intermedios (con caché por nivel)
+        return level.has_line_of_sight(origin[0], origin[1],
+                                       player.x + player.width//2, player.y + player.height//2)
     
     # Métodos para el árbol de comportamiento
     def check_player_visible(self, state):
@@ -206,33 +177,12 @@ class Zombie(EnemyBase):
         
         target_x, target_y = state["last_known_player_pos"]
         
-        # Calcular dirección hacia el jugador
-        dx = target_x - self.x
-        dy = target_y - self.y
-        
-        # Normalizar vector de dirección
-        length = max(1, (dx**2 + dy**2)**0.5)
-        dx = dx / length * self.speed
-        dy = dy / length * self.speed
-        
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Actualizar dirección visual
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-        
-        # Comprobar colisiones
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
-        
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
+        # Descartar el tramo de camino pendiente (se recalculará al perder de vista al jugador)
+        self.current_path = []
+        self.cancel_path_request()
         
-        self.moving = True
+        # Avanzar hacia el jugador (el paso se resuelve junto al del resto de enemigos)
+        self.move_towards(target_x, target_y)
         return True
     
     def calculate_path_to_player(self, state):
@@ -240,15 +190,21 @@ class Zombie(EnemyBase):
         if state["last_known_player_pos"] is None:
             return False
         
+        # Con campo de flujo compartido, solo se consulta el siguiente tramo
+        # cuando se ha terminado de recorrer el actual
+        center_x = self.x + self.width//2
+        center_y = self.y + self.height//2
+        if self.flow_field is not None and self.flow_field.covers(center_x, center_y):
+            self.cancel_path_request()
+            if not self.current_path:
+                self.current_path = self.flow_field.get_path_step(center_x, center_y)
+            return True
+        
         target_x, target_y = state["last_known_player_pos"]
         
-        # Calcular camino con A*
-        self.current_path = self.pathfinder.find_path(
-            self.x + self.width//2, 
-            self.y + self.height//2,
-            target_x + self.width//2, 
-            target_y + self.height//2
-        )
+        # Fuera del campo de flujo (mundos por chunks, lejos del jugador) o sin él:
+        # pedir el camino con A* (mientras llega, se sigue el que ya había)
+        self.plan_path(target_x + self.width//2, target_y + self.height//2)
         
         return True
     
@@ -270,32 +226,9 @@ class Zombie(EnemyBase):
             if not self.current_path:
                 return True
             target_x, target_y = self.current_path[0]
-            dx = target_x - (self.x + self.width//2)
-            dy = target_y - (self.y + self.height//2)
-        
-        # Normalizar vector de dirección
-        length = max(1, (dx**2 + dy**2)**0.5)
-        dx = dx / length * self.speed
-        dy = dy / length * self.speed
-        
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Actualizar dirección visual
-        if abs(dx) > abs(dy):
-            self.direction = "right" if dx > 0 else "left"
-        else:
-            self.direction = "down" if dy > 0 else "up"
-        
-        # Comprobar colisiones
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
         
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
-        
-        self.moving = True
+        # Avanzar hacia el punto con el centro del enemigo
+        self.move_towards(target_x - self.width//2, target_y - self.height//2)
         return True
     
     def move_randomly(self, state):
@@ -307,7 +240,7 @@ class Zombie(EnemyBase):
         
         # Elegir dirección aleatoria
         directions = ["up", "down", "left", "right"]
-        self.direction = random.choice(directions)
+        self.direction = self.rng.choice(directions)
         
         # Calcular nueva posición
         dx, dy = 0, 0
@@ -320,22 +253,8 @@ class Zombie(EnemyBase):
         elif self.direction == "right":
             dx = self.speed
         
-        # Actualizar posición
-        new_x = self.x + dx
-        new_y = self.y + dy
-        
-        # Comprobar colisiones con el nivel
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            self.x = new_x
-        
-        if not self.level.is_collision(self.x, new_y, self.width, self.height):
-            self.y = new_y
-        
-        # Si no se pudo mover, establecer cooldown
-        if not self.level.is_collision(new_x, self.y, self.width, self.height):
-            state["random_move_cooldown"] = 30  # Esperar 30 frames
-            self.moving = False
-        else:
-            self.moving = True
-        
+        # Dar el paso junto al resto de enemigos (el cooldown se decide en la siguiente
+        # actualización, según el eje del paso haya chocado o no con una pared)
+        self.move_towards(self.x + dx, self.y + dy)
+        self.random_step_axis = 1 if dx else 2
         return True 
\ No newline at end of file
@@ -2,14 +2,31 @@ import pygame
 import random
 from src.player import Player
 from src.level import Level
+from src.camera import Camera
 from src.enemies.zombie import Zombie
 from src.enemies.mummy import Mummy
+from src.enemies.enemy_store import EnemyStore
+from src.ai.flow_field import FlowField
+from src.ai.path_service import PathDeliveryLog, get_path_service
+from src.ai.scheduler import AIScheduler
+from src.ai.crowd import CrowdSteering
 from src.levels.level_loader import LevelLoader
+from src.levels.chunked_level import ChunkedLevel
+from src.levels.free_cells import get_free_cells
 from src.ui.hud import HUD
+from src.ui.profiler_overlay import ProfilerOverlay
 from src.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, TILE_SIZE
+from src.utils.audio import SoundBank, play_music, stop_music
+from src.utils.spatial_hash import SpatialHash
+from src.utils.profiler import profiler
+from src.utils.text_cache import render_text
+from src.utils.controls import KeyboardInput, INPUT_RESET
 
 class Game:
-    def __init__(self, screen):
+    # Radio (en tiles) alrededor del jugador en el que aparecen los enemigos
+    SPAWN_RADIUS = 20
+    
+    def __init__(self, screen, seed=None, input_source=None, world_path=None):
         self.screen = screen
         self.is_running = False
         self.level_number = 1
@@ -17,27 +34,77 @@ class Game:
         self.game_over = False
         self.victory = False
         
+        # Generador aleatorio propio de la partida: con la misma semilla y la
+        # misma entrada, la simulación se repite exactamente igual
+        self.seed = seed if seed is not None else random.randrange(1 << 32)
+        self.rng = random.Random(self.seed)
+        
+        # Fuente de entrada del jugador (teclado, grabación o reproducción)
+        self.input = input_source if input_source is not None else KeyboardInput()
+        
+        # Cuándo se entrega cada camino buscado en segundo plano: se graba al jugar
+        # y, al reproducir una partida, se toma de la repetición
+        self.path_log = PathDeliveryLog(getattr(self.input, "path_ages", None))
+        
+        # Archivo de mundo por chunks (None = nivel generado aleatoriamente)
+        self.world_path = world_path
+        
+        # Cuadrícula para la fase amplia de colisiones entre entidades
+        self.spatial_hash = SpatialHash()
+        
+        # Planificador de la IA: los enemigos lejanos se actualizan con menos frecuencia
+        self.ai_scheduler = AIScheduler()
+        
+        # Separación, cohesión y evitación de paredes para las hordas
+        self.crowd_steering = CrowdSteering()
+        
+        # Superposición de tiempos por fase (F3 para mostrarla)
+        self.profiler_overlay = ProfilerOverlay(profiler)
+        
         # Cargar sonidos
         self.load_sounds()
         
         # Inicializar componentes del juego
         self.reset_game()
     
+    def close_level(self):
+        """Libera los recursos del nivel actual (el archivo de los mundos por chunks)"""
+        if isinstance(getattr(self, "current_level", None), ChunkedLevel):
+            self.current_level.close()
+    
     def reset_game(self):
         """Reinicia el juego al estado inicial"""
-        # Cargar nivel
-        self.current_level = Level(self.level_number)
+        # Cargar nivel (los mundos por chunks se leen del disco bajo demanda;
+        # el archivo del mundo anterior se cierra antes de volver a abrirlo)
+        self.close_level()
+        if self.world_path:
+            self.current_level = ChunkedLevel(self.world_path)
+        else:
+            self.current_level = Level(self.level_number, self.rng)
         
         # Crear jugador en posición inicial
         player_start = self.current_level.get_player_start()
-        self.player = Player(player_start[0], player_start[1])
+        self.player = Player(player_start[0], player_start[1], self.sound_bank)
+        
+        # Cámara que sigue al jugador (en niveles que caben en pantalla no se mueve)
+        self.camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT,
+                             self.current_level.width * TILE_SIZE, self.current_level.height * TILE_SIZE)
+        self.camera.follow(self.player.get_collision_rect())
+        
+        # Servicio de caminos del nivel, con las entregas en el registro de la partida
+        get_path_service(self.current_level).log = self.path_log
+        
+        # Campo de flujo compartido por todos los enemigos
+        self.flow_field = FlowField(self.current_level)
+        self.update_flow_field()
         
         # Definir número de enemigos según el nivel
         num_zombies = 2 + self.level_number  # Aumenta con el nivel
         num_mummies = self.level_number // 2  # Aparecen en niveles más avanzados
         
-        # Crear enemigos
+        # Crear enemigos (con sus datos en un almacén común para moverlos por lotes)
         self.enemies = []
+        self.enemy_store = EnemyStore()
         
         # Generar posiciones válidas para los enemigos
         valid_enemy_positions = self.generate_valid_enemy_positions(num_zombies + num_mummies)
@@ -46,13 +113,15 @@ class Game:
         for i in range(num_zombies):
             if i < len(valid_enemy_positions):
                 pos = valid_enemy_positions[i]
-                self.enemies.append(Zombie(pos[0], pos[1], self.current_level))
+                self.enemies.append(Zombie(pos[0], pos[1], self.current_level, self.flow_field, self.rng,
+                                          self.enemy_store))
         
         # Crear momias
         for i in range(num_mummies):
             if i + num_zombies < len(valid_enemy_positions):
                 pos = valid_enemy_positions[i + num_zombies]
-                self.enemies.append(Mummy(pos[0], pos[1], self.current_level))
+                self.enemies.append(Mummy(pos[0], pos[1], self.current_level, self.flow_field, self.rng,
+                                         self.enemy_store))
         
         # Inicializar otros elementos del juego
         self.items = []
@@ -67,196 +136,290 @@ class Game:
         # Crear HUD
         self.hud = HUD(self)
         
-        # Iniciar música
-        try:
-            pygame.mixer.music.load("assets/music/level1.mp3")
-            pygame.mixer.music.play(-1)  # -1 para reproducir en bucle
-        except pygame.error:
-            print("No se pudo cargar la música del nivel")
+        # Forzar un redibujado completo en el siguiente frame
+        self.full_redraw = True
+        self.previous_rects = []
+        
+        self.play_level_music()
+    
+    def play_level_music(self):
+        """Inicia la música del nivel (-1 para reproducir en bucle)"""
+        play_music("assets/music/level1.mp3", -1)
     
     def load_sounds(self):
-        """Carga los efectos de sonido del juego"""
-        self.sounds = {}
+        """Carga los efectos de sonido del juego en el banco de sonidos"""
+        self.sound_bank = SoundBank()
         
-        # Lista de sonidos a cargar
+        # Lista de sonidos a cargar: nombre -> (ruta, categoría, ticks mínimos entre reproducciones)
         sound_files = {
-            "shoot": "assets/sounds/shoot.mp3",
-            "hit": "assets/sounds/hit.wav",
-            "pickup": "assets/sounds/pickup.mp3",
-            "death": "assets/sounds/death.mp3",
-            "victory": "assets/sounds/victory.mp3"
+            "shoot": ("assets/sounds/shoot.mp3", "player", 0),
+            "hit": ("assets/sounds/hit.wav", "impact", 10),
+            "pickup": ("assets/sounds/pickup.mp3", "event", 0),
+            "death": ("assets/sounds/death.mp3", "event", 0),
+            "victory": ("assets/sounds/victory.mp3", "event", 0)
         }
         
-        # Intentar cargar cada sonido
-        for name, path in sound_files.items():
-            try:
-                self.sounds[name] = pygame.mixer.Sound(path)
-            except pygame.error:
-                print(f"No se pudo cargar el sonido: {path}")
-                # Crear un sonido vacío como respaldo
-                self.sounds[name] = pygame.mixer.Sound(buffer=bytes([0] * 44100))
+        # Registrar cada sonido (vacío si no hay mezclador o falla la carga)
+        for name, (path, category, min_interval) in sound_files.items():
+            self.sound_bank.register(name, path, category, min_interval)
     
     def handle_event(self, event):
         """Maneja los eventos del juego"""
+        # Si la ventana se ha vuelto a mostrar, hay que redibujarla completa
+        if event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+            self.full_redraw = True
+        
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 return "menu"
-            elif event.key == pygame.K_r and (self.game_over or self.victory):
-                self.reset_game()
+            elif event.key == pygame.K_F3:
+                self.profiler_overlay.toggle()
+                self.full_redraw = True
         
-        # Pasar eventos al jugador
-        if not self.game_over and not self.victory:
-            self.player.handle_event(event)
+        # Pasar eventos a la entrada (disparar y reiniciar se aplican en el siguiente tick)
+        self.input.handle_event(event)
         
         return None
     
     def update(self):
         """Actualiza el estado del juego"""
+        # Cada tick consume exactamente una entrada (necesario para las repeticiones)
+        buttons = self.input.poll()
+        
         if self.game_over or self.victory:
+            if buttons & INPUT_RESET:
+                self.reset_game()
             return
         
         # Actualizar jugador
-        self.player.update(self.current_level)
+        with profiler.scope("player.update"):
+            self.player.update(self.current_level, buttons)
+        
+        # Recalcular el campo de flujo si el jugador ha cambiado de casilla
+        with profiler.scope("flow_field.update"):
+            self.update_flow_field()
         
         # Actualizar enemigos
-        for enemy in self.enemies:
-            enemy.update(self.player, self.current_level)
+        with profiler.scope("enemies.update"):
+            self.ai_scheduler.update(self.enemy_store, self.player, self.current_level)
+            
+            # Corregir los movimientos decididos para que la horda no se apile y aplicarlos a la vez
+            self.crowd_steering.steer(self.enemy_store, self.current_level)
+            self.enemy_store.resolve_moves(self.current_level)
         
         # Comprobar colisiones
-        self.check_collisions()
+        with profiler.scope("check_collisions"):
+            self.check_collisions()
         
         # Comprobar condiciones de victoria/derrota
         self.check_game_state()
+        
+        # Reproducir los sonidos pedidos en este tick (uno por efecto)
+        self.sound_bank.end_tick()
+    
+    def update_flow_field(self):
+        """Actualiza el campo de flujo hacia el centro del jugador"""
+        self.flow_field.update(
+            self.player.x + self.player.width // 2,
+            self.player.y + self.player.height // 2
+        )
     
     def check_collisions(self):
         """Comprueba colisiones entre entidades"""
+        # Repartir los enemigos en la cuadrícula: cada consulta solo revisa las celdas cercanas
+        self.spatial_hash.clear()
+        for enemy in self.enemies:
+            self.spatial_hash.insert(enemy, enemy.get_collision_rect())
+        
         # Colisiones jugador-enemigo
         player_rect = self.player.get_collision_rect()
-        for enemy in self.enemies:
-            enemy_rect = enemy.get_collision_rect()
-            if player_rect.colliderect(enemy_rect):
-                self.player.take_damage()
-                self.sounds["hit"].play()
-                
-                # Comprobar si el jugador ha muerto
-                if self.player.health <= 0:
-                    self.game_over = True
-                    self.sounds["death"].play()
-                    pygame.mixer.music.stop()
+        for enemy in self.spatial_hash.query(player_rect):
+            self.player.take_damage()
+            self.sound_bank.play("hit")
+            
+            # Comprobar si el jugador ha muerto
+            if self.player.health <= 0:
+                self.game_over = True
+                self.full_redraw = True
+                self.sound_bank.play("death")
+                stop_music()
         
         # Colisiones proyectil-enemigo
+        dead_enemies = set()
+        remaining_projectiles = []
         for projectile in self.player.projectiles:
             projectile_rect = projectile.get_collision_rect()
-            for enemy in self.enemies[:]:  # Usar copia para poder eliminar durante la iteración
-                enemy_rect = enemy.get_collision_rect()
-                if projectile_rect.colliderect(enemy_rect):
-                    enemy.take_damage()
-                    self.player.projectiles.remove(projectile)
-                    
-                    # Si el enemigo muere
-                    if enemy.health <= 0:
-                        self.enemies.remove(enemy)
-                        self.score += enemy.score_value
-                    break
+            hit = False
+            for enemy in self.spatial_hash.query(projectile_rect):
+                # Ignorar enemigos que ya han muerto en este tick
+                if id(enemy) in dead_enemies:
+                    continue
+                
+                enemy.take_damage()
+                hit = True
+                
+                # Si el enemigo muere
+                if enemy.health <= 0:
+                    dead_enemies.add(id(enemy))
+                    self.score += enemy.score_value
+                break
+            
+            if not hit:
+                remaining_projectiles.append(projectile)
+        
+        # Eliminar proyectiles y enemigos fuera del bucle de colisiones
+        self.player.projectiles = remaining_projectiles
+        if dead_enemies:
+            for enemy in self.enemies:
+                if id(enemy) in dead_enemies:
+                    self.enemy_store.remove(enemy)
+            self.enemies = [enemy for enemy in self.enemies if id(enemy) not in dead_enemies]
     
     def check_game_state(self):
         """Comprueba si se han cumplido las condiciones de victoria o derrota"""
         # Victoria si no quedan enemigos
         if len(self.enemies) == 0:
             self.victory = True
-            self.sounds["victory"].play()
-            pygame.mixer.music.stop()
+            self.full_redraw = True
+            self.sound_bank.play("victory")
+            stop_music()
     
     def render(self):
-        """Renderiza el juego en pantalla"""
+        """
+        Renderiza el juego en pantalla.
+        Devuelve la lista de rectángulos modificados, o None si se ha
+        redibujado la pantalla completa (en ese caso hay que usar flip).
+        """
+        # Las pantallas de fin de juego son estáticas: se dibujan una vez y
+        # después no cambia nada (salvo la superposición del profiler)
+        if self.game_over or self.victory:
+            if self.full_redraw or self.profiler_overlay.visible:
+                self.render_full()
+                return None
+            return []
+        
+        # Si la cámara se mueve, todo el fondo cambia de posición
+        if self.camera.follow(self.player.get_collision_rect()):
+            self.full_redraw = True
+        
+        if self.full_redraw:
+            self.render_full()
+            return None
+        
+        # Borrar los sprites del frame anterior restaurando el fondo
+        dirty_rects = self.previous_rects
+        for rect in dirty_rects:
+            self.restore_background(rect)
+        
+        # Dibujar sprites y HUD en su nueva posición
+        drawn_rects = self.render_sprites()
+        drawn_rects.extend(self.render_hud())
+        
+        self.previous_rects = drawn_rects
+        return dirty_rects + drawn_rects
+    
+    def render_full(self):
+        """Redibuja la pantalla completa"""
         # Dibujar fondo
         self.screen.fill((0, 0, 0))
         
         # Dibujar nivel
-        self.current_level.render(self.screen)
-        
-        # Dibujar jugador
-        self.player.render(self.screen)
+        with profiler.scope("level.render"):
+            self.current_level.render(self.screen, self.camera)
         
-        # Dibujar enemigos
-        for enemy in self.enemies:
-            enemy.render(self.screen)
+        # Dibujar jugador y enemigos
+        drawn_rects = self.render_sprites()
         
         # Dibujar HUD
-        self.hud.render(self.screen)
+        drawn_rects.extend(self.render_hud())
+        
+        self.previous_rects = drawn_rects
+        self.full_redraw = False
         
         # Mostrar mensaje de fin de juego si es necesario
         if self.game_over:
-            font = pygame.font.Font(None, 72)
-            text = font.render("GAME OVER", True, (255, 0, 0))
+            text = render_text("GAME OVER", 72, (255, 0, 0))
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             self.screen.blit(text, text_rect)
             
-            font = pygame.font.Font(None, 36)
-            text = font.render("Presiona R para reiniciar", True, (255, 255, 255))
+            text = render_text("Presiona R para reiniciar", 36, (255, 255, 255))
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
             self.screen.blit(text, text_rect)
         
         elif self.victory:
-            font = pygame.font.Font(None, 72)
-            text = font.render("¡VICTORIA!", True, (0, 255, 0))
+            text = render_text("¡VICTORIA!", 72, (0, 255, 0))
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
             self.screen.blit(text, text_rect)
             
-            font = pygame.font.Font(None, 36)
-            text = font.render("Presiona R para reiniciar", True, (255, 255, 255))
+            text = render_text("Presiona R para reiniciar", 36, (255, 255, 255))
             text_rect = text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
             self.screen.blit(text, text_rect)
     
-    def generate_valid_enemy_positions(self, num_positions):
-        """Genera posiciones válidas para los enemigos (sin colisiones con paredes)"""
-        valid_positions = []
-        attempts = 0
-        max_attempts = 1000  # Límite para evitar bucles infinitos
-        
-        while len(valid_positions) < num_positions and attempts < max_attempts:
-            # Generar posición aleatoria
-            x = random.randint(2, self.current_level.width - 3) * TILE_SIZE
-            y = random.randint(2, self.current_level.height - 3) * TILE_SIZE
-            
-            # Verificar que no colisiona con paredes
-            if not self.current_level.is_collision(x, y, TILE_SIZE, TILE_SIZE):
-                # Verificar que está a una distancia mínima del jugador
-                player_distance = ((x - self.player.x)**2 + (y - self.player.y)**2)**0.5
-                min_distance = 5 * TILE_SIZE  # Al menos 5 tiles de distancia
-                
-                if player_distance >= min_distance:
-                    # Verificar que no está demasiado cerca de otros enemigos
-                    too_close = False
-                    for pos in valid_positions:
-                        enemy_distance = ((x - pos[0])**2 + (y - pos[1])**2)**0.5
-                        if enemy_distance < 3 * TILE_SIZE:  # Al menos 3 tiles de separación
-                            too_close = True
-                            break
-                    
-                    if not too_close:
-                        valid_positions.append((x, y))
+    def render_sprites(self):
+        """
+        Dibuja jugador, proyectiles y enemigos visibles y devuelve sus
+        rectángulos en coordenadas de pantalla (recortados a la pantalla)
+        """
+        camera = self.camera
+        screen_rect = self.screen.get_rect()
+        with profiler.scope("sprites.render"):
+            # Dibujar jugador (y sus proyectiles)
+            self.player.render(self.screen, camera)
+            rects = [camera.to_screen_rect(self.player.get_collision_rect()).clip(screen_rect)]
+            for projectile in self.player.projectiles:
+                rect = projectile.get_collision_rect()
+                if camera.is_visible(rect):
+                    rects.append(camera.to_screen_rect(rect).clip(screen_rect))
             
-            attempts += 1
+            # Dibujar enemigos (los que quedan fuera de la vista no se dibujan)
+            for enemy in self.enemies:
+                rect = enemy.get_collision_rect()
+                if camera.is_visible(rect):
+                    enemy.render(self.screen, camera)
+                    rects.append(camera.to_screen_rect(rect).clip(screen_rect))
         
-        # Si no se encontraron suficientes posiciones, rellenar con posiciones por defecto
-        if len(valid_positions) < num_positions:
-            print(f"Advertencia: Solo se encontraron {len(valid_positions)} posiciones válidas para enemigos")
-            
-            # Añadir posiciones por defecto en los bordes del mapa
-            default_positions = [
-                (2 * TILE_SIZE, 2 * TILE_SIZE),
-                ((self.current_level.width - 3) * TILE_SIZE, 2 * TILE_SIZE),
-                (2 * TILE_SIZE, (self.current_level.height - 3) * TILE_SIZE),
-                ((self.current_level.width - 3) * TILE_SIZE, (self.current_level.height - 3) * TILE_SIZE)
-            ]
-            
-            for pos in default_positions:
-                if len(valid_positions) < num_positions and pos not in valid_positions:
-                    valid_positions.append(pos)
+        return rects
+    
+    def render_hud(self):
+        """Dibuja el HUD (y la superposición del profiler) y devuelve sus rectángulos"""
+        with profiler.scope("hud.render"):
+            rects = self.hud.render(self.screen)
         
-        return valid_positions
+        if self.profiler_overlay.visible:
+            rects.append(self.profiler_overlay.render(self.screen))
         
+        return rects
+    
+    def restore_background(self, rect):
+        """Restaura el fondo del nivel bajo un rectángulo de la pantalla"""
+        with profiler.scope("level.render"):
+            self.screen.fill((0, 0, 0), rect)
+            self.current_level.render_area(self.screen, rect, self.camera)
+    
+    def generate_valid_enemy_positions(self, num_positions):
+        """
+        Genera posiciones válidas para los enemigos: casillas libres alcanzables,
+        a cierta distancia del jugador y separadas entre sí (muestreo de disco de Poisson)
+        """
+        # Zona de aparición: el nivel entero, salvo en mapas más grandes que el radio de aparición
+        player_tile_x = int(self.player.x // TILE_SIZE)
+        player_tile_y = int(self.player.y // TILE_SIZE)
+        bounds = (max(2, player_tile_x - self.SPAWN_RADIUS),
+                  max(2, player_tile_y - self.SPAWN_RADIUS),
+                  min(self.current_level.width - 3, player_tile_x + self.SPAWN_RADIUS),
+                  min(self.current_level.height - 3, player_tile_y + self.SPAWN_RADIUS))
+        
+        # Al menos 5 tiles de distancia al jugador y 3 tiles de separación entre enemigos
+        cells = get_free_cells(self.current_level).sample(
+            self.rng, num_positions, min_spacing=3,
+            exclusions=[((player_tile_x, player_tile_y), 5)], bounds=bounds
+        )
+        
+        if len(cells) < num_positions:
+            print(f"Advertencia: Solo se encontraron {len(cells)} posiciones válidas para enemigos")
+        
+        return [(x * TILE_SIZE, y * TILE_SIZE) for x, y in cells]
+    
     def generate_items(self):
         """Genera ítems en el nivel"""
         # Por ahora, no generamos ítems
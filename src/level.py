@@ -1,12 +1,14 @@
 import pygame
 import random
 from src.utils.constants import TILE_SIZE
-from src.utils.image_loader import load_image, create_fallback_surface
-import os
+from src.utils.image_loader import get_asset_image
+from src.levels.tile_grid import TileGrid
+from src.ai.line_of_sight import VisibilityCache, pixel_to_tile
 
 class Level:
-    def __init__(self, level_num):
+    def __init__(self, level_num, rng=None):
         self.level_num = level_num
+        self.rng = rng if rng is not None else random
         self.width = 20  # Ancho en tiles
         self.height = 15  # Alto en tiles
         
@@ -15,11 +17,15 @@ class Level:
         
         # Cargar sprites de tiles
         self.load_tiles()
+        
+        # Fondo pre-renderizado (se compone en el primer render)
+        self.background = None
+        self.dirty_tiles = set()
     
     def load_map(self):
         """Carga o genera el mapa del nivel"""
         # Ejemplo simple: generar un mapa aleatorio con paredes en los bordes
-        self.map = []
+        rows = []
         
         for y in range(self.height):
             row = []
@@ -28,14 +34,21 @@ class Level:
                 if x == 0 or y == 0 or x == self.width - 1 or y == self.height - 1:
                     row.append(1)  # 1 = pared
                 # Algunas paredes aleatorias en el interior
-                elif random.random() < 0.2:
+                elif self.rng.random() < 0.2:
                     row.append(1)  # 1 = pared
                 else:
                     row.append(0)  # 0 = suelo
-            self.map.append(row)
+            rows.append(row)
+        
+        # Guardar el mapa en una cuadrícula compacta (1 = pared es el único tile sólido).
+        # Los rectángulos que salen del mapa se recortan a sus límites
+        self.grid = TileGrid(self.width, self.height, rows, solid_types=(1,), clamp_to_bounds=True)
         
         # Asegurar que hay un camino desde el inicio hasta algún punto del mapa
         self.ensure_playable()
+        
+        # Caché de línea de visión entre casillas (se invalida al cambiar el mapa)
+        self.visibility = VisibilityCache(self.grid)
     
     def ensure_playable(self):
         """Asegura que el mapa es jugable (hay camino desde el inicio)"""
@@ -44,35 +57,18 @@ class Level:
         for y in range(start_y - 1, start_y + 2):
             for x in range(start_x - 1, start_x + 2):
                 if 0 <= y < self.height and 0 <= x < self.width:
-                    self.map[y][x] = 0  # Asegurar que es suelo
+                    self.grid.set(x, y, 0)  # Asegurar que es suelo
     
     def load_tiles(self):
-        """Carga los sprites de los tiles"""
+        """Carga los sprites de los tiles (compartidos entre niveles)"""
         try:
-            # Definir rutas de archivos
-            floor_png = "assets/images/floor.png"
-            floor_svg = "assets/images/floor.svg"
-            wall_png = "assets/images/wall.png"
-            wall_svg = "assets/images/wall.svg"
-            
-            # Cargar tile de suelo
-            if os.path.exists(floor_png):
-                self.floor_tile = load_image(floor_png, (TILE_SIZE, TILE_SIZE))
-            elif os.path.exists(floor_svg):
-                self.floor_tile = load_image(floor_svg, (TILE_SIZE, TILE_SIZE))
-            else:
-                print("No se encontró imagen para el suelo, usando respaldo")
-                self.floor_tile = self.create_default_floor_tile()
-            
-            # Cargar tile de pared
-            if os.path.exists(wall_png):
-                self.wall_tile = load_image(wall_png, (TILE_SIZE, TILE_SIZE))
-            elif os.path.exists(wall_svg):
-                self.wall_tile = load_image(wall_svg, (TILE_SIZE, TILE_SIZE))
-            else:
-                print("No se encontró imagen para la pared, usando respaldo")
-                self.wall_tile = self.create_default_wall_tile()
-                
+            # Los tiles son opacos: se convierten sin canal alfa
+            self.floor_tile = get_asset_image(
+                "floor", (TILE_SIZE, TILE_SIZE), alpha=False, fallback=self.create_default_floor_tile
+            )
+            self.wall_tile = get_asset_image(
+                "wall", (TILE_SIZE, TILE_SIZE), alpha=False, fallback=self.create_default_wall_tile
+            )
         except Exception as e:
             print(f"Error al cargar los tiles: {e}")
             self.create_default_tiles()
@@ -132,37 +128,70 @@ class Level:
     
     def is_collision(self, x, y, width, height):
         """Comprueba si hay colisión en la posición dada"""
-        # Convertir coordenadas de píxeles a coordenadas de tiles
-        tile_x1 = max(0, int(x // TILE_SIZE))
-        tile_y1 = max(0, int(y // TILE_SIZE))
-        tile_x2 = min(self.width - 1, int((x + width - 1) // TILE_SIZE))
-        tile_y2 = min(self.height - 1, int((y + height - 1) // TILE_SIZE))
-        
-        # Comprobar cada tile en el área
-        for ty in range(tile_y1, tile_y2 + 1):
-            for tx in range(tile_x1, tile_x2 + 1):
-                if ty < len(self.map) and tx < len(self.map[ty]):
-                    tile_type = self.map[ty][tx]
-                    if tile_type == 1:  # 1 representa una pared
-                        return True
-        
-        return False
+        return self.grid.is_rect_blocked(x, y, width, height)
+    
+    def is_collision_many(self, rects):
+        """Comprueba colisiones para una lista de rectángulos (x, y, ancho, alto) en una sola llamada"""
+        return self.grid.are_rects_blocked(rects)
+    
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Comprueba si hay línea de visión entre dos puntos (en píxeles)"""
+        return self.visibility.is_visible(pixel_to_tile(x1, y1), pixel_to_tile(x2, y2))
     
-    def render(self, screen):
-        """Renderiza el nivel en pantalla"""
+    def has_line_of_sight_many(self, points, x, y):
+        """Comprueba la línea de visión desde cada punto (x, y) de la lista hasta un mismo punto"""
+        return self.visibility.check_many([pixel_to_tile(px, py) for px, py in points], pixel_to_tile(x, y))
+    
+    def set_tile(self, tile_x, tile_y, tile_type):
+        """Cambia el tipo de un tile y lo marca para recomponer el fondo"""
+        self.grid.set(tile_x, tile_y, tile_type)
+        self.dirty_tiles.add((tile_x, tile_y))
+    
+    def build_background(self):
+        """Compone todos los tiles una sola vez en una superficie de fondo"""
+        self.background = pygame.Surface((self.width * TILE_SIZE, self.height * TILE_SIZE))
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        
         for y in range(self.height):
             for x in range(self.width):
-                # Dibujar suelo en todas partes
-                screen.blit(self.floor_tile, (x * TILE_SIZE, y * TILE_SIZE))
-                
-                # Dibujar paredes donde corresponda
-                if self.map[y][x] == 1:
-                    screen.blit(self.wall_tile, (x * TILE_SIZE, y * TILE_SIZE))
+                self.draw_tile(x, y)
+        
+        self.dirty_tiles.clear()
+    
+    def draw_tile(self, x, y):
+        """Dibuja un tile en la superficie de fondo"""
+        # Dibujar suelo en todas partes
+        self.background.blit(self.floor_tile, (x * TILE_SIZE, y * TILE_SIZE))
+        
+        # Dibujar paredes donde corresponda
+        if self.grid.get(x, y) == 1:
+            self.background.blit(self.wall_tile, (x * TILE_SIZE, y * TILE_SIZE))
+    
+    def update_background(self):
+        """Compone el fondo si no existe o recompone solo los tiles modificados"""
+        if self.background is None:
+            self.build_background()
+        elif self.dirty_tiles:
+            for x, y in self.dirty_tiles:
+                self.draw_tile(x, y)
+            self.dirty_tiles.clear()
+    
+    def render(self, screen, camera=None):
+        """Renderiza en pantalla la parte del nivel que ve la cámara"""
+        self.update_background()
+        if camera is None:
+            screen.blit(self.background, (0, 0))
+        else:
+            # Solo se copia la zona visible: el coste no depende del tamaño del mapa
+            screen.blit(self.background, (0, 0), camera.rect)
+    
+    def render_area(self, screen, rect, camera=None):
+        """Redibuja solo la zona del fondo bajo el rectángulo de pantalla dado"""
+        self.update_background()
+        area = camera.to_world_rect(rect) if camera is not None else rect
+        screen.blit(self.background, rect.topleft, area)
     
     def is_tile_blocked(self, tile_x, tile_y):
-        """Comprueba si un tile está bloqueado (es una pared)"""
-        # Verificar que las coordenadas están dentro de los límites
-        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
-            return self.map[tile_y][tile_x] == 1  # 1 representa una pared
-        # Si está fuera de los límites, considerarlo como bloqueado
-        return True 
\ No newline at end of file
+        """Comprueba si un tile está bloqueado (es una pared o está fuera de los límites)"""
+        return self.grid.is_tile_blocked(tile_x, tile_y)
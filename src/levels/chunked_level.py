@@ -0,0 +1,153 @@
+# Nivel con el mapa dividido en chunks
+# Autor: [Tu Nombre] - [Tu Matrícula]
+
+import pygame
+from collections import OrderedDict
+from src.utils.constants import TILE_SIZE
+from src.utils.image_loader import get_asset_image
+from src.levels.chunked_world import ChunkedGrid
+from src.ai.line_of_sight import VisibilityCache, pixel_to_tile
+
+class ChunkedLevel:
+    """
+    Nivel leído de un archivo de mundo por chunks (ver chunked_world).
+    Los tiles se cargan del disco bajo demanda y el fondo se compone por chunks:
+    solo se mantienen en memoria las superficies de los chunks usados más
+    recientemente, de modo que el tamaño del mapa no limita la memoria.
+    """
+    def __init__(self, file_path, max_chunk_surfaces=32):
+        # Mapa por chunks: todo lo que no es suelo (pared, arbusto, agua) es sólido
+        self.grid = ChunkedGrid(file_path, solid_types=(1, 2, 3))
+        self.width = self.grid.width
+        self.height = self.grid.height
+        
+        # Caché de línea de visión entre casillas (se invalida al cambiar el mapa)
+        self.visibility = VisibilityCache(self.grid)
+        
+        # Cargar imágenes de tiles
+        self.load_tiles()
+        
+        # Superficies de los chunks ya compuestos: (cx, cy) -> Surface
+        self.chunk_pixels = self.grid.chunk_size * TILE_SIZE
+        self.max_chunk_surfaces = max_chunk_surfaces
+        self.chunk_surfaces = OrderedDict()
+        self.pixel_rect = pygame.Rect(0, 0, self.width * TILE_SIZE, self.height * TILE_SIZE)
+    
+    def load_tiles(self):
+        """Carga las imágenes de los tiles (compartidas entre niveles)"""
+        tile_size = (TILE_SIZE, TILE_SIZE)
+        self.tiles = {
+            0: get_asset_image("floor", tile_size, alpha=False),  # Suelo
+            1: get_asset_image("wall", tile_size, alpha=False),   # Pared
+            2: get_asset_image("bush", tile_size, alpha=False),   # Arbusto
+            3: get_asset_image("water", tile_size, alpha=False)   # Agua
+        }
+    
+    def close(self):
+        """Cierra el archivo del mundo y descarta las superficies compuestas"""
+        self.grid.close()
+        self.chunk_surfaces.clear()
+    
+    def get_player_start(self):
+        """Devuelve la posición inicial del jugador"""
+        start_x, start_y = self.grid.player_start
+        return (start_x * TILE_SIZE, start_y * TILE_SIZE)
+    
+    def is_collision(self, x, y, width, height):
+        """Comprueba si hay colisión en las coordenadas dadas"""
+        return self.grid.is_rect_blocked(x, y, width, height)
+    
+    def is_collision_many(self, rects):
+        """Comprueba colisiones para una lista de rectángulos (x, y, ancho, alto) en una sola llamada"""
+        return self.grid.are_rects_blocked(rects)
+    
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Comprueba si hay línea de visión entre dos puntos (en píxeles)"""
+        return self.visibility.is_visible(pixel_to_tile(x1, y1), pixel_to_tile(x2, y2))
+    
+    def has_line_of_sight_many(self, points, x, y):
+        """Comprueba la línea de visión desde cada punto (x, y) de la lista hasta un mismo punto"""
+        return self.visibility.check_many([pixel_to_tile(px, py) for px, py in points], pixel_to_tile(x, y))
+    
+    def is_tile_blocked(self, tx, ty):
+        """Comprueba si un tile es un obstáculo (fuera del mapa también lo es)"""
+        return self.grid.is_tile_blocked(tx, ty)
+    
+    def set_tile(self, tx, ty, tile_type):
+        """Cambia el tipo de un tile y lo redibuja si su chunk ya está compuesto"""
+        self.grid.set(tx, ty, tile_type)
+        size = self.grid.chunk_size
+        surface = self.chunk_surfaces.get((tx // size, ty // size))
+        if surface is not None:
+            surface.blit(self.tiles[tile_type], ((tx % size) * TILE_SIZE, (ty % size) * TILE_SIZE))
+    
+    def build_chunk_surface(self, cx, cy):
+        """Compone los tiles de un chunk en una superficie"""
+        size = self.grid.chunk_size
+        surface = pygame.Surface((self.chunk_pixels, self.chunk_pixels))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        
+        tiles, _ = self.grid.get_chunk(cx, cy)
+        surface.blits([(self.tiles[tiles[ly * size + lx]], (lx * TILE_SIZE, ly * TILE_SIZE))
+                       for ly in range(size) for lx in range(size)], False)
+        return surface
+    
+    def get_chunk_surface(self, cx, cy):
+        """Devuelve la superficie de un chunk, componiéndola si no está en memoria"""
+        key = (cx, cy)
+        surface = self.chunk_surfaces.get(key)
+        if surface is None:
+            surface = self.build_chunk_surface(cx, cy)
+            self.chunk_surfaces[key] = surface
+            if len(self.chunk_surfaces) > self.max_chunk_surfaces:
+                self.chunk_surfaces.popitem(last=False)
+        else:
+            self.chunk_surfaces.move_to_end(key)
+        return surface
+    
+    def prefetch(self, world_rect):
+        """Compone como mucho un chunk del anillo que rodea la zona visible (para que al llegar ya esté listo)"""
+        chunk_pixels = self.chunk_pixels
+        cx1 = world_rect.left // chunk_pixels - 1
+        cy1 = world_rect.top // chunk_pixels - 1
+        cx2 = (world_rect.right - 1) // chunk_pixels + 1
+        cy2 = (world_rect.bottom - 1) // chunk_pixels + 1
+        
+        for cy in range(max(0, cy1), min(self.grid.chunks_y, cy2 + 1)):
+            for cx in range(max(0, cx1), min(self.grid.chunks_x, cx2 + 1)):
+                key = (cx, cy)
+                if key not in self.chunk_surfaces:
+                    # Se guarda como el menos reciente: si falta sitio, se descarta antes que los visibles
+                    if len(self.chunk_surfaces) >= self.max_chunk_surfaces:
+                        self.chunk_surfaces.popitem(last=False)
+                    self.chunk_surfaces[key] = self.build_chunk_surface(cx, cy)
+                    self.chunk_surfaces.move_to_end(key, last=False)
+                    return
+    
+    def blit_world(self, screen, world_rect, dest):
+        """Copia a la pantalla la zona world_rect del mapa, con su esquina superior izquierda en dest"""
+        visible = world_rect.clip(self.pixel_rect)
+        if visible.width <= 0 or visible.height <= 0:
+            return
+        
+        chunk_pixels = self.chunk_pixels
+        offset_x = dest[0] - world_rect.x
+        offset_y = dest[1] - world_rect.y
+        for cy in range(visible.top // chunk_pixels, (visible.bottom - 1) // chunk_pixels + 1):
+            for cx in range(visible.left // chunk_pixels, (visible.right - 1) // chunk_pixels + 1):
+                chunk_rect = pygame.Rect(cx * chunk_pixels, cy * chunk_pixels, chunk_pixels, chunk_pixels)
+                area = chunk_rect.clip(visible)
+                screen.blit(self.get_chunk_surface(cx, cy), (area.x + offset_x, area.y + offset_y),
+                            area.move(-chunk_rect.x, -chunk_rect.y))
+    
+    def render(self, screen, camera=None):
+        """Renderiza en pantalla los chunks que ve la cámara"""
+        world_rect = camera.rect if camera is not None else screen.get_rect()
+        self.blit_world(screen, world_rect, (0, 0))
+        self.prefetch(world_rect)
+    
+    def render_area(self, screen, rect, camera=None):
+        """Redibuja solo la zona del fondo bajo el rectángulo de pantalla dado"""
+        area = camera.to_world_rect(rect) if camera is not None else rect
+        self.blit_world(screen, area, rect.topleft)
@@ -0,0 +1,251 @@
+# Mundo dividido en chunks para mapas muy grandes
+# Autor: [Tu Nombre] - [Tu Matrícula]
+
+import random
+import struct
+import zlib
+from collections import OrderedDict
+from src.utils.constants import TILE_SIZE
+
+# Tamaño de cada chunk en tiles (CHUNK_SIZE x CHUNK_SIZE)
+CHUNK_SIZE = 16
+
+# Cabecera: identificador, versión, ancho, alto, tamaño de chunk y casilla inicial del jugador.
+# Le sigue una tabla (offset, longitud) por chunk y los chunks comprimidos con zlib
+WORLD_MAGIC = b"ZWLD"
+WORLD_VERSION = 1
+HEADER_FORMAT = "<4sBIIHII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+ENTRY_FORMAT = "<QI"
+ENTRY_SIZE = struct.calcsize(ENTRY_FORMAT)
+
+def chunk_count(size, chunk_size=CHUNK_SIZE):
+    """Número de chunks necesarios para cubrir size tiles"""
+    return (size + chunk_size - 1) // chunk_size
+
+def save_chunked_world(file_path, width, height, chunk_source, player_start=(2, 2), chunk_size=CHUNK_SIZE):
+    """
+    Guarda un mundo chunk a chunk, sin tener nunca el mapa completo en memoria.
+    
+    Args:
+        file_path (str): Ruta del archivo a crear
+        width, height (int): Tamaño del mapa en tiles
+        chunk_source (callable): Función (cx, cy) -> bytes con los chunk_size * chunk_size
+            tiles del chunk, fila a fila (las casillas fuera del mapa se ignoran)
+        player_start (tuple): Casilla inicial del jugador
+        chunk_size (int): Tamaño de cada chunk en tiles
+    """
+    chunks_x = chunk_count(width, chunk_size)
+    chunks_y = chunk_count(height, chunk_size)
+    table_size = chunks_x * chunks_y * ENTRY_SIZE
+    
+    with open(file_path, "wb") as world_file:
+        world_file.write(struct.pack(HEADER_FORMAT, WORLD_MAGIC, WORLD_VERSION, width, height,
+                                     chunk_size, player_start[0], player_start[1]))
+        world_file.write(bytes(table_size))
+        
+        # Escribir los chunks y anotar dónde queda cada uno
+        table = bytearray()
+        offset = HEADER_SIZE + table_size
+        for cy in range(chunks_y):
+            for cx in range(chunks_x):
+                tiles = bytes(chunk_source(cx, cy))
+                if len(tiles) != chunk_size * chunk_size:
+                    raise ValueError(f"El chunk ({cx}, {cy}) no tiene {chunk_size * chunk_size} tiles")
+                data = zlib.compress(tiles, 6)
+                world_file.write(data)
+                table += struct.pack(ENTRY_FORMAT, offset, len(data))
+                offset += len(data)
+        
+        world_file.seek(HEADER_SIZE)
+        world_file.write(table)
+
+def generate_world(file_path, width, height, seed=0, wall_chance=0.15, player_start=(2, 2), chunk_size=CHUNK_SIZE):
+    """
+    Genera un mundo aleatorio con paredes en los bordes. Cada chunk usa su propia
+    semilla, así que el resultado es el mismo sin importar el orden de generación.
+    """
+    start_x, start_y = player_start
+    
+    def chunk_source(cx, cy):
+        rng = random.Random(f"{seed}:{cx}:{cy}")
+        tiles = bytearray(chunk_size * chunk_size)
+        for ly in range(chunk_size):
+            y = cy * chunk_size + ly
+            for lx in range(chunk_size):
+                x = cx * chunk_size + lx
+                if x <= 0 or y <= 0 or x >= width - 1 or y >= height - 1:
+                    tiles[ly * chunk_size + lx] = 1  # Bordes (y fuera del mapa): pared
+                elif abs(x - start_x) <= 1 and abs(y - start_y) <= 1:
+                    tiles[ly * chunk_size + lx] = 0  # Zona libre alrededor del inicio
+                elif rng.random() < wall_chance:
+                    tiles[ly * chunk_size + lx] = 1
+        return tiles
+    
+    save_chunked_world(file_path, width, height, chunk_source, player_start, chunk_size)
+
+class ChunkedGrid:
+    """
+    Cuadrícula de tiles leída por chunks bajo demanda desde un archivo de mundo.
+    Ofrece las mismas consultas que TileGrid (get, set, is_tile_blocked,
+    is_rect_blocked, consultas por lotes y copy_solid), pero solo mantiene en
+    memoria los últimos chunks usados. Los chunks modificados no se descartan.
+    """
+    def __init__(self, file_path, solid_types=(1,), clamp_to_bounds=False, max_chunks=1024):
+        self.file_path = file_path
+        self.world_file = open(file_path, "rb")
+        
+        header = self.world_file.read(HEADER_SIZE)
+        if len(header) < HEADER_SIZE:
+            raise ValueError(f"Archivo de mundo demasiado corto: {file_path}")
+        magic, version, width, height, chunk_size, start_x, start_y = struct.unpack(HEADER_FORMAT, header)
+        if magic != WORLD_MAGIC or version != WORLD_VERSION:
+            raise ValueError(f"Formato de mundo no soportado: {file_path}")
+        
+        self.width = width
+        self.height = height
+        self.chunk_size = chunk_size
+        self.player_start = (start_x, start_y)
+        self.chunks_x = chunk_count(width, chunk_size)
+        self.chunks_y = chunk_count(height, chunk_size)
+        
+        table = self.world_file.read(self.chunks_x * self.chunks_y * ENTRY_SIZE)
+        self.table = list(struct.iter_unpack(ENTRY_FORMAT, table))
+        
+        # Tipos de tile que bloquean el paso (igual que en TileGrid)
+        self.solid_types = frozenset(solid_types)
+        self.solid_lookup = bytes(1 if value in self.solid_types else 0 for value in range(256))
+        self.clamp_to_bounds = clamp_to_bounds
+        
+        # Chunks cargados: (cx, cy) -> (tiles, sólidos). Los modificados se guardan aparte
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.modified = {}
+        self.loads = 0
+        
+        # Último chunk consultado (las consultas seguidas suelen caer en el mismo)
+        self.last_key = None
+        self.last_chunk = None
+        
+        # Versión del mapa: aumenta con cada cambio de tile
+        self.version = 0
+    
+    def close(self):
+        """Cierra el archivo del mundo"""
+        self.world_file.close()
+    
+    def load_chunk(self, cx, cy):
+        """Lee y descomprime un chunk del archivo"""
+        offset, length = self.table[cy * self.chunks_x + cx]
+        self.world_file.seek(offset)
+        tiles = bytearray(zlib.decompress(self.world_file.read(length)))
+        self.loads += 1
+        return tiles, bytearray(tiles.translate(self.solid_lookup))
+    
+    def get_chunk(self, cx, cy):
+        """Devuelve (tiles, sólidos) de un chunk, cargándolo si no está en memoria"""
+        key = (cx, cy)
+        if key == self.last_key:
+            return self.last_chunk
+        
+        chunk = self.modified.get(key)
+        if chunk is None:
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                chunk = self.load_chunk(cx, cy)
+                self.chunks[key] = chunk
+                if len(self.chunks) > self.max_chunks:
+                    self.chunks.popitem(last=False)
+            else:
+                self.chunks.move_to_end(key)
+        
+        self.last_key = key
+        self.last_chunk = chunk
+        return chunk
+    
+    def get(self, tile_x, tile_y):
+        """Devuelve el tipo de un tile"""
+        size = self.chunk_size
+        tiles, _ = self.get_chunk(tile_x // size, tile_y // size)
+        return tiles[(tile_y % size) * size + tile_x % size]
+    
+    def set(self, tile_x, tile_y, tile_type):
+        """Cambia el tipo de un tile (el chunk queda fijado en memoria)"""
+        size = self.chunk_size
+        key = (tile_x // size, tile_y // size)
+        tiles, solid = self.get_chunk(*key)
+        index = (tile_y % size) * size + tile_x % size
+        if tiles[index] == tile_type:
+            return
+        
+        tiles[index] = tile_type
+        solid[index] = self.solid_lookup[tile_type]
+        self.modified[key] = (tiles, solid)
+        self.chunks.pop(key, None)
+        self.version += 1
+    
+    def is_tile_blocked(self, tile_x, tile_y):
+        """Comprueba si un tile es sólido (fuera del mapa siempre lo es)"""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            size = self.chunk_size
+            _, solid = self.get_chunk(tile_x // size, tile_y // size)
+            return solid[(tile_y % size) * size + tile_x % size] == 1
+        return True
+    
+    def tile_range(self, x, y, width, height):
+        """Convierte un rectángulo en píxeles al rango de tiles (x1, y1, x2, y2) que ocupa"""
+        return (int(x // TILE_SIZE), int(y // TILE_SIZE),
+                int((x + width - 1) // TILE_SIZE), int((y + height - 1) // TILE_SIZE))
+    
+    def is_rect_blocked(self, x, y, width, height):
+        """Comprueba si un rectángulo en píxeles toca algún tile sólido"""
+        x1, y1, x2, y2 = self.tile_range(x, y, width, height)
+        
+        if self.clamp_to_bounds:
+            x1 = max(0, x1)
+            y1 = max(0, y1)
+            x2 = min(self.width - 1, x2)
+            y2 = min(self.height - 1, y2)
+        elif x1 < 0 or y1 < 0 or x2 >= self.width or y2 >= self.height:
+            return True
+        
+        for ty in range(y1, y2 + 1):
+            for tx in range(x1, x2 + 1):
+                if self.is_tile_blocked(tx, ty):
+                    return True
+        return False
+    
+    def are_tiles_blocked(self, tiles):
+        """Consulta por lotes: comprueba si cada tile (x, y) de la lista es sólido"""
+        return [self.is_tile_blocked(tx, ty) for tx, ty in tiles]
+    
+    def are_rects_blocked(self, rects):
+        """Consulta por lotes: comprueba si cada rectángulo (x, y, ancho, alto) toca algún tile sólido"""
+        return [self.is_rect_blocked(x, y, w, h) for x, y, w, h in rects]
+    
+    def copy_solid(self, x0, y0, width, height):
+        """
+        Copia la máscara de sólidos de una región de tiles a un bytearray plano
+        (índice y * width + x). Las casillas fuera del mapa se marcan como sólidas.
+        """
+        region = bytearray(b"\x01") * (width * height)
+        x_start = max(0, x0)
+        y_start = max(0, y0)
+        x_end = min(self.width, x0 + width)
+        y_end = min(self.height, y0 + height)
+        if x_start >= x_end or y_start >= y_end:
+            return region
+        
+        size = self.chunk_size
+        for cy in range(y_start // size, (y_end - 1) // size + 1):
+            for cx in range(x_start // size, (x_end - 1) // size + 1):
+                _, solid = self.get_chunk(cx, cy)
+                left = max(x_start, cx * size)
+                right = min(x_end, (cx + 1) * size)
+                count = right - left
+                for y in range(max(y_start, cy * size), min(y_end, (cy + 1) * size)):
+                    source = (y - cy * size) * size + (left - cx * size)
+                    target = (y - y0) * width + (left - x0)
+                    region[target:target + count] = solid[source:source + count]
+        
+        return region
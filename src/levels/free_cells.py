@@ -0,0 +1,139 @@
+# Índice de casillas libres y muestreo de posiciones de aparición
+# Autor: [Tu Nombre] - [Tu Matrícula]
+
+import weakref
+from collections import deque
+from src.utils.constants import TILE_SIZE
+
+# Radio (en tiles) alrededor del inicio del jugador que cubre el índice; en los niveles
+# normales abarca el mapa entero y en los mundos por chunks limita la exploración
+INDEX_RADIUS = 64
+
+class FreeCellIndex:
+    """
+    Lista de las casillas libres alcanzables desde una casilla de inicio
+    (BFS por las cuatro direcciones), en un orden fijo para que el muestreo
+    sea reproducible con la misma semilla.
+    """
+    def __init__(self, level, start_tile, bounds=None):
+        self.level = level
+        self.start_tile = start_tile
+        
+        # Rango de tiles (x1, y1, x2, y2) que se explora
+        if bounds is None:
+            bounds = (0, 0, level.width - 1, level.height - 1)
+        self.bounds = bounds
+        
+        self.version = level.grid.version
+        self.cells = self.flood_fill()
+    
+    def flood_fill(self):
+        """Recorre las casillas libres alcanzables desde el inicio"""
+        x1, y1, x2, y2 = self.bounds
+        is_tile_blocked = self.level.is_tile_blocked
+        start = self.start_tile
+        if not (x1 <= start[0] <= x2 and y1 <= start[1] <= y2) or is_tile_blocked(*start):
+            return []
+        
+        cells = [start]
+        seen = {start}
+        queue = deque([start])
+        while queue:
+            x, y = queue.popleft()
+            for neighbor in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                nx, ny = neighbor
+                if (neighbor not in seen and x1 <= nx <= x2 and y1 <= ny <= y2
+                        and not is_tile_blocked(nx, ny)):
+                    seen.add(neighbor)
+                    cells.append(neighbor)
+                    queue.append(neighbor)
+        return cells
+    
+    def __len__(self):
+        return len(self.cells)
+    
+    def sample(self, rng, count, min_spacing=0, exclusions=(), bounds=None):
+        """
+        Elige hasta count casillas al azar con muestreo de disco de Poisson: cada
+        casilla elegida queda al menos a min_spacing tiles de las demás y fuera
+        de las exclusiones [((x, y), distancia mínima), ...]. Solo se aceptan
+        casillas dentro de bounds (x1, y1, x2, y2) si se indica.
+        
+        Cada casilla candidata se prueba una sola vez, así que el coste está
+        acotado por el número de casillas libres. Si con la separación pedida no
+        hay sitio suficiente, el resto se completa sin exigirla.
+        """
+        candidates = self.cells
+        if bounds is not None:
+            x1, y1, x2, y2 = bounds
+            candidates = [(x, y) for x, y in candidates if x1 <= x <= x2 and y1 <= y <= y2]
+        
+        # Quitar las casillas demasiado cercanas a las exclusiones (p. ej. el jugador)
+        if exclusions:
+            candidates = [cell for cell in candidates
+                          if all((cell[0] - point[0]) ** 2 + (cell[1] - point[1]) ** 2 >= distance ** 2
+                                 for point, distance in exclusions)]
+        else:
+            candidates = list(candidates)
+        
+        chosen = []
+        rejected = []
+        
+        # Cuadrícula de aceleración: con celdas de lado min_spacing, una casilla solo
+        # puede estar demasiado cerca de las elegidas en su celda o en las 8 vecinas
+        cell_size = max(1, int(min_spacing))
+        spacing_sq = min_spacing * min_spacing
+        buckets = {}
+        
+        # Fisher-Yates parcial: cada candidata se saca al azar una sola vez
+        remaining = len(candidates)
+        while remaining > 0 and len(chosen) < count:
+            index = rng.randrange(remaining)
+            remaining -= 1
+            cell = candidates[index]
+            candidates[index] = candidates[remaining]
+            
+            bx = cell[0] // cell_size
+            by = cell[1] // cell_size
+            if min_spacing > 0 and self.is_too_close(cell, bx, by, buckets, spacing_sq):
+                rejected.append(cell)
+            else:
+                chosen.append(cell)
+                buckets.setdefault((bx, by), []).append(cell)
+        
+        # No hay sitio con la separación pedida: completar con las descartadas
+        if len(chosen) < count:
+            chosen.extend(rejected[:count - len(chosen)])
+        
+        return chosen
+    
+    def is_too_close(self, cell, bx, by, buckets, spacing_sq):
+        """
+        Comprueba si una casilla está a menos de la separación (al cuadrado) de
+        alguna de las ya elegidas en su celda (bx, by) de la cuadrícula o en las 8 vecinas
+        """
+        for ny in range(by - 1, by + 2):
+            for nx in range(bx - 1, bx + 2):
+                for other in buckets.get((nx, ny), ()):
+                    if (cell[0] - other[0]) ** 2 + (cell[1] - other[1]) ** 2 < spacing_sq:
+                        return True
+        return False
+
+# Índice de cada nivel (se descarta junto con el nivel)
+_level_indexes = weakref.WeakKeyDictionary()
+
+def get_free_cells(level):
+    """
+    Devuelve el índice de casillas libres alcanzables desde el inicio del jugador
+    en un nivel. Se construye la primera vez y se rehace si el mapa cambia.
+    """
+    index = _level_indexes.get(level)
+    if index is None or index.version != level.grid.version:
+        start_x, start_y = level.get_player_start()
+        start_tile = (int(start_x // TILE_SIZE), int(start_y // TILE_SIZE))
+        bounds = (max(0, start_tile[0] - INDEX_RADIUS), max(0, start_tile[1] - INDEX_RADIUS),
+                  min(level.width - 1, start_tile[0] + INDEX_RADIUS),
+                  min(level.height - 1, start_tile[1] + INDEX_RADIUS))
+        index = FreeCellIndex(level, start_tile, bounds)
+        _level_indexes[level] = index
+    return index
@@ -1,59 +1,106 @@
 # Cargador de niveles
 # Autor: [Tu Nombre] - [Tu Matrícula]
 
+import json
 import pygame
 from src.utils.constants import TILE_SIZE
+from src.utils.asset_bundle import asset_exists, open_asset
+from src.utils.image_loader import get_asset_image
+from src.levels.tile_grid import TileGrid
+from src.ai.line_of_sight import VisibilityCache, pixel_to_tile
+
+# Carpeta de los archivos de nivel (level_1.json, level_2.json, ...)
+LEVELS_DIR = "assets/levels"
+
+# Tabla para convertir los dígitos de las filas de tiles a sus valores
+DIGIT_VALUES = bytes.maketrans(b"0123456789", bytes(range(10)))
+
+def level_path(level_number):
+    """Ruta del archivo de un nivel"""
+    return f"{LEVELS_DIR}/level_{level_number}.json"
+
+def parse_level(data):
+    """
+    Crea un nivel a partir de sus datos:
+    {"width", "height", "solid_types", "tiles": [fila, ...], "player_start": [x, y],
+     "zombie_starts": [[x, y], ...], "mummy_starts": [[x, y], ...]}
+    Cada fila de tiles es una cadena con un dígito por tile (0: suelo, 1: pared,
+    2: arbusto, 3: agua) y las posiciones están en tiles.
+    """
+    width = data["width"]
+    height = data["height"]
+    rows = data["tiles"]
+    if len(rows) != height or any(len(row) != width for row in rows):
+        raise ValueError(f"El mapa no mide {width}x{height} tiles")
+    
+    # Los dígitos '0'-'9' se convierten a sus valores en una sola pasada
+    tile_map = "".join(rows).encode("ascii").translate(DIGIT_VALUES)
+    
+    def to_pixels(position):
+        return (position[0] * TILE_SIZE, position[1] * TILE_SIZE)
+    
+    return Level(width, height, tile_map,
+                 to_pixels(data["player_start"]),
+                 [to_pixels(position) for position in data.get("zombie_starts", [])],
+                 [to_pixels(position) for position in data.get("mummy_starts", [])],
+                 solid_types=tuple(data.get("solid_types", (1, 2, 3))))
+
+def load_level_file(file_path):
+    """Lee un archivo de nivel (del paquete de assets o del disco) y crea el nivel"""
+    with open_asset(file_path) as level_file:
+        return parse_level(json.load(level_file))
 
 class Level:
     """Clase que representa un nivel del juego"""
-    def __init__(self, width, height, tile_map, player_start, zombie_starts, mummy_starts):
+    def __init__(self, width, height, tile_map, player_start, zombie_starts, mummy_starts, solid_types=(1, 2, 3)):
         self.width = width
         self.height = height
-        self.tile_map = tile_map
+        
+        # Mapa compacto: por defecto, todo lo que no es suelo (pared, arbusto, agua) es sólido
+        self.grid = TileGrid(width, height, tile_map, solid_types=solid_types)
+        
+        # Caché de línea de visión entre casillas (se invalida al cambiar el mapa)
+        self.visibility = VisibilityCache(self.grid)
         self.player_start = player_start
         self.zombie_starts = zombie_starts
         self.mummy_starts = mummy_starts
         
         # Cargar imágenes de tiles
         self.load_tiles()
+        
+        # Fondo pre-renderizado (se compone en el primer render)
+        self.background = None
+        self.dirty_tiles = set()
     
     def load_tiles(self):
-        """Carga las imágenes de los tiles"""
+        """Carga las imágenes de los tiles (compartidas entre niveles)"""
+        tile_size = (TILE_SIZE, TILE_SIZE)
         self.tiles = {
-            0: pygame.image.load("assets/images/floor.svg"),  # Suelo
-            1: pygame.image.load("assets/images/wall.svg"),   # Pared
-            2: pygame.image.load("assets/images/bush.svg"),   # Arbusto
-            3: pygame.image.load("assets/images/water.svg")   # Agua
+            0: get_asset_image("floor", tile_size, alpha=False),  # Suelo
+            1: get_asset_image("wall", tile_size, alpha=False),   # Pared
+            2: get_asset_image("bush", tile_size, alpha=False),   # Arbusto
+            3: get_asset_image("water", tile_size, alpha=False)   # Agua
         }
-        
-        # Escalar tiles
-        for key in self.tiles:
-            self.tiles[key] = pygame.transform.scale(self.tiles[key], (TILE_SIZE, TILE_SIZE))
     
     def is_collision(self, x, y, width, height):
         """Comprueba si hay colisión en las coordenadas dadas"""
-        # Convertir coordenadas de píxeles a coordenadas de tiles
-        tile_x1 = int(x / TILE_SIZE)
-        tile_y1 = int(y / TILE_SIZE)
-        tile_x2 = int((x + width - 1) / TILE_SIZE)
-        tile_y2 = int((y + height - 1) / TILE_SIZE)
-        
-        # Comprobar cada tile en el área
-        for ty in range(tile_y1, tile_y2 + 1):
-            for tx in range(tile_x1, tile_x2 + 1):
-                if self.is_tile_blocked(tx, ty):
-                    return True
-        
-        return False
+        return self.grid.is_rect_blocked(x, y, width, height)
+    
+    def is_collision_many(self, rects):
+        """Comprueba colisiones para una lista de rectángulos (x, y, ancho, alto) en una sola llamada"""
+        return self.grid.are_rects_blocked(rects)
+    
+    def has_line_of_sight(self, x1, y1, x2, y2):
+        """Comprueba si hay línea de visión entre dos puntos (en píxeles)"""
+        return self.visibility.is_visible(pixel_to_tile(x1, y1), pixel_to_tile(x2, y2))
+    
+    def has_line_of_sight_many(self, points, x, y):
+        """Comprueba la línea de visión desde cada punto (x, y) de la lista hasta un mismo punto"""
+        return self.visibility.check_many([pixel_to_tile(px, py) for px, py in points], pixel_to_tile(x, y))
     
     def is_tile_blocked(self, tx, ty):
-        """Comprueba si un tile es un obstáculo"""
-        # Comprobar límites del mapa
-        if tx < 0 or tx >= self.width or ty < 0 or ty >= self.height:
-            return True
-        
-        # Comprobar tipo de tile (0 es suelo, el resto son obstáculos)
-        return self.tile_map[ty][tx] != 0
+        """Comprueba si un tile es un obstáculo (fuera del mapa también lo es)"""
+        return self.grid.is_tile_blocked(tx, ty)
     
     def get_player_start(self):
         """Devuelve la posición inicial del jugador"""
@@ -67,177 +114,72 @@ class Level:
         """Devuelve las posiciones iniciales de las momias"""
         return self.mummy_starts
     
-    def render(self, screen):
-        """Renderiza el nivel en pantalla"""
+    def set_tile(self, tx, ty, tile_type):
+        """Cambia el tipo de un tile y lo marca para recomponer el fondo"""
+        self.grid.set(tx, ty, tile_type)
+        self.dirty_tiles.add((tx, ty))
+    
+    def build_background(self):
+        """Compone todos los tiles una sola vez en una superficie de fondo"""
+        self.background = pygame.Surface((self.width * TILE_SIZE, self.height * TILE_SIZE))
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        
         for y in range(self.height):
             for x in range(self.width):
-                tile_type = self.tile_map[y][x]
-                screen.blit(self.tiles[tile_type], (x * TILE_SIZE, y * TILE_SIZE))
+                self.draw_tile(x, y)
+        
+        self.dirty_tiles.clear()
+    
+    def draw_tile(self, x, y):
+        """Dibuja un tile en la superficie de fondo"""
+        tile_type = self.grid.get(x, y)
+        self.background.blit(self.tiles[tile_type], (x * TILE_SIZE, y * TILE_SIZE))
+    
+    def update_background(self):
+        """Compone el fondo si no existe o recompone solo los tiles modificados"""
+        if self.background is None:
+            self.build_background()
+        elif self.dirty_tiles:
+            for x, y in self.dirty_tiles:
+                self.draw_tile(x, y)
+            self.dirty_tiles.clear()
+    
+    def render(self, screen, camera=None):
+        """Renderiza en pantalla la parte del nivel que ve la cámara"""
+        self.update_background()
+        if camera is None:
+            screen.blit(self.background, (0, 0))
+        else:
+            # Solo se copia la zona visible: el coste no depende del tamaño del mapa
+            screen.blit(self.background, (0, 0), camera.rect)
+    
+    def render_area(self, screen, rect, camera=None):
+        """Redibuja solo la zona del fondo bajo el rectángulo de pantalla dado"""
+        self.update_background()
+        area = camera.to_world_rect(rect) if camera is not None else rect
+        screen.blit(self.background, rect.topleft, area)
 
 class LevelLoader:
-    """Clase para cargar niveles"""
+    """
+    Clase para cargar niveles desde sus archivos de datos.
+    Cada nivel se lee la primera vez que se pide y se guarda para las siguientes.
+    """
     def __init__(self):
-        # Definir niveles predefinidos
-        self.levels = [
-            self.create_level_1(),
-            self.create_level_2(),
-            self.create_level_3()
-        ]
+        self.levels = {}
+    
+    def level_exists(self, level_number):
+        """Comprueba si hay un archivo para el nivel indicado"""
+        return level_number >= 1 and asset_exists(level_path(level_number))
     
     def load_level(self, level_number):
         """Carga un nivel por su número"""
-        if 1 <= level_number <= len(self.levels):
-            return self.levels[level_number - 1]
-        else:
+        if not self.level_exists(level_number):
             # Si el nivel no existe, devolver el primer nivel
-            return self.levels[0]
-    
-    def create_level_1(self):
-        """Crea el primer nivel"""
-        width = 25
-        height = 20
-        
-        # Crear mapa de tiles (0: suelo, 1: pared, 2: arbusto, 3: agua)
-        tile_map = [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1],
-            [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-            [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 2, 2, 2, 2, 2, 2, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 2, 3, 3, 3, 3, 3, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 2, 3, 3, 3, 3, 3, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 2, 3, 3, 3, 3, 3, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 2, 2, 2, 2, 2, 2, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-            [1, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-            [1, 0, 0, 1, 1, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-        ]
-        
-        # Posición inicial del jugador
-        player_start = (TILE_SIZE * 12, TILE_SIZE * 15)
-        
-        # Posiciones iniciales de los zombies
-        zombie_starts = [
-            (TILE_SIZE * 5, TILE_SIZE * 5),
-            (TILE_SIZE * 20, TILE_SIZE * 5),
-            (TILE_SIZE * 5, TILE_SIZE * 15),
-            (TILE_SIZE * 20, TILE_SIZE * 15)
-        ]
-        
-        # Posiciones iniciales de las momias
-        mummy_starts = [
-            (TILE_SIZE * 12, TILE_SIZE * 5)
-        ]
-        
-        return Level(width, height, tile_map, player_start, zombie_starts, mummy_starts)
-    
-    def create_level_2(self):
-        """Crea el segundo nivel"""
-        width = 25
-        height = 20
-        
-        # Crear mapa de tiles (0: suelo, 1: pared, 2: arbusto, 3: agua)
-        tile_map = [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-        ]
-        
-        # Posición inicial del jugador
-        player_start = (TILE_SIZE * 12, TILE_SIZE * 10)
-        
-        # Posiciones iniciales de los zombies
-        zombie_starts = [
-            (TILE_SIZE * 3, TILE_SIZE * 3),
-            (TILE_SIZE * 3, TILE_SIZE * 16),
-            (TILE_SIZE * 21, TILE_SIZE * 3),
-            (TILE_SIZE * 21, TILE_SIZE * 16),
-            (TILE_SIZE * 12, TILE_SIZE * 3),
-            (TILE_SIZE * 12, TILE_SIZE * 16)
-        ]
-        
-        # Posiciones iniciales de las momias
-        mummy_starts = [
-            (TILE_SIZE * 3, TILE_SIZE * 10),
-            (TILE_SIZE * 21, TILE_SIZE * 10)
-        ]
-        
-        return Level(width, height, tile_map, player_start, zombie_starts, mummy_starts)
-    
-    def create_level_3(self):
-        """Crea el tercer nivel"""
-        width = 25
-        height = 20
-        
-        # Crear mapa de tiles (0: suelo, 1: pared, 2: arbusto, 3: agua)
-        tile_map = [
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 1, 1, 0, 1, 1, 1, 0, 1, 0, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 0, 1],
-            [1, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1],
-            [1, 0, 1, 0, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1],
-            [1, 0, 1, 0, 1, 0, 0, 0, 0, 1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 1],
-            [1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1],
-            [1, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 0, 0, 1],
-            [1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1],
-            [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1],
-            [1, 0, 1, 0, 1, 1, 1, 1, 1, 1, 1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1],
-            [1, 0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1],
-            [1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1, 0, 1],
-            [1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 1, 0, 1],
-            [1, 0, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 0, 1],
-            [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
-        ]
-        
-        # Posición inicial del jugador
-        player_start = (TILE_SIZE * 12, TILE_SIZE * 10)
-        
-        # Posiciones iniciales de los zombies
-        zombie_starts = [
-            (TILE_SIZE * 3, TILE_SIZE * 3),
-            (TILE_SIZE * 21, TILE_SIZE * 3),
-            (TILE_SIZE * 3, TILE_SIZE * 16),
-            (TILE_SIZE * 21, TILE_SIZE * 16),
-            (TILE_SIZE * 12, TILE_SIZE * 3),
-            (TILE_SIZE * 12, TILE_SIZE * 16),
-            (TILE_SIZE * 3, TILE_SIZE * 10),
-            (TILE_SIZE * 21, TILE_SIZE * 10)
-        ]
-        
-        # Posiciones iniciales de las momias
-        mummy_starts = [
-            (TILE_SIZE * 6, TILE_SIZE * 10),
-            (TILE_SIZE * 18, TILE_SIZE * 10),
-            (TILE_SIZE * 12, TILE_SIZE * 6),
-            (TILE_SIZE * 12, TILE_SIZE * 14)
-        ]
+            level_number = 1
         
-        return Level(width, height, tile_map, player_start, zombie_starts, mummy_starts) 
\ No newline at end of file
+        level = self.levels.get(level_number)
+        if level is None:
+            level = load_level_file(level_path(level_number))
+            self.levels[level_number] = level
+        return level
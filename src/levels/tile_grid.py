@@ -0,0 +1,214 @@
+# Cuadrícula compacta de tiles
+# Autor: [Tu Nombre] - [Tu Matrícula]
+
+from array import array
+from src.utils.constants import TILE_SIZE
+
+try:
+    import numpy as np
+except ImportError:
+    # NumPy es opcional: sin él, las consultas por lotes se resuelven en Python
+    np = None
+
+# Por debajo de este número de consultas, las consultas por lotes se resuelven
+# una a una (el coste fijo de NumPy no compensa)
+MIN_VECTOR_BATCH = 32
+
+class TileGrid:
+    """
+    Mapa de tiles guardado en un bytearray plano (un byte por tile, índice y * ancho + x)
+    junto con una máscara precalculada de tiles sólidos.
+    
+    Las consultas de rectángulos usan una imagen integral de la máscara, de modo
+    que cada rectángulo se resuelve con cuatro lecturas sin importar su tamaño.
+    """
+    def __init__(self, width, height, tiles=None, solid_types=(1,), clamp_to_bounds=False):
+        self.width = width
+        self.height = height
+        
+        # Tipos de tile que bloquean el paso
+        self.solid_types = frozenset(solid_types)
+        self.solid_lookup = bytes(1 if value in self.solid_types else 0 for value in range(256))
+        
+        # Si es True, los rectángulos se recortan al mapa (fuera del mapa no hay colisión);
+        # si es False, cualquier rectángulo que salga del mapa colisiona
+        self.clamp_to_bounds = clamp_to_bounds
+        
+        # Tiles y máscara de sólidos
+        self.tiles = bytearray(width * height)
+        if tiles is not None:
+            if isinstance(tiles, (bytes, bytearray)):
+                self.tiles[:] = tiles
+            else:
+                for y, row in enumerate(tiles):
+                    self.tiles[y * width:(y + 1) * width] = bytes(row)
+        self.solid = bytearray(self.tiles.translate(self.solid_lookup))
+        
+        # Versión del mapa: aumenta con cada cambio de tile
+        self.version = 0
+        
+        # Imagen integral de la máscara (se calcula bajo demanda)
+        self.integral = None
+    
+    def get(self, tile_x, tile_y):
+        """Devuelve el tipo de un tile"""
+        return self.tiles[tile_y * self.width + tile_x]
+    
+    def set(self, tile_x, tile_y, tile_type):
+        """Cambia el tipo de un tile y actualiza la máscara de sólidos"""
+        index = tile_y * self.width + tile_x
+        if self.tiles[index] == tile_type:
+            return
+        
+        self.tiles[index] = tile_type
+        self.solid[index] = self.solid_lookup[tile_type]
+        self.version += 1
+        self.integral = None
+    
+    def is_tile_blocked(self, tile_x, tile_y):
+        """Comprueba si un tile es sólido (fuera del mapa siempre lo es)"""
+        if 0 <= tile_x < self.width and 0 <= tile_y < self.height:
+            return self.solid[tile_y * self.width + tile_x] == 1
+        return True
+    
+    def copy_solid(self, x0, y0, width, height):
+        """
+        Copia la máscara de sólidos de una región de tiles a un bytearray plano
+        (índice y * width + x). Las casillas fuera del mapa se marcan como sólidas.
+        """
+        region = bytearray(b"\x01") * (width * height)
+        x_start = max(0, x0)
+        x_end = min(self.width, x0 + width)
+        if x_start >= x_end:
+            return region
+        
+        count = x_end - x_start
+        for y in range(max(0, y0), min(self.height, y0 + height)):
+            source = y * self.width + x_start
+            target = (y - y0) * width + (x_start - x0)
+            region[target:target + count] = self.solid[source:source + count]
+        return region
+    
+    def build_integral(self):
+        """Calcula la imagen integral de la máscara de sólidos"""
+        width = self.width
+        stride = width + 1
+        
+        if np is not None:
+            mask = np.frombuffer(self.solid, dtype=np.uint8).reshape(self.height, width)
+            integral = np.zeros((self.height + 1, stride), dtype=np.int32)
+            integral[1:, 1:] = mask.cumsum(axis=0, dtype=np.int32).cumsum(axis=1, dtype=np.int32)
+            self.integral = integral
+            return
+        
+        integral = array('i', [0]) * (stride * (self.height + 1))
+        solid = self.solid
+        for y in range(self.height):
+            row_sum = 0
+            row = y * width
+            above = y * stride
+            below = above + stride
+            for x in range(width):
+                row_sum += solid[row + x]
+                integral[below + x + 1] = integral[above + x + 1] + row_sum
+        self.integral = integral
+    
+    def tile_range(self, x, y, width, height):
+        """Convierte un rectángulo en píxeles al rango de tiles (x1, y1, x2, y2) que ocupa"""
+        return (int(x // TILE_SIZE), int(y // TILE_SIZE),
+                int((x + width - 1) // TILE_SIZE), int((y + height - 1) // TILE_SIZE))
+    
+    def count_solid(self, x1, y1, x2, y2):
+        """Cuenta los tiles sólidos en un rango de tiles ya recortado al mapa"""
+        if self.integral is None:
+            self.build_integral()
+        integral = self.integral
+        
+        if np is not None:
+            return int(integral[y2 + 1, x2 + 1] - integral[y1, x2 + 1]
+                       - integral[y2 + 1, x1] + integral[y1, x1])
+        
+        stride = self.width + 1
+        return (integral[(y2 + 1) * stride + x2 + 1] - integral[y1 * stride + x2 + 1]
+                - integral[(y2 + 1) * stride + x1] + integral[y1 * stride + x1])
+    
+    def is_rect_blocked(self, x, y, width, height):
+        """Comprueba si un rectángulo en píxeles toca algún tile sólido"""
+        x1, y1, x2, y2 = self.tile_range(x, y, width, height)
+        
+        if self.clamp_to_bounds:
+            x1 = max(0, x1)
+            y1 = max(0, y1)
+            x2 = min(self.width - 1, x2)
+            y2 = min(self.height - 1, y2)
+            if x1 > x2 or y1 > y2:
+                return False
+        elif x1 < 0 or y1 < 0 or x2 >= self.width or y2 >= self.height:
+            return True
+        
+        # Caso habitual (entidades del tamaño de un tile o menores): leer la máscara directamente
+        if x2 - x1 <= 1 and y2 - y1 <= 1:
+            solid = self.solid
+            row1 = y1 * self.width
+            row2 = y2 * self.width
+            return bool(solid[row1 + x1] or solid[row1 + x2] or solid[row2 + x1] or solid[row2 + x2])
+        
+        return self.count_solid(x1, y1, x2, y2) > 0
+    
+    def are_tiles_blocked(self, tiles):
+        """
+        Consulta por lotes: comprueba si cada tile (x, y) de la lista es sólido.
+        Retorna una lista de booleanos.
+        """
+        if np is not None and len(tiles) >= MIN_VECTOR_BATCH:
+            coords = np.asarray(tiles, dtype=np.int64).reshape(-1, 2)
+            tx = coords[:, 0]
+            ty = coords[:, 1]
+            inside = (tx >= 0) & (tx < self.width) & (ty >= 0) & (ty < self.height)
+            mask = np.frombuffer(self.solid, dtype=np.uint8)
+            index = np.where(inside, ty * self.width + tx, 0)
+            return (~inside | (mask[index] == 1)).tolist()
+        
+        return [self.is_tile_blocked(tx, ty) for tx, ty in tiles]
+    
+    def are_rects_blocked(self, rects):
+        """
+        Consulta por lotes: comprueba si cada rectángulo (x, y, ancho, alto) en
+        píxeles toca algún tile sólido. Retorna una lista de booleanos.
+        """
+        if np is None or len(rects) < MIN_VECTOR_BATCH:
+            return [self.is_rect_blocked(x, y, w, h) for x, y, w, h in rects]
+        
+        if self.integral is None:
+            self.build_integral()
+        
+        values = np.asarray(rects, dtype=np.float64).reshape(-1, 4)
+        x1 = np.floor_divide(values[:, 0], TILE_SIZE).astype(np.int64)
+        y1 = np.floor_divide(values[:, 1], TILE_SIZE).astype(np.int64)
+        x2 = np.floor_divide(values[:, 0] + values[:, 2] - 1, TILE_SIZE).astype(np.int64)
+        y2 = np.floor_divide(values[:, 1] + values[:, 3] - 1, TILE_SIZE).astype(np.int64)
+        
+        outside = (x1 < 0) | (y1 < 0) | (x2 >= self.width) | (y2 >= self.height)
+        
+        # Recortar al mapa; si el rango queda vacío, el rectángulo no toca ningún tile
+        x1 = np.maximum(x1, 0)
+        y1 = np.maximum(y1, 0)
+        x2 = np.minimum(x2, self.width - 1)
+        y2 = np.minimum(y2, self.height - 1)
+        empty = (x1 > x2) | (y1 > y2)
+        
+        # Índices válidos para leer la imagen integral
+        x1 = np.clip(x1, 0, self.width - 1)
+        y1 = np.clip(y1, 0, self.height - 1)
+        x2 = np.clip(x2, 0, self.width - 1)
+        y2 = np.clip(y2, 0, self.height - 1)
+        
+        integral = self.integral
+        counts = (integral[y2 + 1, x2 + 1] - integral[y1, x2 + 1]
+                  - integral[y2 + 1, x1] + integral[y1, x1])
+        blocked = (counts > 0) & ~empty
+        
+        if not self.clamp_to_bounds:
+            blocked |= outside
+        
+        return blocked.tolist()
@@ -1,6 +1,7 @@
 import pygame
 from src.utils.constants import PLAYER_SPEED, PLAYER_HEALTH, TILE_SIZE
-import os
+from src.utils.image_loader import get_asset_image, get_sprite_set
+from src.utils.controls import INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT, INPUT_SHOOT
 
 class Projectile:
     def __init__(self, x, y, direction):
@@ -10,47 +11,17 @@ class Projectile:
         self.speed = 10
         self.active = True
         
-        # Cargar sprite
-        sprite = None
-        png_path = "assets/images/water_projectile.png"
-        svg_path = "assets/images/water_projectile.svg"
-        
-        try:
-            # Intentar cargar PNG primero
-            if os.path.exists(png_path):
-                sprite = pygame.image.load(png_path)
-                sprite = pygame.transform.scale(sprite, (16, 16))
-            # Si no hay PNG, intentar cargar SVG
-            elif os.path.exists(svg_path):
-                try:
-                    # Método 1: Cargar directamente con pygame 2.0+
-                    sprite = pygame.image.load(svg_path)
-                    sprite = pygame.transform.scale(sprite, (16, 16))
-                except pygame.error:
-                    # Método 2: Intentar usar cairosvg si está disponible
-                    try:
-                        import cairosvg
-                        import io
-                        png_bytes = cairosvg.svg2png(url=svg_path)
-                        byte_io = io.BytesIO(png_bytes)
-                        sprite = pygame.image.load(byte_io)
-                        sprite = pygame.transform.scale(sprite, (16, 16))
-                    except (ImportError, ModuleNotFoundError):
-                        print(f"No se pudo cargar cairosvg para convertir {svg_path}")
-                        sprite = None
-        except pygame.error as e:
-            print(f"Error al cargar sprite de proyectil: {e}")
-            sprite = None
-        
-        # Si no se pudo cargar, crear un sprite por defecto
-        if sprite is None:
-            print("No se pudo cargar el sprite del proyectil")
-            sprite = pygame.Surface((16, 16), pygame.SRCALPHA)
-            sprite.fill((30, 144, 255, 192))  # Color azul semitransparente para el agua
-            # Añadir un brillo
-            pygame.draw.circle(sprite, (135, 206, 250), (6, 6), 3)
-        
-        self.sprite = sprite
+        # Cargar sprite (compartido por todos los proyectiles)
+        self.sprite = get_asset_image("water_projectile", (16, 16), fallback=self.create_fallback_sprite)
+    
+    @staticmethod
+    def create_fallback_sprite():
+        """Crea un sprite por defecto si no se puede cargar la imagen"""
+        sprite = pygame.Surface((16, 16), pygame.SRCALPHA)
+        sprite.fill((30, 144, 255, 192))  # Color azul semitransparente para el agua
+        # Añadir un brillo
+        pygame.draw.circle(sprite, (135, 206, 250), (6, 6), 3)
+        return sprite
     
     def update(self):
         """Actualiza la posición del proyectil"""
@@ -67,12 +38,15 @@ class Projectile:
         """Devuelve el rectángulo de colisión del proyectil"""
         return pygame.Rect(self.x, self.y, 16, 16)
     
-    def render(self, screen):
-        """Renderiza el proyectil en pantalla"""
-        screen.blit(self.sprite, (self.x, self.y))
+    def render(self, screen, camera=None):
+        """Renderiza el proyectil en pantalla (si lo ve la cámara)"""
+        if camera is None:
+            screen.blit(self.sprite, (self.x, self.y))
+        elif camera.is_visible(self.get_collision_rect()):
+            screen.blit(self.sprite, camera.to_screen(self.x, self.y))
 
 class Player:
-    def __init__(self, x, y):
+    def __init__(self, x, y, sound_bank=None):
         self.x = x
         self.y = y
         self.width = TILE_SIZE
@@ -87,8 +61,8 @@ class Player:
         # Cargar sprites
         self.load_sprites()
         
-        # Cargar sonidos
-        self.shoot_sound = pygame.mixer.Sound("assets/sounds/shoot.mp3")
+        # Banco de sonidos compartido del juego (los efectos ya están cargados)
+        self.sound_bank = sound_bank
         
         # Animación
         self.animation_frame = 0
@@ -96,61 +70,9 @@ class Player:
         self.animation_timer = 0
     
     def load_sprites(self):
-        """Carga los sprites del jugador"""
+        """Carga los sprites del jugador (compartidos entre partidas)"""
         try:
-            self.sprites = {
-                "up": [],
-                "down": [],
-                "left": [],
-                "right": []
-            }
-            
-            # Intentar cargar primero PNG, luego SVG como respaldo
-            for direction in ["up", "down", "left", "right"]:
-                for i in range(1, 3):
-                    sprite = None
-                    # Intentar cargar PNG primero
-                    png_path = f"assets/images/player_{direction}_{i}.png"
-                    svg_path = f"assets/images/player_{direction}_{i}.svg"
-                    
-                    try:
-                        # Intentar cargar PNG primero
-                        if os.path.exists(png_path):
-                            sprite = pygame.image.load(png_path)
-                        # Si no hay PNG, intentar cargar SVG
-                        elif os.path.exists(svg_path):
-                            try:
-                                # Método 1: Cargar directamente con pygame 2.0+
-                                sprite = pygame.image.load(svg_path)
-                            except pygame.error:
-                                # Método 2: Intentar usar cairosvg si está disponible
-                                try:
-                                    import cairosvg
-                                    import io
-                                    png_bytes = cairosvg.svg2png(url=svg_path)
-                                    byte_io = io.BytesIO(png_bytes)
-                                    sprite = pygame.image.load(byte_io)
-                                except (ImportError, ModuleNotFoundError):
-                                    print(f"No se pudo cargar cairosvg para convertir {svg_path}")
-                                    sprite = None
-                    except pygame.error as e:
-                        print(f"Error al cargar sprite: {e}")
-                        sprite = None
-                    
-                    # Si no se pudo cargar, crear un sprite de color sólido
-                    if sprite is None:
-                        print(f"No se pudo cargar el sprite: player_{direction}_{i}")
-                        sprite = pygame.Surface((TILE_SIZE, TILE_SIZE), pygame.SRCALPHA)
-                        sprite.fill((255, 99, 71, 255))  # Color rojo-naranja para el jugador
-                    
-                    self.sprites[direction].append(sprite)
-            
-            # Escalar sprites
-            for direction in self.sprites:
-                for i in range(len(self.sprites[direction])):
-                    self.sprites[direction][i] = pygame.transform.scale(
-                        self.sprites[direction][i], (self.width, self.height)
-                    )
+            self.sprites = get_sprite_set("player", (self.width, self.height), (255, 99, 71, 255))
         except Exception as e:
             print(f"Error al cargar los sprites del jugador: {e}")
             # Crear sprites de emergencia
@@ -182,35 +104,31 @@ class Player:
                         pygame.draw.circle(sprite, (0, 0, 0), (TILE_SIZE//2 + 2, TILE_SIZE//3 - 1), 1)
                 
                 self.sprites[direction].append(sprite)
-                
-    def handle_event(self, event):
-        """Maneja los eventos del jugador"""
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_SPACE:
-                self.shoot()
     
-    def update(self, level):
-        """Actualiza el estado del jugador"""
-        # Movimiento
-        keys = pygame.key.get_pressed()
+    def update(self, level, buttons):
+        """Actualiza el estado del jugador a partir de la máscara de entrada del tick"""
+        # Disparo (antes de moverse, desde la posición y dirección actuales)
+        if buttons & INPUT_SHOOT:
+            self.shoot()
         
+        # Movimiento
         dx, dy = 0, 0
         self.moving = False
         
-        if keys[pygame.K_w] or keys[pygame.K_UP]:
+        if buttons & INPUT_UP:
             dy -= self.speed
             self.direction = "up"
             self.moving = True
-        elif keys[pygame.K_s] or keys[pygame.K_DOWN]:
+        elif buttons & INPUT_DOWN:
             dy += self.speed
             self.direction = "down"
             self.moving = True
         
-        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+        if buttons & INPUT_LEFT:
             dx -= self.speed
             self.direction = "left"
             self.moving = True
-        elif keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+        elif buttons & INPUT_RIGHT:
             dx += self.speed
             self.direction = "right"
             self.moving = True
@@ -238,17 +156,19 @@ class Player:
             self.animation_timer = 0
         
         # Actualizar proyectiles
-        for projectile in self.projectiles[:]:
+        for projectile in self.projectiles:
             projectile.update()
-            
-            # Eliminar proyectiles que salen de la pantalla
-            if (projectile.x < 0 or projectile.x > level.width * TILE_SIZE or
-                projectile.y < 0 or projectile.y > level.height * TILE_SIZE):
-                self.projectiles.remove(projectile)
-            
-            # Comprobar colisiones con el nivel
-            if level.is_collision(projectile.x, projectile.y, 16, 16):
-                self.projectiles.remove(projectile)
+        
+        # Comprobar colisiones con el nivel de todos los proyectiles en una sola consulta
+        collisions = level.is_collision_many([(p.x, p.y, 16, 16) for p in self.projectiles])
+        
+        # Eliminar proyectiles que salen de la pantalla o chocan con el nivel
+        level_width = level.width * TILE_SIZE
+        level_height = level.height * TILE_SIZE
+        self.projectiles = [
+            projectile for projectile, collision in zip(self.projectiles, collisions)
+            if not collision and 0 <= projectile.x <= level_width and 0 <= projectile.y <= level_height
+        ]
     
     def shoot(self):
         """Dispara un proyectil en la dirección actual"""
@@ -270,10 +190,8 @@ class Player:
         self.projectiles.append(Projectile(proj_x, proj_y, self.direction))
         
         # Reproducir sonido de disparo
-        try:
-            self.shoot_sound.play()
-        except:
-            print("No se pudo reproducir el sonido de disparo")
+        if self.sound_bank is not None:
+            self.sound_bank.play("shoot")
     
     def take_damage(self):
         """Reduce la salud del jugador"""
@@ -283,12 +201,13 @@ class Player:
         """Devuelve el rectángulo de colisión del jugador"""
         return pygame.Rect(self.x, self.y, self.width, self.height)
     
-    def render(self, screen):
+    def render(self, screen, camera=None):
         """Renderiza al jugador y sus proyectiles en pantalla"""
         # Dibujar jugador
         current_sprite = self.sprites[self.direction][self.animation_frame]
-        screen.blit(current_sprite, (self.x, self.y))
+        position = camera.to_screen(self.x, self.y) if camera is not None else (self.x, self.y)
+        screen.blit(current_sprite, position)
         
         # Dibujar proyectiles
         for projectile in self.projectiles:
-            projectile.render(screen) 
\ No newline at end of file
+            projectile.render(screen, camera)
@@ -3,28 +3,19 @@
 
 import pygame
 from src.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, RED, GREEN
-from src.utils.image_loader import load_image, create_fallback_surface
-import os
+from src.utils.image_loader import get_asset_image
+from src.utils.text_cache import render_text
 
 class HUD:
     """Clase para mostrar información en pantalla durante el juego"""
     def __init__(self, game):
         self.game = game
         
-        # Cargar ícono de salud
-        health_png = "assets/images/health_icon.png"
-        health_svg = "assets/images/health_icon.svg"
+        # Cargar ícono de salud (desde la caché de imágenes)
+        self.health_icon = get_asset_image("health_icon", (24, 24), fallback=self.create_health_icon)
         
-        if os.path.exists(health_png):
-            self.health_icon = load_image(health_png, (24, 24))
-        elif os.path.exists(health_svg):
-            self.health_icon = load_image(health_svg, (24, 24))
-        else:
-            print("No se encontró imagen para el ícono de salud, usando respaldo")
-            self.health_icon = self.create_health_icon()
-        
-        # Fuentes
-        self.font = pygame.font.Font(None, 36)
+        # Tamaño de fuente (los textos se renderizan a través de la caché de textos)
+        self.font_size = 36
     
     def create_health_icon(self):
         """Crea un ícono de salud (corazón)"""
@@ -39,15 +30,19 @@ class HUD:
         return icon
     
     def render(self, screen):
-        """Renderiza el HUD en pantalla"""
+        """Renderiza el HUD en pantalla y devuelve los rectángulos dibujados"""
+        rects = []
+        
         # Mostrar puntuación
-        score_text = self.font.render(f"Puntuación: {self.game.score}", True, WHITE)
-        screen.blit(score_text, (10, 10))
+        score_text = render_text(f"Puntuación: {self.game.score}", self.font_size, WHITE)
+        rects.append(screen.blit(score_text, (10, 10)))
         
         # Mostrar salud
         for i in range(self.game.player.health):
-            screen.blit(self.health_icon, (SCREEN_WIDTH - 40 - i * 30, 10))
+            rects.append(screen.blit(self.health_icon, (SCREEN_WIDTH - 40 - i * 30, 10)))
         
         # Mostrar número de enemigos restantes
-        enemies_text = self.font.render(f"Enemigos: {len(self.game.enemies)}", True, WHITE)
-        screen.blit(enemies_text, (10, 50)) 
\ No newline at end of file
+        enemies_text = render_text(f"Enemigos: {len(self.game.enemies)}", self.font_size, WHITE)
+        rects.append(screen.blit(enemies_text, (10, 50)))
+        
+        return rects
@@ -1,7 +1,8 @@
 import pygame
 from src.utils.constants import SCREEN_WIDTH, SCREEN_HEIGHT, WHITE, BLACK, YELLOW
-from src.utils.image_loader import load_image, create_fallback_surface
-import os
+from src.utils.image_loader import get_asset_image
+from src.utils.audio import get_sound, play_music, stop_music
+from src.utils.text_cache import render_text
 
 class Menu:
     def __init__(self, screen, game):
@@ -9,38 +10,24 @@ class Menu:
         self.game = game
         
         # Cargar fondo y música del menú
-        bg_png = "assets/images/menu_background.png"
-        bg_svg = "assets/images/menu_background.svg"
+        self.background = get_asset_image(
+            "menu_background", (SCREEN_WIDTH, SCREEN_HEIGHT), alpha=False,
+            fallback=self.create_default_background
+        )
         
-        if os.path.exists(bg_png):
-            self.background = load_image(bg_png, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        elif os.path.exists(bg_svg):
-            self.background = load_image(bg_svg, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        else:
-            print("No se encontró imagen para el fondo del menú, usando respaldo")
-            self.background = self.create_default_background()
-        
-        # Cargar sonidos
-        try:
-            self.select_sound = pygame.mixer.Sound("assets/sounds/select.mp3")
-        except pygame.error:
-            print("No se pudo cargar el sonido de selección")
-            self.select_sound = pygame.mixer.Sound(buffer=bytes([0] * 44100))  # Sonido vacío
+        # Cargar sonidos (vacío si no hay mezclador o falla la carga)
+        self.select_sound = get_sound("assets/sounds/select.mp3")
         
         # Opciones del menú
         self.options = ["Iniciar Juego", "Salir"]
         self.selected_option = 0
         
-        # Fuentes
-        self.title_font = pygame.font.Font(None, 72)
-        self.option_font = pygame.font.Font(None, 48)
+        # Tamaños de fuente (los textos se renderizan a través de la caché de textos)
+        self.title_size = 72
+        self.option_size = 48
         
         # Iniciar música del menú
-        try:
-            pygame.mixer.music.load("assets/music/menu.mp3")
-            pygame.mixer.music.play(-1)
-        except pygame.error:
-            print("No se pudo cargar la música del menú")
+        play_music("assets/music/menu.mp3", -1)
     
     def create_default_background(self):
         """Crea un fondo por defecto para el menú"""
@@ -66,7 +53,7 @@ class Menu:
                 self.select_sound.play()
             elif event.key == pygame.K_RETURN:
                 if self.selected_option == 0:  # Iniciar Juego
-                    pygame.mixer.music.stop()
+                    stop_music()
                     self.game.reset_game()
                     return "game"
                 elif self.selected_option == 1:  # Salir
@@ -85,13 +72,13 @@ class Menu:
         self.screen.blit(self.background, (0, 0))
         
         # Dibujar título
-        title_text = self.title_font.render("Zombies Ate My Neighbors", True, WHITE)
+        title_text = render_text("Zombies Ate My Neighbors", self.title_size, WHITE)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//4))
         self.screen.blit(title_text, title_rect)
         
         # Dibujar opciones
         for i, option in enumerate(self.options):
             color = YELLOW if i == self.selected_option else WHITE
-            option_text = self.option_font.render(option, True, color)
+            option_text = render_text(option, self.option_size, color)
             option_rect = option_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + i * 60))
             self.screen.blit(option_text, option_rect) 
\ No newline at end of file
@@ -0,0 +1,85 @@
+# Superposición con los tiempos del profiler
+# Autor: [Tu Nombre] - [Tu Matrícula]
+
+import pygame
+from src.utils.constants import WHITE, GREEN, YELLOW, RED, FPS
+
+class ProfilerOverlay:
+    """Muestra p50/p99 de cada fase y una gráfica de los últimos frames"""
+    def __init__(self, profiler, position=(10, 90)):
+        self.profiler = profiler
+        self.position = position
+        self.visible = False
+        
+        # Indica si fue la superposición quien activó el profiler (si ya estaba activo,
+        # por ejemplo con --profile-csv, ocultarla no lo detiene ni borra sus mediciones)
+        self.enabled_profiler = False
+        
+        self.font = pygame.font.Font(None, 20)
+        self.line_height = 18
+        self.width = 300
+        self.graph_height = 40
+        
+        # El texto se recalcula cada cierto número de frames para no ordenar muestras en cada uno
+        self.refresh_interval = 15
+        self.frames_since_refresh = self.refresh_interval
+        self.lines = []
+        
+        # Fondo semitransparente (se rehace solo cuando cambia el número de líneas)
+        self.panel = None
+    
+    def toggle(self):
+        """Muestra u oculta la superposición (y activa o desactiva las mediciones si las activó ella)"""
+        self.visible = not self.visible
+        if self.visible:
+            if not self.profiler.enabled:
+                self.profiler.enabled = True
+                self.enabled_profiler = True
+        elif self.enabled_profiler:
+            self.profiler.enabled = False
+            self.profiler.reset()
+            self.enabled_profiler = False
+    
+    def refresh_lines(self):
+        """Prepara las líneas de texto con las estadísticas actuales"""
+        lines = [f"FPS: {self.profiler.fps():.1f}"]
+        for name, values in sorted(self.profiler.stats().items()):
+            lines.append(f"{name}: p50 {values['p50']:.2f} ms  p99 {values['p99']:.2f} ms")
+        self.lines = [self.font.render(line, True, WHITE) for line in lines]
+    
+    def render(self, screen):
+        """Dibuja la superposición y devuelve el rectángulo que ocupa"""
+        self.frames_since_refresh += 1
+        if self.frames_since_refresh >= self.refresh_interval:
+            self.refresh_lines()
+            self.frames_since_refresh = 0
+        
+        x, y = self.position
+        height = len(self.lines) * self.line_height + self.graph_height + 12
+        rect = pygame.Rect(x, y, self.width, height)
+        
+        # Fondo semitransparente
+        if self.panel is None or self.panel.get_size() != rect.size:
+            self.panel = pygame.Surface(rect.size, pygame.SRCALPHA)
+            self.panel.fill((0, 0, 0, 170))
+        screen.blit(self.panel, rect.topleft)
+        
+        # Texto
+        for i, line in enumerate(self.lines):
+            screen.blit(line, (x + 6, y + 4 + i * self.line_height))
+        
+        # Gráfica de tiempos de frame: la línea amarilla marca el objetivo de 1/FPS
+        graph_top = y + 8 + len(self.lines) * self.line_height
+        graph_bottom = graph_top + self.graph_height
+        target = 1.0 / FPS
+        scale = self.graph_height / (2 * target)
+        pygame.draw.line(screen, YELLOW, (x + 6, graph_bottom - target * scale),
+                         (x + self.width - 6, graph_bottom - target * scale))
+        
+        frame_times = list(self.profiler.frame_times)[-(self.width - 12):]
+        for i, frame_time in enumerate(frame_times):
+            bar = min(self.graph_height, frame_time * scale)
+            color = GREEN if frame_time <= target * 1.05 else RED
+            pygame.draw.line(screen, color, (x + 6 + i, graph_bottom), (x + 6 + i, graph_bottom - bar))
+        
+        return rect
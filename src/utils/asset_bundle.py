@@ -0,0 +1,191 @@
+"""
+Paquete de assets: un único archivo con un índice nombre -> (offset, longitud, tipo)
+que se mapea en memoria al arrancar. Si no existe, los assets se leen del disco.
+"""
+import io
+import json
+import mmap
+import os
+import struct
+
+# Ruta del paquete (relativa a la raíz del juego)
+ASSET_BUNDLE_PATH = "assets.pak"
+
+# Cabecera: identificador, versión, número de entradas y longitud del índice JSON
+BUNDLE_MAGIC = b"ZPAK"
+BUNDLE_VERSION = 1
+HEADER_FORMAT = "<4sBII"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Tipo de cada entrada según la extensión del archivo
+ASSET_TYPES = {
+    ".png": "image",
+    ".svg": "image",
+    ".mp3": "sound",
+    ".wav": "sound",
+    ".ogg": "sound",
+    ".json": "data"
+}
+
+def asset_type(file_path):
+    """Devuelve el tipo de un asset según su extensión"""
+    return ASSET_TYPES.get(os.path.splitext(file_path)[1].lower(), "data")
+
+def normalize_name(file_path):
+    """Nombre de un asset en el índice: ruta relativa con barras normales"""
+    return os.path.normpath(file_path).replace(os.sep, "/")
+
+def write_bundle(bundle_path, file_paths):
+    """
+    Empaqueta los archivos dados en un único paquete.
+    
+    Args:
+        bundle_path (str): Ruta del paquete a crear
+        file_paths (list): Rutas relativas de los archivos a incluir
+    
+    Returns:
+        int: Tamaño total del paquete en bytes
+    """
+    names = sorted({normalize_name(path) for path in file_paths})
+    
+    # Calcular los offsets relativos al inicio de los datos
+    entries = {}
+    offset = 0
+    for name in names:
+        length = os.path.getsize(name)
+        entries[name] = [offset, length, asset_type(name)]
+        offset += length
+    
+    # Los offsets del índice son absolutos: se suman la cabecera y el propio índice.
+    # Como la longitud del índice depende de los offsets, se calcula hasta que se estabiliza
+    data_start = 0
+    while True:
+        index = {name: [start + data_start, length, kind] for name, (start, length, kind) in entries.items()}
+        index_bytes = json.dumps(index, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        if HEADER_SIZE + len(index_bytes) == data_start:
+            break
+        data_start = HEADER_SIZE + len(index_bytes)
+    
+    with open(bundle_path, "wb") as bundle_file:
+        bundle_file.write(struct.pack(HEADER_FORMAT, BUNDLE_MAGIC, BUNDLE_VERSION, len(names), len(index_bytes)))
+        bundle_file.write(index_bytes)
+        for name in names:
+            with open(name, "rb") as source:
+                bundle_file.write(source.read())
+    
+    return data_start + offset
+
+class AssetReader(io.RawIOBase):
+    """
+    Archivo de solo lectura sobre una vista del paquete. A diferencia de
+    io.BytesIO (que copiaría la vista entera), cada lectura copia solo los
+    bytes que se piden directamente del mapa en memoria.
+    """
+    def __init__(self, view):
+        super().__init__()
+        self.view = view
+        self.position = 0
+    
+    def readable(self):
+        return True
+    
+    def seekable(self):
+        return True
+    
+    def readinto(self, buffer):
+        data = self.view[self.position:self.position + len(buffer)]
+        count = len(data)
+        buffer[:count] = data
+        self.position += count
+        return count
+    
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        if offset < 0:
+            raise ValueError("Posición negativa")
+        self.position = offset
+        return self.position
+    
+    def tell(self):
+        return self.position
+    
+    def close(self):
+        if not self.closed:
+            self.view.release()
+        super().close()
+
+class AssetBundle:
+    """Paquete de assets mapeado en memoria (solo lectura)"""
+    def __init__(self, bundle_path=ASSET_BUNDLE_PATH):
+        self.path = bundle_path
+        with open(bundle_path, "rb") as bundle_file:
+            self.data = mmap.mmap(bundle_file.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        try:
+            if len(self.data) < HEADER_SIZE:
+                raise ValueError(f"Paquete de assets demasiado corto: {bundle_path}")
+            magic, version, count, index_length = struct.unpack_from(HEADER_FORMAT, self.data)
+            if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+                raise ValueError(f"Formato de paquete no soportado: {bundle_path}")
+            
+            self.entries = json.loads(self.data[HEADER_SIZE:HEADER_SIZE + index_length].decode("utf-8"))
+            if len(self.entries) != count:
+                raise ValueError(f"Índice de paquete incompleto: {bundle_path}")
+        except Exception:
+            self.data.close()
+            raise
+        
+        self.view = memoryview(self.data)
+    
+    def __contains__(self, file_path):
+        return normalize_name(file_path) in self.entries
+    
+    def get_view(self, file_path):
+        """Devuelve los bytes de un asset como vista del mapa en memoria (sin copiarlos)"""
+        offset, length, _ = self.entries[normalize_name(file_path)]
+        return self.view[offset:offset + length]
+    
+    def open(self, file_path):
+        """Devuelve un objeto tipo archivo de solo lectura con el contenido de un asset (sin copiarlo)"""
+        return AssetReader(self.get_view(file_path))
+    
+    def close(self):
+        """Libera el mapa en memoria"""
+        self.view.release()
+        self.data.close()
+
+# Paquete abierto (se carga la primera vez que se necesita).
+# False indica que ya se comprobó que no hay paquete
+_bundle = None
+
+def get_bundle():
+    """Devuelve el paquete de assets, abriéndolo la primera vez (None si no existe)"""
+    global _bundle
+    if _bundle is None:
+        _bundle = False
+        if os.path.exists(ASSET_BUNDLE_PATH):
+            try:
+                _bundle = AssetBundle(ASSET_BUNDLE_PATH)
+            except (OSError, ValueError) as e:
+                print(f"No se pudo abrir el paquete de assets: {e}")
+    return _bundle or None
+
+def asset_exists(file_path):
+    """Comprueba si un asset existe en el paquete o, si no, en el disco"""
+    bundle = get_bundle()
+    if bundle is not None and file_path in bundle:
+        return True
+    return os.path.exists(file_path)
+
+def open_asset(file_path):
+    """
+    Abre un asset en modo binario: desde el paquete si está en él o desde el disco.
+    Lanza FileNotFoundError si no existe en ninguno de los dos.
+    """
+    bundle = get_bundle()
+    if bundle is not None and file_path in bundle:
+        return bundle.open(file_path)
+    return open(file_path, "rb")
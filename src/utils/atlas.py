@@ -0,0 +1,128 @@
+"""
+Atlas de texturas: varios sprites empaquetados en una o pocas hojas PNG
+con un índice JSON de los rectángulos de cada frame
+"""
+import json
+import os
+import pygame
+from src.utils.asset_bundle import open_asset
+
+# Índice del atlas (las hojas se guardan en el mismo directorio)
+ATLAS_INDEX_PATH = "assets/images/atlas.json"
+ATLAS_VERSION = 1
+
+def frame_key(name, size):
+    """Clave de un frame en el índice: el mismo sprite puede estar a varios tamaños"""
+    return f"{name}@{size[0]}x{size[1]}"
+
+def pack_frames(sizes, max_width=512, max_height=1024, padding=1):
+    """
+    Coloca rectángulos en hojas por estantes (los más altos primero).
+    
+    Args:
+        sizes (dict): clave -> (ancho, alto)
+        max_width, max_height (int): Tamaño máximo de cada hoja
+        padding (int): Separación entre frames
+    
+    Returns:
+        tuple: (lista con el tamaño de cada hoja, dict clave -> (hoja, x, y, ancho, alto))
+    """
+    placements = {}
+    sheets = []
+    x = y = shelf_height = used_width = 0
+    
+    for key in sorted(sizes, key=lambda key: (-sizes[key][1], -sizes[key][0], key)):
+        width, height = sizes[key]
+        if width > max_width or height > max_height:
+            raise ValueError(f"El frame {key} no cabe en una hoja de {max_width}x{max_height}")
+        
+        # Empezar un estante nuevo si no cabe en el actual
+        if x + width > max_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        
+        # Empezar una hoja nueva si no cabe en la actual
+        if not sheets or y + height > max_height:
+            if sheets:
+                sheets[-1] = (used_width, y)
+            sheets.append(None)
+            x = y = shelf_height = used_width = 0
+        
+        placements[key] = (len(sheets) - 1, x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x - padding)
+    
+    if sheets:
+        sheets[-1] = (used_width, y + shelf_height)
+    
+    return sheets, placements
+
+def build_atlas(frames, index_path=ATLAS_INDEX_PATH, **pack_options):
+    """
+    Empaqueta las superficies dadas y guarda las hojas y el índice.
+    
+    Args:
+        frames (dict): (nombre, (ancho, alto)) -> pygame.Surface ya escalada
+        index_path (str): Ruta del índice JSON
+    
+    Returns:
+        list: Rutas de las hojas guardadas
+    """
+    surfaces = {frame_key(name, size): surface for (name, size), surface in frames.items()}
+    sheet_sizes, placements = pack_frames(
+        {key: surface.get_size() for key, surface in surfaces.items()}, **pack_options
+    )
+    
+    directory = os.path.dirname(index_path)
+    base_name = os.path.splitext(os.path.basename(index_path))[0]
+    sheets = [pygame.Surface(size, pygame.SRCALPHA) for size in sheet_sizes]
+    for sheet in sheets:
+        sheet.fill((0, 0, 0, 0))
+    
+    index = {"version": ATLAS_VERSION, "sheets": [], "frames": {}}
+    for key, (sheet_index, x, y, width, height) in placements.items():
+        sheets[sheet_index].blit(surfaces[key], (x, y))
+        index["frames"][key] = [sheet_index, x, y, width, height]
+    
+    sheet_paths = []
+    for i, sheet in enumerate(sheets):
+        file_name = f"{base_name}_{i}.png"
+        pygame.image.save(sheet, os.path.join(directory, file_name))
+        index["sheets"].append(file_name)
+        sheet_paths.append(os.path.join(directory, file_name))
+    
+    with open(index_path, "w", encoding="utf-8") as index_file:
+        json.dump(index, index_file, indent=1, sort_keys=True)
+    
+    return sheet_paths
+
+class TextureAtlas:
+    """
+    Atlas cargado en memoria: cada hoja se decodifica una sola vez y los frames
+    se devuelven como subsuperficies que comparten sus píxeles.
+    """
+    def __init__(self, index_path=ATLAS_INDEX_PATH, convert=None):
+        with open_asset(index_path) as index_file:
+            index = json.load(index_file)
+        if index.get("version") != ATLAS_VERSION:
+            raise ValueError(f"Versión de atlas no soportada: {index_path}")
+        
+        directory = os.path.dirname(index_path)
+        self.sheets = []
+        for file_name in index["sheets"]:
+            sheet_path = os.path.join(directory, file_name)
+            with open_asset(sheet_path) as sheet_file:
+                sheet = pygame.image.load(sheet_file, sheet_path)
+            self.sheets.append(convert(sheet) if convert else sheet)
+        
+        self.frames = index["frames"]
+    
+    def get(self, name, size):
+        """Devuelve el frame como subsuperficie de su hoja, o None si no está en el atlas"""
+        frame = self.frames.get(frame_key(name, size))
+        if frame is None:
+            return None
+        sheet_index, x, y, width, height = frame
+        return self.sheets[sheet_index].subsurface((x, y, width, height))
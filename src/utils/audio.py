@@ -0,0 +1,165 @@
+"""
+Utilidades de audio, con soporte para ejecutar el juego sin mezclador
+"""
+import pygame
+from src.utils.asset_bundle import open_asset
+
+# Sonidos decodificados, compartidos por todo el proceso (ruta -> Sound)
+_sound_cache = {}
+
+# Canales reservados para cada categoría de sonido (máximo de voces simultáneas)
+SOUND_CATEGORIES = {
+    "player": 2,   # Disparos
+    "impact": 3,   # Golpes
+    "event": 1     # Muerte, victoria, recogida de objetos
+}
+
+class SilentSound:
+    """Sonido vacío que se usa cuando el mezclador no está disponible"""
+    def play(self, *args, **kwargs):
+        """No reproduce nada"""
+        return None
+    
+    def stop(self):
+        """No hay nada que detener"""
+        pass
+    
+    def set_volume(self, value):
+        """El volumen no tiene efecto"""
+        pass
+
+def mixer_available():
+    """Comprueba si el mezclador de pygame está inicializado"""
+    return pygame.mixer.get_init() is not None
+
+def load_sound(file_path):
+    """
+    Carga un efecto de sonido (desde el paquete de assets si está en él).
+    
+    Args:
+        file_path (str): Ruta al archivo de sonido
+    
+    Returns:
+        pygame.mixer.Sound o SilentSound: El sonido cargado, o uno vacío si
+        el mezclador no está inicializado o el archivo no se puede cargar
+    """
+    if not mixer_available():
+        return SilentSound()
+    
+    try:
+        with open_asset(file_path) as sound_file:
+            return pygame.mixer.Sound(sound_file)
+    except (pygame.error, FileNotFoundError):
+        print(f"No se pudo cargar el sonido: {file_path}")
+        # Crear un sonido vacío como respaldo
+        return pygame.mixer.Sound(buffer=bytes([0] * 44100))
+
+def get_sound(file_path):
+    """Devuelve un efecto de sonido desde la caché, decodificándolo solo la primera vez"""
+    sound = _sound_cache.get(file_path)
+    if sound is None:
+        sound = load_sound(file_path)
+        _sound_cache[file_path] = sound
+    return sound
+
+def clear_sound_cache():
+    """Vacía la caché de sonidos (por ejemplo, tras reiniciar el mezclador)"""
+    _sound_cache.clear()
+
+class SoundBank:
+    """
+    Gestor de efectos de sonido del juego.
+    
+    Cada efecto (cue) pertenece a una categoría con sus propios canales
+    reservados, de modo que una categoría nunca ocupa más voces de las que
+    tiene asignadas. Los disparos de un mismo efecto dentro de un tick se
+    agrupan en uno solo, y cada efecto puede tener un intervalo mínimo
+    (en ticks) entre reproducciones.
+    """
+    def __init__(self, categories=None):
+        self.categories = dict(categories or SOUND_CATEGORIES)
+        
+        # nombre -> (Sound, categoría, intervalo mínimo)
+        self.cues = {}
+        
+        # Efectos pedidos en el tick actual (en orden) y último tick en que sonó cada uno
+        self.pending = {}
+        self.last_played = {}
+        self.tick = 0
+        
+        self.channels = self.reserve_channels()
+    
+    def reserve_channels(self):
+        """Reserva los canales de cada categoría (ninguno si no hay mezclador)"""
+        channels = {category: [] for category in self.categories}
+        if not mixer_available():
+            return channels
+        
+        # Los canales reservados no los usa Sound.play() al elegir canal libre
+        total = sum(self.categories.values())
+        if pygame.mixer.get_num_channels() < total + 1:
+            pygame.mixer.set_num_channels(total + 1)
+        pygame.mixer.set_reserved(total)
+        
+        index = 0
+        for category, count in self.categories.items():
+            for _ in range(count):
+                channels[category].append(pygame.mixer.Channel(index))
+                index += 1
+        return channels
+    
+    def register(self, name, file_path, category, min_interval=0):
+        """Registra un efecto de sonido (se decodifica una sola vez por proceso)"""
+        if category not in self.categories:
+            raise ValueError(f"Categoría de sonido desconocida: {category}")
+        self.cues[name] = (get_sound(file_path), category, min_interval)
+    
+    def play(self, name):
+        """Pide reproducir un efecto; se reproduce al terminar el tick (ver end_tick)"""
+        if name in self.cues:
+            self.pending[name] = True
+    
+    def end_tick(self):
+        """Reproduce los efectos pedidos durante el tick (cada uno una sola vez)"""
+        for name in self.pending:
+            sound, category, min_interval = self.cues[name]
+            
+            last = self.last_played.get(name)
+            if last is not None and self.tick - last < min_interval:
+                continue
+            
+            # Usar un canal libre de la categoría; si todos están ocupados, se descarta
+            for channel in self.channels[category]:
+                if not channel.get_busy():
+                    channel.play(sound)
+                    self.last_played[name] = self.tick
+                    break
+        
+        self.pending.clear()
+        self.tick += 1
+    
+    def stop(self):
+        """Detiene todos los efectos y descarta los pendientes"""
+        self.pending.clear()
+        for channels in self.channels.values():
+            for channel in channels:
+                channel.stop()
+
+def play_music(file_path, loops=-1):
+    """Reproduce música de fondo si el mezclador está disponible"""
+    if not mixer_available():
+        return False
+    
+    try:
+        # La música se sigue leyendo durante la reproducción: pygame conserva el objeto
+        pygame.mixer.music.load(open_asset(file_path), file_path)
+        pygame.mixer.music.play(loops)
+        return True
+    except (pygame.error, FileNotFoundError):
+        print(f"No se pudo cargar la música: {file_path}")
+        return False
+
+def stop_music():
+    """Detiene la música de fondo si el mezclador está disponible"""
+    if mixer_available():
+        pygame.mixer.music.stop()
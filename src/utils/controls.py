@@ -0,0 +1,56 @@
+"""
+Entrada del jugador como máscara de bits por tick
+"""
+import pygame
+
+# Bits de la máscara de entrada
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_SHOOT = 16
+INPUT_RESET = 32
+
+class KeyboardInput:
+    """
+    Lee el teclado y lo convierte en una máscara de bits por tick.
+    Las teclas de movimiento se leen al sondear; disparar y reiniciar son
+    pulsaciones y se acumulan desde los eventos hasta el siguiente tick.
+    """
+    def __init__(self):
+        self.pressed = 0
+    
+    def handle_event(self, event):
+        """Registra las pulsaciones de disparo y reinicio"""
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_SPACE:
+                self.pressed |= INPUT_SHOOT
+            elif event.key == pygame.K_r:
+                self.pressed |= INPUT_RESET
+    
+    def poll(self):
+        """Devuelve la máscara de entrada de este tick"""
+        keys = pygame.key.get_pressed()
+        buttons = self.pressed
+        self.pressed = 0
+        
+        if keys[pygame.K_w] or keys[pygame.K_UP]:
+            buttons |= INPUT_UP
+        if keys[pygame.K_s] or keys[pygame.K_DOWN]:
+            buttons |= INPUT_DOWN
+        if keys[pygame.K_a] or keys[pygame.K_LEFT]:
+            buttons |= INPUT_LEFT
+        if keys[pygame.K_d] or keys[pygame.K_RIGHT]:
+            buttons |= INPUT_RIGHT
+        
+        return buttons
+
+class NullInput:
+    """Entrada vacía (simulación sin jugador)"""
+    def handle_event(self, event):
+        """Ignora los eventos"""
+        pass
+    
+    def poll(self):
+        """No hay ninguna tecla pulsada"""
+        return 0
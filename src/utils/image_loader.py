@@ -4,6 +4,23 @@ Utilidades para cargar imágenes, incluyendo SVG
 import os
 import pygame
 import io
+from src.utils.atlas import TextureAtlas, ATLAS_INDEX_PATH
+from src.utils.asset_bundle import asset_exists, open_asset
+
+# Directorio donde se buscan las imágenes por nombre
+IMAGES_DIR = "assets/images"
+
+# Direcciones de los sprites animados (dos frames por dirección)
+DIRECTIONS = ["up", "down", "left", "right"]
+
+# Cachés globales del proceso: todas las entidades comparten las mismas superficies
+_image_cache = {}       # (ruta, tamaño, alpha) -> pygame.Surface
+_asset_cache = {}       # (nombre, tamaño, alpha) -> pygame.Surface
+_sprite_set_cache = {}  # (prefijo, tamaño) -> {dirección: [frames]}
+
+# Atlas de texturas (se carga la primera vez que se pide un asset).
+# False indica que ya se intentó cargar y no hay atlas disponible
+_atlas = None
 
 def load_image(file_path, size=None):
     """
@@ -18,8 +35,8 @@ def load_image(file_path, size=None):
     """
     sprite = None
     
-    # Verificar si el archivo existe
-    if not os.path.exists(file_path):
+    # Verificar si el archivo existe (en el paquete de assets o en el disco)
+    if not asset_exists(file_path):
         print(f"El archivo no existe: {file_path}")
         return create_fallback_surface(size or (32, 32))
     
@@ -28,7 +45,8 @@ def load_image(file_path, size=None):
     
     try:
         # Método 1: Intentar cargar directamente con pygame
-        sprite = pygame.image.load(file_path)
+        with open_asset(file_path) as image_file:
+            sprite = pygame.image.load(image_file, file_path)
         
         # Escalar si es necesario
         if size:
@@ -42,7 +60,8 @@ def load_image(file_path, size=None):
                 # Método 2: Usar cairosvg si está disponible
                 try:
                     import cairosvg
-                    png_bytes = cairosvg.svg2png(url=file_path)
+                    with open_asset(file_path) as svg_file:
+                        png_bytes = cairosvg.svg2png(bytestring=svg_file.read())
                     byte_io = io.BytesIO(png_bytes)
                     sprite = pygame.image.load(byte_io)
                     
@@ -109,4 +128,123 @@ def convert_svg_to_png(svg_path, png_path=None, size=None):
     except Exception as e:
         print(f"Error al convertir SVG a PNG: {e}")
     
-    return False 
\ No newline at end of file
+    return False 
+
+def convert_surface(surface, alpha=True):
+    """
+    Convierte una superficie al formato de la pantalla para acelerar el blit.
+    Si todavía no hay pantalla, la superficie se devuelve sin cambios.
+    """
+    if pygame.display.get_surface() is None:
+        return surface
+    
+    try:
+        return surface.convert_alpha() if alpha else surface.convert()
+    except pygame.error:
+        return surface
+
+def get_image(file_path, size=None, alpha=True):
+    """
+    Devuelve una imagen desde la caché global, cargándola solo la primera vez.
+    
+    Args:
+        file_path (str): Ruta al archivo de imagen (PNG o SVG)
+        size (tuple, optional): Tamaño al que escalar la imagen (ancho, alto)
+        alpha (bool): Si se conserva la transparencia al convertir la superficie
+    
+    Returns:
+        pygame.Surface: Superficie compartida; no debe modificarse
+    """
+    key = (file_path, tuple(size) if size else None, alpha)
+    surface = _image_cache.get(key)
+    if surface is None:
+        surface = convert_surface(load_image(file_path, size), alpha)
+        _image_cache[key] = surface
+    return surface
+
+def get_atlas():
+    """Devuelve el atlas de texturas, cargándolo la primera vez (None si no existe)"""
+    global _atlas
+    if _atlas is None:
+        _atlas = False
+        if asset_exists(ATLAS_INDEX_PATH):
+            try:
+                _atlas = TextureAtlas(ATLAS_INDEX_PATH, convert_surface)
+            except (OSError, ValueError, KeyError, pygame.error) as e:
+                print(f"No se pudo cargar el atlas de texturas: {e}")
+    return _atlas or None
+
+def find_image_path(name):
+    """Busca la imagen con el nombre dado, primero en PNG y luego en SVG"""
+    for extension in (".png", ".svg"):
+        path = os.path.join(IMAGES_DIR, name + extension)
+        if asset_exists(path):
+            return path
+    return None
+
+def get_asset_image(name, size, alpha=True, fallback=None):
+    """
+    Devuelve la imagen de un asset por su nombre (sin extensión), desde la caché.
+    Si el asset está en el atlas de texturas a ese tamaño, se usa el frame del atlas.
+    
+    Args:
+        name (str): Nombre del asset, por ejemplo "zombie_up_1"
+        size (tuple): Tamaño al que escalar la imagen (ancho, alto)
+        alpha (bool): Si se conserva la transparencia al convertir la superficie
+        fallback (callable, optional): Función que crea una superficie de respaldo
+            si no existe ninguna imagen con ese nombre
+    
+    Returns:
+        pygame.Surface: Superficie compartida; no debe modificarse
+    """
+    key = (name, tuple(size), alpha)
+    surface = _asset_cache.get(key)
+    if surface is not None:
+        return surface
+    
+    atlas = get_atlas()
+    frame = atlas.get(name, size) if atlas is not None else None
+    path = find_image_path(name) if frame is None else None
+    if frame is not None:
+        # Los tiles opacos se copian a una superficie sin alpha (blit más rápido)
+        surface = frame if alpha else convert_surface(frame.copy(), False)
+    elif path is not None:
+        surface = get_image(path, size, alpha)
+    else:
+        print(f"No se encontró ninguna imagen para: {name}")
+        surface = fallback() if fallback else create_fallback_surface(size)
+        surface = convert_surface(surface, alpha)
+    
+    _asset_cache[key] = surface
+    return surface
+
+def get_sprite_set(prefix, size, fallback_color):
+    """
+    Devuelve los sprites animados de una entidad ({dirección: [frame1, frame2]}).
+    El diccionario es compartido por todas las instancias y no debe modificarse.
+    """
+    key = (prefix, tuple(size))
+    sprites = _sprite_set_cache.get(key)
+    if sprites is not None:
+        return sprites
+    
+    sprites = {}
+    for direction in DIRECTIONS:
+        sprites[direction] = [
+            get_asset_image(
+                f"{prefix}_{direction}_{i}", size,
+                fallback=lambda: create_fallback_surface(size, fallback_color)
+            )
+            for i in range(1, 3)
+        ]
+    
+    _sprite_set_cache[key] = sprites
+    return sprites
+
+def clear_image_cache():
+    """Vacía las cachés de imágenes (por ejemplo, tras cambiar el modo de vídeo)"""
+    global _atlas
+    _atlas = None
+    _image_cache.clear()
+    _asset_cache.clear()
+    _sprite_set_cache.clear()
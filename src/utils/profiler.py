@@ -0,0 +1,131 @@
+"""
+Medición de tiempos por fase del frame
+"""
+import csv
+import time
+from collections import deque
+
+class NullScope:
+    """Ámbito vacío que se usa cuando el profiler está desactivado"""
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+NULL_SCOPE = NullScope()
+
+class TimingScope:
+    """Ámbito que mide el tiempo transcurrido entre su entrada y su salida"""
+    __slots__ = ("profiler", "name", "start")
+    
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class Profiler:
+    """
+    Guarda los últimos tiempos de cada fase en buffers circulares.
+    Desactivado, scope() devuelve siempre el mismo ámbito vacío y no mide nada.
+    """
+    def __init__(self, history=300):
+        self.enabled = False
+        self.history = history
+        
+        # Nombre de fase -> deque con los últimos tiempos (en segundos)
+        self.samples = {}
+        
+        # Duración de los últimos frames completos
+        self.frame_times = deque(maxlen=history)
+        self.last_frame_end = None
+    
+    def scope(self, name):
+        """Devuelve un gestor de contexto que mide la fase indicada"""
+        if not self.enabled:
+            return NULL_SCOPE
+        return TimingScope(self, name)
+    
+    def record(self, name, seconds):
+        """Añade una medición a una fase"""
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = deque(maxlen=self.history)
+            self.samples[name] = samples
+        samples.append(seconds)
+    
+    def end_frame(self):
+        """Marca el final de un frame para medir su duración total"""
+        if not self.enabled:
+            self.last_frame_end = None
+            return
+        
+        now = time.perf_counter()
+        if self.last_frame_end is not None:
+            self.frame_times.append(now - self.last_frame_end)
+        self.last_frame_end = now
+    
+    def reset(self):
+        """Descarta todas las mediciones"""
+        self.samples.clear()
+        self.frame_times.clear()
+        self.last_frame_end = None
+    
+    @staticmethod
+    def percentile(values, fraction):
+        """Percentil de una secuencia de valores (por el método del rango más cercano)"""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
+    
+    def stats(self):
+        """
+        Devuelve las estadísticas de cada fase en milisegundos:
+        {fase: {"samples", "mean", "p50", "p99", "max"}}
+        """
+        stats = {}
+        for name, samples in self.samples.items():
+            values = list(samples)
+            stats[name] = {
+                "samples": len(values),
+                "mean": sum(values) / len(values) * 1000 if values else 0.0,
+                "p50": self.percentile(values, 0.50) * 1000,
+                "p99": self.percentile(values, 0.99) * 1000,
+                "max": max(values) * 1000 if values else 0.0,
+            }
+        return stats
+    
+    def fps(self):
+        """FPS medios de los últimos frames"""
+        if not self.frame_times:
+            return 0.0
+        average = sum(self.frame_times) / len(self.frame_times)
+        return 1.0 / average if average > 0 else 0.0
+    
+    def export_csv(self, file_path):
+        """Exporta las estadísticas de cada fase a un archivo CSV"""
+        with open(file_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["phase", "samples", "mean_ms", "p50_ms", "p99_ms", "max_ms"])
+            for name, values in self.stats().items():
+                writer.writerow([name, values["samples"], f"{values['mean']:.4f}",
+                                 f"{values['p50']:.4f}", f"{values['p99']:.4f}", f"{values['max']:.4f}"])
+            
+            frame_ms = [value * 1000 for value in self.frame_times]
+            if frame_ms:
+                writer.writerow(["frame", len(frame_ms), f"{sum(frame_ms) / len(frame_ms):.4f}",
+                                 f"{self.percentile(frame_ms, 0.50):.4f}",
+                                 f"{self.percentile(frame_ms, 0.99):.4f}", f"{max(frame_ms):.4f}"])
+
+# Instancia global compartida por el bucle principal y el juego
+profiler = Profiler()
@@ -0,0 +1,111 @@
+"""
+Grabación y reproducción de partidas (semilla + entrada de cada tick + cuándo
+se entregó cada camino buscado en segundo plano)
+"""
+import struct
+import zlib
+
+# Cabecera: identificador, versión, semilla y número de ticks
+REPLAY_MAGIC = b"ZREP"
+REPLAY_VERSION = 2
+HEADER_FORMAT = "<4sBqI"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+
+# Desde la versión 2, tras la cabecera va el tamaño comprimido de la entrada
+# (detrás de ella van las entregas de caminos)
+INPUTS_SIZE_FORMAT = "<I"
+INPUTS_SIZE_SIZE = struct.calcsize(INPUTS_SIZE_FORMAT)
+
+def save_replay(file_path, seed, inputs, path_ages=b""):
+    """
+    Guarda una partida grabada. La entrada se guarda como un byte por tick
+    comprimido con zlib (las secuencias de teclas repetidas ocupan muy poco).
+    Detrás, también comprimidas, van las edades de entrega de los caminos
+    (PathDeliveryLog.to_bytes()).
+    """
+    header = struct.pack(HEADER_FORMAT, REPLAY_MAGIC, REPLAY_VERSION, seed, len(inputs))
+    compressed_inputs = zlib.compress(bytes(inputs), 9)
+    with open(file_path, "wb") as replay_file:
+        replay_file.write(header)
+        replay_file.write(struct.pack(INPUTS_SIZE_FORMAT, len(compressed_inputs)))
+        replay_file.write(compressed_inputs)
+        replay_file.write(zlib.compress(bytes(path_ages), 9))
+
+def load_replay(file_path):
+    """
+    Carga una partida grabada (las de la versión 1 no tienen entregas de caminos).
+    
+    Returns:
+        tuple: (semilla, bytes con la entrada de cada tick, bytes con las edades de entrega)
+    """
+    with open(file_path, "rb") as replay_file:
+        data = replay_file.read()
+    
+    if len(data) < HEADER_SIZE:
+        raise ValueError(f"Archivo de repetición demasiado corto: {file_path}")
+    
+    magic, version, seed, ticks = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != REPLAY_MAGIC or version not in (1, REPLAY_VERSION):
+        raise ValueError(f"Formato de repetición no soportado: {file_path}")
+    
+    if version == 1:
+        inputs = zlib.decompress(data[HEADER_SIZE:])
+        path_ages = b""
+    else:
+        if len(data) < HEADER_SIZE + INPUTS_SIZE_SIZE:
+            raise ValueError(f"Archivo de repetición demasiado corto: {file_path}")
+        inputs_size, = struct.unpack_from(INPUTS_SIZE_FORMAT, data, HEADER_SIZE)
+        inputs_start = HEADER_SIZE + INPUTS_SIZE_SIZE
+        inputs = zlib.decompress(data[inputs_start:inputs_start + inputs_size])
+        path_ages = zlib.decompress(data[inputs_start + inputs_size:])
+    
+    if len(inputs) != ticks:
+        raise ValueError(f"Repetición incompleta: {len(inputs)} de {ticks} ticks")
+    
+    return seed, inputs, path_ages
+
+class InputRecorder:
+    """Envuelve otra fuente de entrada y guarda la máscara de cada tick"""
+    def __init__(self, source):
+        self.source = source
+        self.inputs = bytearray()
+    
+    def handle_event(self, event):
+        """Pasa los eventos a la fuente original"""
+        self.source.handle_event(event)
+    
+    def poll(self):
+        """Lee la entrada de la fuente original y la guarda"""
+        buttons = self.source.poll()
+        self.inputs.append(buttons)
+        return buttons
+    
+    def save(self, file_path, seed, path_ages=b""):
+        """Guarda la grabación junto con la semilla de la partida y las entregas de caminos"""
+        save_replay(file_path, seed, self.inputs, path_ages)
+
+class InputReplay:
+    """Fuente de entrada que reproduce una grabación tick a tick"""
+    def __init__(self, file_path):
+        self.seed, self.inputs, self.path_ages = load_replay(file_path)
+        self.tick = 0
+    
+    def __len__(self):
+        return len(self.inputs)
+    
+    @property
+    def finished(self):
+        """Indica si ya se ha reproducido toda la grabación"""
+        return self.tick >= len(self.inputs)
+    
+    def handle_event(self, event):
+        """El teclado se ignora durante la reproducción"""
+        pass
+    
+    def poll(self):
+        """Devuelve la entrada grabada del tick actual (0 al terminar)"""
+        if self.finished:
+            return 0
+        buttons = self.inputs[self.tick]
+        self.tick += 1
+        return buttons
@@ -0,0 +1,59 @@
+"""
+Cuadrícula uniforme (spatial hash) para la fase amplia de colisiones
+"""
+from src.utils.constants import TILE_SIZE
+
+class SpatialHash:
+    """
+    Reparte las entidades en celdas de tamaño fijo según su rectángulo, de modo
+    que una consulta solo revisa las entidades de las celdas que toca.
+    Se vacía y se vuelve a llenar en cada tick.
+    """
+    def __init__(self, cell_size=TILE_SIZE * 2):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.count = 0
+    
+    def clear(self):
+        """Elimina todas las entidades"""
+        self.cells.clear()
+        self.count = 0
+    
+    def cell_range(self, rect):
+        """Devuelve el rango de celdas (x1, y1, x2, y2) que ocupa un rectángulo"""
+        size = self.cell_size
+        return (int(rect.left // size), int(rect.top // size),
+                int((rect.right - 1) // size), int((rect.bottom - 1) // size))
+    
+    def insert(self, item, rect):
+        """Añade una entidad con su rectángulo de colisión"""
+        # El orden de inserción permite devolver los resultados de forma determinista
+        entry = (self.count, item, rect)
+        self.count += 1
+        
+        x1, y1, x2, y2 = self.cell_range(rect)
+        for cy in range(y1, y2 + 1):
+            for cx in range(x1, x2 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    self.cells[(cx, cy)] = [entry]
+                else:
+                    cell.append(entry)
+    
+    def query(self, rect):
+        """
+        Devuelve las entidades cuyo rectángulo colisiona con el dado,
+        en el mismo orden en que se insertaron
+        """
+        found = {}
+        x1, y1, x2, y2 = self.cell_range(rect)
+        for cy in range(y1, y2 + 1):
+            for cx in range(x1, x2 + 1):
+                cell = self.cells.get((cx, cy))
+                if cell is None:
+                    continue
+                for order, item, item_rect in cell:
+                    if order not in found and rect.colliderect(item_rect):
+                        found[order] = item
+        
+        return [found[order] for order in sorted(found)]
@@ -0,0 +1,64 @@
+"""
+Caché de fuentes y de textos renderizados
+"""
+from collections import OrderedDict
+import pygame
+
+# Fuentes creadas una sola vez por proceso: (nombre, tamaño) -> pygame.font.Font
+_font_cache = {}
+
+def get_font(size, font_name=None):
+    """Devuelve una fuente (None = fuente por defecto de pygame) desde la caché"""
+    key = (font_name, size)
+    font = _font_cache.get(key)
+    if font is None:
+        font = pygame.font.Font(font_name, size)
+        _font_cache[key] = font
+    return font
+
+class TextCache:
+    """
+    Caché LRU de superficies de texto, por (fuente, tamaño, texto, color).
+    Los textos que no cambian (títulos, opciones de menú, etiquetas del HUD)
+    se renderizan una sola vez; los que cambian van desplazando a los más antiguos.
+    """
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, text, size, color, font_name=None, antialias=True):
+        """
+        Devuelve la superficie de un texto, renderizándolo solo si no está en la caché.
+        La superficie es compartida y no debe modificarse.
+        """
+        key = (font_name, size, text, tuple(color), antialias)
+        surface = self.entries.get(key)
+        if surface is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return surface
+        
+        self.misses += 1
+        surface = get_font(size, font_name).render(text, antialias, color)
+        self.entries[key] = surface
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return surface
+    
+    def clear(self):
+        """Vacía la caché"""
+        self.entries.clear()
+
+# Caché global compartida por el HUD, los menús y las pantallas del juego
+text_cache = TextCache()
+
+def render_text(text, size, color, font_name=None, antialias=True):
+    """Renderiza un texto usando la caché global"""
+    return text_cache.render(text, size, color, font_name, antialias)
+
+def clear_text_cache():
+    """Vacía las cachés de textos y fuentes (necesario si se reinicia pygame.font)"""
+    text_cache.clear()
+    _font_cache.clear()